@@ -25,8 +25,10 @@ from web3.contract import Contract
 from subprocess import Popen, DEVNULL
 
 from d3a.d3a_core.util import get_cached_joined_contract_source
+from d3a.blockchain.settlement import BlockchainSettlement
 from d3a.blockchain.users import BCUsers
 from d3a.blockchain.utils import unlock_account
+from d3a.models.market import blockchain_utils
 from d3a_interface.constants_limits import ConstSettings
 from d3a_interface.utils import wait_until_timeout_blocking
 
@@ -37,8 +39,9 @@ log = getLogger(__name__)
 User = namedtuple('User', ('name', 'address', 'privkey'))
 
 
-class BlockChainInterface:
-    def __init__(self, default_user_balance=10 ** 8):
+class BlockChainInterface(BlockchainSettlement):
+    def __init__(self, default_user_balance=10 ** 8, settlement_mode="transaction"):
+        super().__init__(settlement_mode)
         if ConstSettings.BlockchainSettings.START_LOCAL_CHAIN:
             self._ganache_process = Popen(['ganache-cli', '-a', '50', '-e', '10000000000'],
                                           close_fds=False, stdout=DEVNULL, stderr=DEVNULL)
@@ -84,3 +87,21 @@ class BlockChainInterface:
         if listeners:
             self.listeners[contract.address].extend(listeners)
         return contract
+
+    def create_market_contract(self, duration_s, listeners=None):
+        return blockchain_utils.create_market_contract(self, duration_s, listeners or [])
+
+    def create_new_offer(self, bc_contract, energy, price, seller):
+        return blockchain_utils.create_new_offer(self, bc_contract, energy, price, seller)
+
+    def cancel_offer(self, bc_contract, offer):
+        blockchain_utils.cancel_offer(self, bc_contract, offer)
+
+    def trade_offer(self, bc_contract, offer_id, energy, buyer):
+        return blockchain_utils.trade_offer(self, bc_contract, offer_id, energy, buyer)
+
+    def send_transaction(self, bc_contract, transaction, chain_ids):
+        return blockchain_utils.send_transaction(self, bc_contract, transaction, chain_ids)
+
+    def transaction_results(self, bc_contract, transactions, handles):
+        return blockchain_utils.transaction_results(self, bc_contract, transactions, handles)
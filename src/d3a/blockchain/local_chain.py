@@ -0,0 +1,118 @@
+"""
+Copyright 2018 Grid Singularity
+This file is part of D3A.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import hashlib
+from collections import defaultdict
+
+from d3a.blockchain.settlement import BlockchainSettlement
+from d3a.models.market.blockchain_interface import OFFER_TRANSACTION, CANCEL_TRANSACTION
+from d3a.models.market.blockchain_utils import BC_NUM_FACTOR, InvalidBlockchainOffer, \
+    InvalidBlockchainTrade
+
+
+class LocalMarketContract:
+    """
+    In-process stand-in of the Market.sol contract with the same offer, cancel and trade
+    semantics. Energy and prices are integers scaled by BC_NUM_FACTOR, as on the chain.
+    """
+    def __init__(self, chain, duration_s):
+        self.chain = chain
+        self.duration_s = duration_s
+        # offer id -> (energy units, price, seller)
+        self.offers = {}
+        self.balances = defaultdict(int)
+
+    def offer(self, energy_units, price, seller):
+        if energy_units <= 0:
+            return False, None
+        offer_id = self.chain.next_id(energy_units, price, seller)
+        self.offers[offer_id] = (energy_units, price, seller)
+        return True, offer_id
+
+    def cancel(self, offer_id, sender):
+        offer = self.offers.get(offer_id)
+        if offer is None or offer[2] != sender:
+            return False
+        del self.offers[offer_id]
+        return True
+
+    def trade(self, offer_id, traded_energy_units, buyer):
+        offer = self.offers.get(offer_id)
+        if offer is None or buyer == offer[2] or not 0 < traded_energy_units <= offer[0]:
+            return False, None, None
+        energy_units, price, seller = offer
+        new_offer_id = None
+        if traded_energy_units < energy_units:
+            # Partial trade, the residual energy is offered with the same price
+            _, new_offer_id = self.offer(energy_units - traded_energy_units, price, seller)
+        self.balances[buyer] += traded_energy_units
+        self.balances[seller] -= traded_energy_units
+        self.chain.clearing_transfer(buyer, seller, traded_energy_units * price)
+        del self.offers[offer_id]
+        return True, new_offer_id, self.chain.hash(offer_id, buyer)
+
+
+class LocalBlockChainInterface(BlockchainSettlement):
+    """
+    Deterministic in-process chain, that runs blockchain simulations without a node. Offer
+    and trade ids only depend on the order of the transactions.
+    """
+    def __init__(self, settlement_mode="transaction"):
+        super().__init__(settlement_mode)
+        self._nonce = 0
+        # ClearingToken balances
+        self.token_balances = defaultdict(int)
+        self.transaction_count = 0
+
+    @staticmethod
+    def hash(*values):
+        return hashlib.sha256(repr(values).encode()).digest()
+
+    def next_id(self, *values):
+        self._nonce += 1
+        return self.hash(*values, self._nonce)
+
+    def clearing_transfer(self, buyer, seller, cost):
+        self.token_balances[buyer] -= cost
+        self.token_balances[seller] += cost
+
+    def create_market_contract(self, duration_s, listeners=None):
+        return LocalMarketContract(self, duration_s)
+
+    def send_transaction(self, bc_contract, transaction, chain_ids):
+        # Transactions are executed when they are sent, the handle is the result
+        self.transaction_count += 1
+        if transaction.type == OFFER_TRANSACTION:
+            success, offer_id = bc_contract.offer(int(transaction.energy * BC_NUM_FACTOR),
+                                                  int(transaction.price * BC_NUM_FACTOR),
+                                                  transaction.sender)
+            if not success:
+                raise InvalidBlockchainOffer(f"Invalid blockchain offer {transaction}")
+            return offer_id
+        elif transaction.type == CANCEL_TRANSACTION:
+            bc_contract.cancel(chain_ids[transaction.offer_id], transaction.sender)
+            return None
+        else:
+            success, new_offer_id, trade_id = bc_contract.trade(
+                chain_ids[transaction.offer_id], int(transaction.energy * BC_NUM_FACTOR),
+                transaction.sender)
+            if not success:
+                raise InvalidBlockchainTrade(f"Invalid blockchain trade {transaction}")
+            return trade_id, new_offer_id
+
+    def transaction_results(self, bc_contract, transactions, handles):
+        return list(handles)
@@ -0,0 +1,164 @@
+"""
+Copyright 2018 Grid Singularity
+This file is part of D3A.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from logging import getLogger
+
+from d3a.d3a_core.exceptions import D3AException, InvalidTrade
+from d3a.models.market.blockchain_interface import MarketBlockchainInterface, \
+    BatchedMarketBlockchainInterface, BlockchainTransaction, OFFER_TRANSACTION, \
+    CANCEL_TRANSACTION, TRADE_TRANSACTION
+
+log = getLogger(__name__)
+
+# transaction: one synchronous chain transaction per offer, cancellation and trade
+# tick / slot: the transactions of all markets are settled in batches after every tick / slot
+SETTLEMENT_MODES = ("transaction", "tick", "slot")
+
+
+class BlockchainSettlement(ABC):
+    """
+    Base class of the chains that the markets of a simulation settle on. Subclasses send a
+    single transaction to the market contract (send_transaction) and wait for the results
+    of sent transactions (transaction_results).
+    """
+    def __init__(self, settlement_mode="transaction"):
+        if settlement_mode not in SETTLEMENT_MODES:
+            raise D3AException(f"Invalid blockchain settlement mode {settlement_mode}, "
+                               f"valid modes are {SETTLEMENT_MODES}.")
+        self.settlement_mode = settlement_mode
+        # Batched market interfaces with pending transactions, in the order of their first
+        # pending transaction
+        self._pending_markets = OrderedDict()
+        self.settled_transaction_count = 0
+        self.settlement_time_s = 0
+
+    @abstractmethod
+    def create_market_contract(self, duration_s, listeners=None):
+        """
+        :param duration_s: duration of the market in seconds
+        :param listeners: listeners of the events of the market contract
+        :return: the market contract
+        """
+        pass
+
+    @abstractmethod
+    def send_transaction(self, bc_contract, transaction, chain_ids):
+        """
+        :param bc_contract: market contract the transaction is sent to
+        :param transaction: BlockchainTransaction
+        :param chain_ids: ids of the offers on the chain
+        :return: handle of the sent transaction
+        """
+        pass
+
+    @abstractmethod
+    def transaction_results(self, bc_contract, transactions, handles):
+        """
+        :param bc_contract: market contract the transactions were sent to
+        :param transactions: sent BlockchainTransactions
+        :param handles: handles of the sent transactions, as returned by send_transaction
+        :return: results of the transactions, in the order of the transactions
+        """
+        pass
+
+    def create_market_interface(self):
+        if self.settlement_mode == "transaction":
+            return MarketBlockchainInterface(self)
+        return BatchedMarketBlockchainInterface(self)
+
+    def add_pending_market(self, market_interface):
+        self._pending_markets[id(market_interface)] = market_interface
+
+    def settle(self, end_of_slot=False):
+        """
+        Settles the pending transactions of all markets, called after every tick and at the
+        end of every slot.
+        """
+        if self.settlement_mode == "transaction" or \
+                (self.settlement_mode == "slot" and not end_of_slot):
+            return
+        start = time.time()
+        while self._pending_markets:
+            _, market_interface = self._pending_markets.popitem(last=False)
+            self.settled_transaction_count += market_interface.settle()
+        self.settlement_time_s += time.time() - start
+
+    def log_settlement_stats(self):
+        if self.settled_transaction_count == 0 or self.settlement_time_s == 0:
+            return
+        log.info(f"Settled {self.settled_transaction_count} blockchain transactions in "
+                 f"{self.settlement_time_s:.2f}s "
+                 f"({self.settled_transaction_count / self.settlement_time_s:.1f} "
+                 f"transactions/s)")
+
+    def settle_transactions(self, bc_contract, transactions, chain_ids):
+        """
+        Settles a batch of transactions of a market. Transactions are sent without waiting
+        for the results of the previous ones, unless they reference an offer that is created
+        by a transaction whose result is still pending. The chain ids of the created offers
+        and trades are added to chain_ids.
+        """
+        pending = []
+        for transaction in transactions:
+            if transaction.type != OFFER_TRANSACTION and \
+                    transaction.offer_id not in chain_ids:
+                self._complete_transactions(bc_contract, pending, chain_ids)
+                pending = []
+                if transaction.offer_id not in chain_ids:
+                    raise InvalidTrade(f"Offer {transaction.offer_id} is not on the chain.")
+            pending.append(
+                (transaction, self.send_transaction(bc_contract, transaction, chain_ids)))
+        self._complete_transactions(bc_contract, pending, chain_ids)
+
+    def _complete_transactions(self, bc_contract, pending, chain_ids):
+        if not pending:
+            return
+        transactions, handles = zip(*pending)
+        results = self.transaction_results(bc_contract, transactions, handles)
+        for transaction, result in zip(transactions, results):
+            if transaction.type == OFFER_TRANSACTION:
+                chain_ids[transaction.offer_id] = result
+            elif transaction.type == TRADE_TRANSACTION:
+                trade_id, new_offer_id = result
+                chain_ids[transaction.trade_id] = trade_id
+                if transaction.residual_offer_id is not None:
+                    if new_offer_id is None:
+                        raise InvalidTrade(
+                            "Blockchain and local residual offers are out of sync")
+                    chain_ids[transaction.residual_offer_id] = new_offer_id
+
+    def _settle_single_transaction(self, bc_contract, transaction):
+        chain_ids = {}
+        if transaction.type != OFFER_TRANSACTION:
+            chain_ids[transaction.offer_id] = transaction.offer_id
+        handle = self.send_transaction(bc_contract, transaction, chain_ids)
+        return self.transaction_results(bc_contract, [transaction], [handle])[0]
+
+    def create_new_offer(self, bc_contract, energy, price, seller):
+        return self._settle_single_transaction(bc_contract, BlockchainTransaction(
+            OFFER_TRANSACTION, None, seller, energy, price, None, None))
+
+    def cancel_offer(self, bc_contract, offer):
+        self._settle_single_transaction(bc_contract, BlockchainTransaction(
+            CANCEL_TRANSACTION, offer.real_id, offer.seller, None, None, None, None))
+
+    def trade_offer(self, bc_contract, offer_id, energy, buyer):
+        return self._settle_single_transaction(bc_contract, BlockchainTransaction(
+            TRADE_TRANSACTION, offer_id, buyer, energy, None, None, None))
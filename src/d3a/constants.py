@@ -40,4 +40,23 @@ EXTERNAL_CONNECTION_WEB = False
 
 DEVICE_PENALTY_RATE = 40.0
 
+# Runs a power flow on the energy traded in every slot, if the power flow is enabled
+POWER_FLOW_TIME_SERIES = False
+
+# Ids of the markets, offers, bids and trades, "compact" or "uuid" (see d3a_core/ids.py).
+# Simulations with external connections always use uuids.
+ID_MODE = "compact"
+
+# Number of the latest trace messages that are kept in memory instead of being logged, and that
+# are logged if the simulation fails. 0 disables the trace buffer.
+TRACE_BUFFER_SIZE = 0
+
+# Matches the offers and bids of all markets of a time slot at once instead of forwarding
+# them one market at a time, for two sided pay as bid markets (see
+# models/market/path_compressed_matching.py)
+PATH_COMPRESSED_MATCHING = False
+
 SIMULATION_PAUSE_TIMEOUT = 600
+
+# Minimum wall clock time in seconds between two progress reports of headless simulations
+HEADLESS_PROGRESS_INTERVAL = 10
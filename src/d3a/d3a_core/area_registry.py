@@ -0,0 +1,110 @@
+"""
+Copyright 2018 Grid Singularity
+This file is part of D3A.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+from types import MappingProxyType
+
+from d3a.d3a_core.exceptions import AreaException
+
+
+def iterate_area_tree(area):
+    areas = [area]
+    while areas:
+        area = areas.pop()
+        yield area
+        areas.extend(area.children)
+
+
+class AreaRegistry:
+    """
+    Index of all areas of an area tree by uuid, name and slug. The registry is owned by the
+    root area and is kept up to date by Area.add_child and Area.remove_child, so that areas
+    can be looked up in constant time, independently of the size of the tree.
+    Area names and uuids have to be unique in the tree, slugs are expected to be unique.
+    """
+
+    def __init__(self, root_area=None):
+        self._by_uuid = {}
+        self._by_name = {}
+        self._by_slug = {}
+        self._subtree_by_slug = {}
+        if root_area is not None:
+            self.register(root_area)
+
+    def register(self, area):
+        """
+        Adds an area and all its descendants to the registry.
+        Raises AreaException without modifying the registry if a name or uuid is not unique.
+        """
+        new_areas = list(iterate_area_tree(area))
+        names = set()
+        uuids = set()
+        for new_area in new_areas:
+            if new_area.name in names or new_area.name in self._by_name:
+                raise AreaException(f"Area name {new_area.name} is not unique.")
+            if new_area.uuid in uuids or new_area.uuid in self._by_uuid:
+                raise AreaException(f"Area uuid {new_area.uuid} of area {new_area.name} "
+                                    f"is not unique.")
+            names.add(new_area.name)
+            uuids.add(new_area.uuid)
+
+        for new_area in new_areas:
+            self._by_uuid[new_area.uuid] = new_area
+            self._by_name[new_area.name] = new_area
+            self._by_slug[new_area.slug] = new_area
+        self._subtree_by_slug.clear()
+
+    def unregister(self, area):
+        """
+        Removes an area and all its descendants from the registry.
+        """
+        for old_area in iterate_area_tree(area):
+            if self._by_uuid.get(old_area.uuid) is old_area:
+                del self._by_uuid[old_area.uuid]
+            if self._by_name.get(old_area.name) is old_area:
+                del self._by_name[old_area.name]
+            if self._by_slug.get(old_area.slug) is old_area:
+                del self._by_slug[old_area.slug]
+        self._subtree_by_slug.clear()
+
+    @property
+    def by_slug(self):
+        return MappingProxyType(self._by_slug)
+
+    def subtree_by_slug(self, area):
+        """
+        The area and all its descendants by slug. The view is built once per area and
+        dropped whenever areas are added to or removed from the registry.
+        """
+        if area.uuid not in self._subtree_by_slug:
+            self._subtree_by_slug[area.uuid] = MappingProxyType(
+                {subtree_area.slug: subtree_area for subtree_area in iterate_area_tree(area)})
+        return self._subtree_by_slug[area.uuid]
+
+    def get_by_uuid(self, uuid):
+        return self._by_uuid.get(uuid)
+
+    def get_by_name(self, name):
+        return self._by_name.get(name)
+
+    def get_by_slug(self, slug):
+        return self._by_slug.get(slug)
+
+    def __contains__(self, area):
+        return self._by_uuid.get(area.uuid) is area
+
+    def __len__(self):
+        return len(self._by_uuid)
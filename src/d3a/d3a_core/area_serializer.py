@@ -38,6 +38,7 @@ from d3a.models.strategy.finite_power_plant import FinitePowerPlant # NOQA
 from d3a.models.leaves import Leaf # NOQA
 from d3a.models.leaves import *  # NOQA
 from d3a_interface.utils import convert_pendulum_to_str_in_dict, key_in_dict_and_not_none
+from d3a.d3a_core.scenario_payload import ScenarioProfiles
 
 
 class AreaEncoder(json.JSONEncoder):
@@ -102,9 +103,12 @@ def area_to_string(area):
     return json.dumps(area, cls=AreaEncoder)
 
 
-def _instance_from_dict(description):
+def _instance_from_dict(description, profiles=None):
     try:
-        return globals()[description['type']](**description.get('kwargs', dict()))
+        kwargs = description.get('kwargs', dict())
+        if profiles is not None:
+            kwargs = profiles.resolve(kwargs)
+        return globals()[description['type']](**kwargs)
     except Exception as exception:
         if 'type' in description and type(exception) is KeyError:
             raise ValueError("Unknown class '%s'" % description['type'])
@@ -112,7 +116,9 @@ def _instance_from_dict(description):
             raise exception
 
 
-def _leaf_from_dict(description):
+def _leaf_from_dict(description, profiles=None):
+    if profiles is not None:
+        description = profiles.resolve(description)
     leaf_type = globals().get(description.pop('type'), type(None))
     if not issubclass(leaf_type, Leaf):
         raise ValueError("Unknown leaf type '%s'" % leaf_type)
@@ -123,12 +129,17 @@ def _leaf_from_dict(description):
     return leaf_object
 
 
-def area_from_dict(description, config=None):
+def area_from_dict(description, config=None, profiles=None):
+    """
+    Create an area tree from its description. profiles (ScenarioProfiles) resolves the profile
+    references of descriptions that are part of a scenario payload.
+    """
     def optional(attr):
-        return _instance_from_dict(description[attr]) if attr in description else None
+        return _instance_from_dict(description[attr], profiles) \
+            if attr in description else None
     try:
         if 'type' in description:
-            return _leaf_from_dict(description)  # Area is a Leaf
+            return _leaf_from_dict(description, profiles)  # Area is a Leaf
         name = description['name']
         uuid = description.get('uuid', None)
         external_connection_available = description.get('allow_external_connection', False)
@@ -137,7 +148,8 @@ def area_from_dict(description, config=None):
         import_capacity_kVA = description.get('import_capacity_kVA', None)
         export_capacity_kVA = description.get('export_capacity_kVA', None)
         if key_in_dict_and_not_none(description, 'children'):
-            children = [area_from_dict(child) for child in description['children']]
+            children = [area_from_dict(child, profiles=profiles)
+                        for child in description['children']]
         else:
             children = None
         grid_fee_percentage = description.get('grid_fee_percentage', None)
@@ -162,11 +174,7 @@ def area_from_string(string, config=None):
     return area_from_dict(json.loads(string), config)
 
 
-def are_all_areas_unique(area, list_of_areas=set()):
-    assert area.name not in list_of_areas
-    list_of_areas.add(area.name)
-
-    for child in area.children:
-        list_of_areas = are_all_areas_unique(child, list_of_areas)
-
-    return list_of_areas
+def area_from_payload(payload, config=None, profile_store=None):
+    """Create an area tree from a scenario payload (see scenario_payload.pack_scenario)"""
+    return area_from_dict(payload["area"], config,
+                          profiles=ScenarioProfiles(payload, profile_store))
@@ -15,11 +15,11 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
+import json
 import logging
 from logging import getLogger
 
 import click
-import dill
 from click.types import Choice, File
 from click_default_group import DefaultGroup
 from colorlog.colorlog import ColoredFormatter
@@ -34,7 +34,6 @@ from d3a.d3a_core.util import IntervalType, available_simulation_scenarios, \
     read_settings_from_file, update_advanced_settings, convert_str_to_pause_after_interval, \
     DateType
 
-from d3a.d3a_core.simulation import run_simulation
 from d3a.constants import TIME_ZONE, DATE_TIME_FORMAT, DATE_FORMAT, TIME_FORMAT
 from d3a_interface.settings_validators import validate_global_settings
 
@@ -96,6 +95,18 @@ _setup_modules = available_simulation_scenarios
 @click.option('--export-path',  type=str, default=None, show_default=False,
               help="Specify a path for the csv export files (default: ~/d3a-simulation)")
 @click.option('--enable-bc', is_flag=True, default=False, help="Run simulation on Blockchain")
+@click.option('--bc-settlement', 'bc_settlement_mode', default="transaction",
+              type=click.Choice(["transaction", "tick", "slot"]), show_default=True,
+              help="Send every market action to the Blockchain as a separate transaction, "
+                   "or settle them in batches after every tick or slot")
+@click.option('--local-bc', is_flag=True, default=False,
+              help="Run the Blockchain simulation on an in-process chain instead of a node")
+@click.option('--fast-forward', is_flag=True, default=False,
+              help="Skip the remaining ticks of a slot once no offers, bids or "
+                   "tick-driven actions are pending")
+@click.option('--headless', is_flag=True, default=False,
+              help="Run without interactive console and with rate limited progress logging. "
+                   "SIGUSR1 pauses and resumes the simulation, SIGTERM stops it")
 @click.option('--compare-alt-pricing', is_flag=True, default=False,
               help="Compare alternative pricing schemes")
 @click.option('--enable-external-connection', is_flag=True, default=False,
@@ -106,6 +117,8 @@ _setup_modules = available_simulation_scenarios
 def run(setup_module_name, settings_file, slowdown, duration, slot_length, tick_length,
         market_count, cloud_coverage, compare_alt_pricing, enable_external_connection, start_date,
         pause_at, **kwargs):
+    # The simulation is imported on demand, in order to keep the start-up of the cli fast
+    from d3a.d3a_core.simulation import run_simulation
 
     try:
         if settings_file is not None:
@@ -152,8 +165,71 @@ def run(setup_module_name, settings_file, slowdown, duration, slot_length, tick_
         raise click.BadOptionUsage(ex.args[0])
 
 
+@main.command()
+@click.argument('grid-file', type=File(mode='r'))
+@click.option('-d', '--duration', type=IntervalType('D:H'), default="1d", show_default=True,
+              help="Duration of simulation")
+@click.option('-t', '--tick-length', type=IntervalType('M:S'), default="1s", show_default=True,
+              help="Length of a tick")
+@click.option('-s', '--slot-length', type=IntervalType('M:S'), default="15m", show_default=True,
+              help="Length of a market slot")
+@click.option('-c', '--cloud-coverage', type=int,
+              default=ConstSettings.PVSettings.DEFAULT_POWER_PROFILE, show_default=True,
+              help="Cloud coverage, 0 for sunny, 1 for partial coverage, 2 for clouds.")
+@click.option('-m', '--market-count', type=int, default=1, show_default=True,
+              help="Number of tradable market slots into the future")
+@click.option('--setup', 'setup_module_name', default="default_2a",
+              help="Simulation setup module used for runs that do not sweep the setup. "
+                   "Available modules: [{}]".format(', '.join(_setup_modules)))
+@click.option('-g', '--settings-file', default=None,
+              help="Settings file path")
+@click.option('--seed', help="Random seed used for runs that do not sweep the seed")
+@click.option('-p', '--processes', type=int, default=None,
+              help="Maximum number of parallel simulation processes [default: number of CPUs]")
+@click.option('--export-path',  type=str, default=None, show_default=False,
+              help="Root directory of the sweep results (default: ~/d3a-simulation/sweep)")
+@click.option('--resume/--no-resume', default=True, show_default=True,
+              help="Skip the runs that have already been completed by a previous sweep "
+                   "with the same export path")
+@click.option('--start-date', type=DateType(DATE_FORMAT),
+              default=today(tz=TIME_ZONE).format(DATE_FORMAT), show_default=True,
+              help=f"Start date of the Simulation ({DATE_FORMAT})")
+def sweep(grid_file, setup_module_name, settings_file, duration, slot_length, tick_length,
+          market_count, cloud_coverage, start_date, seed, processes, export_path, resume):
+    """
+    Run a parameter sweep. GRID_FILE is a json file that maps the swept parameters to lists
+    of values, e.g. {"setup": ["default_2a"], "seed": [0, 1],
+    "simulation_config": {"slot_length": ["15m", "30m"]},
+    "advanced_settings": {"IAASettings": {"MARKET_TYPE": [1, 2]}}}
+    """
+    from d3a.d3a_core.sweep import SweepRunner
+    try:
+        if settings_file is not None:
+            simulation_settings, advanced_settings = read_settings_from_file(settings_file)
+            update_advanced_settings(advanced_settings)
+            validate_global_settings(simulation_settings)
+            base_settings = simulation_settings
+        else:
+            base_settings = {"sim_duration": duration,
+                             "slot_length": slot_length,
+                             "tick_length": tick_length,
+                             "cloud_coverage": cloud_coverage,
+                             "market_count": market_count}
+            validate_global_settings(base_settings)
+        base_settings["start_date"] = start_date
+
+        runner = SweepRunner(json.load(grid_file), base_settings, setup_module_name,
+                             seed=seed, export_path=export_path, processes=processes,
+                             resume=resume)
+        summary_file = runner.run()
+        log.warning(f"Sweep summary written to {summary_file}")
+    except (D3AException, ValueError) as ex:
+        raise click.BadOptionUsage(ex.args[0])
+
+
 @main.command()
 @click.argument('save-file', type=File(mode='rb'))
 def resume(save_file):
+    import dill
     simulation = dill.load(save_file)
     simulation.run(resume=True)
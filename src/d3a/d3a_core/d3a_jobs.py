@@ -16,6 +16,7 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 import logging
+import resource
 from os import environ, getpid
 import ast
 import json
@@ -126,6 +127,61 @@ def get_simulation_scenarios():
     return available_simulation_scenarios
 
 
+class RecyclingWorker(Worker):
+    """
+    rq worker that stops once a job used more than max_memory_mb, in order to be replaced
+    by a fresh worker of the launcher pool. rq runs every job in a forked work horse, the
+    memory usage is therefore the peak memory of the work horses of the worker.
+    busy_workers is a shared counter of the pool workers that are executing a job.
+    """
+
+    def __init__(self, *args, max_memory_mb=None, busy_workers=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_memory_mb = max_memory_mb
+        self.busy_workers = busy_workers
+
+    def execute_job(self, job, queue):
+        self._update_busy_workers(1)
+        try:
+            super().execute_job(job, queue)
+        finally:
+            self._update_busy_workers(-1)
+        if self.exceeds_max_memory():
+            self.log.info(f"Worker {self.key}: memory limit of {self.max_memory_mb} MB "
+                          f"exceeded, quitting")
+            self._stop_requested = True
+
+    def _update_busy_workers(self, value):
+        if self.busy_workers is not None:
+            with self.busy_workers.get_lock():
+                self.busy_workers.value += value
+
+    @staticmethod
+    def memory_usage_mb():
+        # Work horses are children of the worker that have already terminated when this is
+        # called. ru_maxrss is reported in kilobytes on Linux
+        return resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+
+    def exceeds_max_memory(self):
+        return self.max_memory_mb is not None and self.memory_usage_mb() > self.max_memory_mb
+
+
+def run_pool_worker(redis_url, max_jobs=None, max_memory_mb=None, busy_workers=None):
+    """
+    Entry point of the workers that are forked by the launcher, after all modules that are
+    needed for running a simulation have already been imported.
+    The redis connection is created after the fork, connections must not be shared between
+    processes.
+    """
+    with Connection(StrictRedis.from_url(redis_url, retry_on_timeout=True)):
+        RecyclingWorker(
+            ['d3a'],
+            name='simulation.{}.{:%s}'.format(getpid(), now()),
+            max_memory_mb=max_memory_mb,
+            busy_workers=busy_workers
+        ).work(max_jobs=max_jobs)
+
+
 def main():
     with Connection(StrictRedis.from_url(environ.get('REDIS_URL', 'redis://localhost'),
                                          retry_on_timeout=True)):
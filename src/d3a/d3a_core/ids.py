@@ -0,0 +1,77 @@
+"""
+Copyright 2018 Grid Singularity
+This file is part of D3A.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import uuid
+from itertools import count
+from random import Random
+
+from d3a.d3a_core.exceptions import D3AException
+
+# compact: short hexadecimal strings of a counter that is shared by all markets of a simulation
+# uuid: uuid4 strings, for external clients that expect uuids
+ID_MODES = ("compact", "uuid")
+
+
+class IdGenerator:
+    """
+    Generates the ids of the markets, offers, bids and trades of a simulation. Compact ids only
+    depend on the order in which they are created, seeded generators also create reproducible
+    uuids.
+    """
+    def __init__(self, mode="compact", seed=None):
+        if mode not in ID_MODES:
+            raise D3AException(f"Invalid id mode {mode}, valid modes are {ID_MODES}.")
+        self.mode = mode
+        self._counter = count(1)
+        self._random = Random(seed) if seed is not None else None
+
+    def new_id(self):
+        if self.mode == "compact":
+            return format(next(self._counter), "x")
+        if self._random is None:
+            return str(uuid.uuid4())
+        return str(uuid.UUID(int=self._random.getrandbits(128), version=4))
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        next_value = next(self._counter)
+        self._counter = count(next_value)
+        state["_counter"] = next_value
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._counter = count(state["_counter"])
+
+
+_generator = IdGenerator()
+
+
+def new_id():
+    """
+    Returns a new id of the id generator of the running simulation.
+    """
+    return _generator.new_id()
+
+
+def get_id_generator():
+    return _generator
+
+
+def set_id_generator(generator):
+    global _generator
+    _generator = generator
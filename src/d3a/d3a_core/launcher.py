@@ -15,45 +15,93 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
-import sys
 import os
 import click
+import multiprocessing
 
 from datetime import datetime, timedelta
+from importlib import import_module
+from logging import getLogger
 from redis import StrictRedis
 from rq import Queue
-from subprocess import Popen
 from time import sleep
-import platform
 
+log = getLogger(__name__)
 
 REDIS_URL = os.environ.get('REDIS_URL', 'redis://localhost')
 MAX_JOBS = os.environ.get('D3A_MAX_JOBS_PER_POD', 2)
+MAX_JOBS_PER_WORKER = os.environ.get('D3A_MAX_JOBS_PER_WORKER', 50)
+MAX_WORKER_MEMORY_MB = os.environ.get('D3A_MAX_WORKER_MEMORY_MB', 2048)
+
+# Modules that are imported by the launcher before forking the workers
+WARM_MODULES = ['d3a.setup.json_arg', 'd3a.setup.default_2a']
 
 
 class Launcher:
+    """
+    Keeps a pool of rq workers for the d3a queue. The workers are forked from the launcher
+    process after the simulation modules have been imported and the csv profiles have been
+    parsed, so that a job does not pay the interpreter start-up and import time.
+    The pool is scaled up on the number of queued jobs that can not be picked up by an idle
+    worker, or if jobs have been waiting longer than max_delay_seconds. Workers stop after
+    max_jobs_per_worker jobs or once they exceed max_worker_memory_mb, and are replaced if
+    the pool drops below min_workers.
+    """
+
     def __init__(self,
                  queue=None,
                  max_jobs=None,
-                 max_delay_seconds=2):
+                 max_delay_seconds=2,
+                 min_workers=1,
+                 max_jobs_per_worker=None,
+                 max_worker_memory_mb=None,
+                 poll_interval_seconds=0.2,
+                 worker_target=None):
         self.queue = queue or Queue('d3a', connection=StrictRedis.from_url(
             REDIS_URL, retry_on_timeout=True))
         self.max_jobs = max_jobs if max_jobs is not None else int(MAX_JOBS)
         self.max_delay = timedelta(seconds=max_delay_seconds)
-        python_executable = sys.executable \
-            if platform.python_implementation() != "PyPy" \
-            else "pypy3"
-        self.command = [python_executable, 'src/d3a/d3a_core/d3a_jobs.py']
+        self.min_workers = min(min_workers, self.max_jobs)
+        self.max_jobs_per_worker = max_jobs_per_worker \
+            if max_jobs_per_worker is not None else int(MAX_JOBS_PER_WORKER)
+        self.max_worker_memory_mb = max_worker_memory_mb \
+            if max_worker_memory_mb is not None else int(MAX_WORKER_MEMORY_MB)
+        self.poll_interval_seconds = poll_interval_seconds
+        self.worker_target = worker_target
+        self._context = multiprocessing.get_context("fork")
+        self.busy_workers = self._context.Value('i', 0)
         self.job_array = []
 
+    def warm_up(self):
+        if self.worker_target is None:
+            from d3a.d3a_core.d3a_jobs import run_pool_worker
+            self.worker_target = run_pool_worker
+        for module_name in WARM_MODULES:
+            import_module(module_name)
+        from d3a.models.read_user_profile import preload_resource_profiles
+        preload_resource_profiles()
+
     def run(self):
-        self.job_array.append(self._start_worker())
+        self.warm_up()
         while True:
-            sleep(1)
-            if len(self.job_array) < self.max_jobs and self.is_crowded():
-                self.job_array.append(self._start_worker())
-
-            self.job_array = [j for j in self.job_array if j.poll() is None]
+            self.scale()
+            sleep(self.poll_interval_seconds)
+
+    def scale(self):
+        self.job_array = [w for w in self.job_array if w.is_alive()]
+        for _ in range(self.workers_to_start()):
+            self.job_array.append(self._start_worker())
+
+    def workers_to_start(self):
+        free_slots = self.max_jobs - len(self.job_array)
+        if free_slots <= 0:
+            return 0
+        idle_workers = max(len(self.job_array) - self.busy_workers.value, 0)
+        waiting_jobs = max(self.queue.count - idle_workers, 0)
+        if waiting_jobs == 0 and self.is_crowded():
+            waiting_jobs = 1
+        missing_workers = max(self.min_workers - len(self.job_array), waiting_jobs)
+        return min(free_slots, missing_workers)
 
     def is_crowded(self):
         enqueued = self.queue.jobs
@@ -64,9 +112,13 @@ class Launcher:
         return False
 
     def _start_worker(self):
-        job_environment = os.environ
-        job_environment['REDIS_URL'] = REDIS_URL
-        return Popen(self.command, env=job_environment)
+        worker = self._context.Process(
+            target=self.worker_target,
+            args=(REDIS_URL, self.max_jobs_per_worker, self.max_worker_memory_mb,
+                  self.busy_workers))
+        worker.start()
+        log.debug(f"Started worker {worker.pid}, {len(self.job_array) + 1} workers running.")
+        return worker
 
 
 @click.command()
@@ -18,19 +18,21 @@ class CreateAreaEvent:
         self.area_representation = area_represenation
         self.created_area = area_from_dict(self.area_representation, self.config)
 
+    def target_area(self, registry):
+        return registry.get_by_uuid(self.parent_uuid)
+
     def apply(self, area):
         if area.uuid != self.parent_uuid:
             return False
         try:
             # The order of the following activation calls matters:
-            self.created_area.parent = area
-            area.children.append(self.created_area)
+            area.add_child(self.created_area)
             self.created_area.activate(current_tick=area.current_tick)
             if self.created_area.strategy:
                 self.created_area.strategy.event_activate()
         except Exception as e:
             if self.created_area in area.children:
-                area.children.remove(self.created_area)
+                area.remove_child(self.created_area)
             raise e
         return True
 
@@ -44,6 +46,9 @@ class UpdateAreaEvent:
         self.area_uuid = area_uuid
         self.area_params = area_params
 
+    def target_area(self, registry):
+        return registry.get_by_uuid(self.area_uuid)
+
     def apply(self, area):
         if area.uuid != self.area_uuid:
             return False
@@ -59,11 +64,17 @@ class DeleteAreaEvent:
     def __init__(self, area_uuid):
         self.area_uuid = area_uuid
 
+    def target_area(self, registry):
+        # The event is applied to the parent of the deleted area
+        area = registry.get_by_uuid(self.area_uuid)
+        return area.parent if area is not None else None
+
     def apply(self, area):
-        if self.area_uuid not in [c.uuid for c in area.children]:
+        deleted_area = next((c for c in area.children if c.uuid == self.area_uuid), None)
+        if deleted_area is None:
             return False
 
-        area.children = [c for c in area.children if c.uuid != self.area_uuid]
+        area.remove_child(deleted_area)
         if len(area.children) == 0:
             # TODO: D3ASIM-2560; Please also catch the case for multiple future markets
             # TODO: as a re-initiation would delete all results of future markets.
@@ -101,20 +112,17 @@ class LiveEvents:
                     self.event_buffer = []
                 raise Exception(e)
 
-    def _handle_event(self, area, event):
+    @staticmethod
+    def _handle_event(root_area, event):
+        area = event.target_area(root_area.registry)
+        if area is None:
+            return False
         try:
-            if event.apply(area) is True:
-                return True
+            return event.apply(area) is True
         except Exception as e:
             logging.error(f"Event {event} failed to apply on area {area.name}. "
                           f"Exception: {e}. Traceback: {traceback.format_exc()}")
             return False
-        if not area.children:
-            return False
-        for child in area.children:
-            if self._handle_event(child, event) is True:
-                return True
-        return False
 
     def handle_all_events(self, root_area):
         with self.lock:
@@ -22,8 +22,6 @@ import time
 from logging import getLogger
 from redis import StrictRedis
 from redis.exceptions import ConnectionError
-from rq import get_current_job
-from rq.exceptions import NoSuchJobError
 from d3a_interface.results_validator import results_validator
 from d3a_interface.constants_limits import HeartBeat
 from d3a_interface.utils import RepeatingTimer
@@ -173,6 +171,9 @@ class RedisSimulationCommunication:
         )
 
     def _handle_redis_job_metadata(self):
+        # rq is only needed by simulations that are run as rq jobs
+        from rq import get_current_job
+        from rq.exceptions import NoSuchJobError
         should_exit = True
         try:
             job = get_current_job()
@@ -0,0 +1,203 @@
+"""
+Copyright 2018 Grid Singularity
+This file is part of D3A.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import hashlib
+import os
+import pickle
+from copy import copy
+from zlib import compress, decompress
+
+from d3a.d3a_core.exceptions import D3AException
+
+"""
+Scenario payloads store the profiles of an area description (device parameters with large
+values, e.g. inline load or pv profiles) by content hash. Every distinct profile is only
+contained once in the payload, or in a profile store that is shared between the submitter
+and the workers (redis or a file cache), and is only decompressed when the first area that
+uses it is created by area_from_dict.
+
+Payload structure:
+{"scenario_payload_version": 1,
+ "area": <area description, profiles replaced by {"__profile__": <hash>}>,
+ "profiles": {<hash>: <zlib compressed pickled profile>}}
+"""
+
+SCENARIO_PAYLOAD_VERSION = 1
+PROFILE_REFERENCE_KEY = "__profile__"
+# Parameters whose pickled value is smaller than this are kept inline in the area description
+MIN_PROFILE_SIZE_BYTES = 256
+PROFILE_CACHE_DIR = os.environ.get("D3A_PROFILE_CACHE_DIR", None)
+
+
+class FileProfileStore:
+    """
+    Profile store that keeps one file per profile in a (shared) directory.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def _file_path(self, profile_hash):
+        return os.path.join(self.path, profile_hash)
+
+    def get(self, profile_hash):
+        try:
+            with open(self._file_path(profile_hash), "rb") as profile_file:
+                return profile_file.read()
+        except FileNotFoundError:
+            return None
+
+    def set(self, profile_hash, data):
+        # Write to a temporary file first, so that readers never see partial profiles
+        temporary_path = f"{self._file_path(profile_hash)}.{os.getpid()}.tmp"
+        with open(temporary_path, "wb") as profile_file:
+            profile_file.write(data)
+        os.replace(temporary_path, self._file_path(profile_hash))
+
+
+class RedisProfileStore:
+    """
+    Profile store that keeps the profiles as redis keys.
+    """
+
+    def __init__(self, redis_db, key_prefix="d3a-profile:", expiry_seconds=7 * 24 * 3600):
+        self.redis_db = redis_db
+        self.key_prefix = key_prefix
+        self.expiry_seconds = expiry_seconds
+
+    def get(self, profile_hash):
+        return self.redis_db.get(self.key_prefix + profile_hash)
+
+    def set(self, profile_hash, data):
+        self.redis_db.set(self.key_prefix + profile_hash, data, ex=self.expiry_seconds)
+
+
+def default_profile_store():
+    """
+    Profile store of the workers, the file cache if D3A_PROFILE_CACHE_DIR is set,
+    otherwise the redis instance of the job queue.
+    """
+    if PROFILE_CACHE_DIR is not None:
+        return FileProfileStore(PROFILE_CACHE_DIR)
+    from redis import StrictRedis
+    from d3a.d3a_core.redis_connections.redis_communication import REDIS_URL
+    return RedisProfileStore(StrictRedis.from_url(REDIS_URL, retry_on_timeout=True))
+
+
+def is_scenario_payload(scenario):
+    return isinstance(scenario, dict) and "scenario_payload_version" in scenario
+
+
+def _is_profile_reference(value):
+    return isinstance(value, dict) and len(value) == 1 and PROFILE_REFERENCE_KEY in value
+
+
+def _pack_parameters(parameters, profiles, references, min_profile_size):
+    packed = {}
+    for key, value in parameters.items():
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL) \
+            if isinstance(value, (str, dict, list, tuple)) else None
+        if data is None or len(data) < min_profile_size:
+            packed[key] = value
+            continue
+        profile_hash = hashlib.sha256(data).hexdigest()
+        if profile_hash not in profiles:
+            profiles[profile_hash] = compress(data)
+            references[profile_hash] = {PROFILE_REFERENCE_KEY: profile_hash}
+        # All parameters share the same reference object, which is pickled only once
+        packed[key] = references[profile_hash]
+    return packed
+
+
+def _pack_area(description, profiles, references, min_profile_size):
+    if 'type' in description:
+        # Leaf, the parameters of the strategy are part of the description
+        return _pack_parameters(description, profiles, references, min_profile_size)
+    packed = dict(description)
+    for attr in ('strategy', 'appliance', 'budget_keeper'):
+        if attr in packed and 'kwargs' in packed[attr]:
+            packed[attr] = dict(packed[attr], kwargs=_pack_parameters(
+                packed[attr]['kwargs'], profiles, references, min_profile_size))
+    if packed.get('children'):
+        packed['children'] = [_pack_area(child, profiles, references, min_profile_size)
+                              for child in packed['children']]
+    return packed
+
+
+def pack_scenario(area_description, profile_store=None,
+                  min_profile_size=MIN_PROFILE_SIZE_BYTES):
+    """
+    Converts an area description to a scenario payload. If a profile store is provided, the
+    profiles are written to the store instead of being contained in the payload.
+    """
+    profiles = {}
+    payload = {
+        "scenario_payload_version": SCENARIO_PAYLOAD_VERSION,
+        "area": _pack_area(area_description, profiles, {}, min_profile_size),
+        "profiles": profiles
+    }
+    if profile_store is not None:
+        for profile_hash, data in profiles.items():
+            profile_store.set(profile_hash, data)
+        payload["profiles"] = {}
+    return payload
+
+
+def encode_scenario(area_description, profile_store=None):
+    """
+    Scenario payload in the format of the job queue, see
+    d3a_jobs.decompress_and_decode_queued_strings.
+    """
+    return compress(pickle.dumps(pack_scenario(area_description, profile_store)))
+
+
+class ScenarioProfiles:
+    """
+    Resolves the profile references of a scenario payload. Profiles are decompressed on first
+    use and shared between all areas that reference them.
+    """
+
+    def __init__(self, payload, profile_store=None):
+        self._compressed_profiles = payload.get("profiles", {})
+        self._profile_store = profile_store
+        self._profiles = {}
+
+    def __getitem__(self, profile_hash):
+        if profile_hash not in self._profiles:
+            data = self._compressed_profiles.get(profile_hash)
+            if data is None and self._profile_store is not None:
+                data = self._profile_store.get(profile_hash)
+            if data is None:
+                raise D3AException(f"Profile {profile_hash} of the scenario is not available.")
+            self._profiles[profile_hash] = pickle.loads(decompress(data))
+        return self._profiles[profile_hash]
+
+    def resolve(self, parameters):
+        """
+        Returns the parameters with all profile references replaced by their profiles.
+        Strings are shared between the areas, containers are copied since strategies may
+        modify them.
+        """
+        resolved = {}
+        for key, value in parameters.items():
+            if _is_profile_reference(value):
+                value = self[value[PROFILE_REFERENCE_KEY]]
+                if isinstance(value, (dict, list)):
+                    value = copy(value)
+            resolved[key] = value
+        return resolved
@@ -23,37 +23,32 @@ from time import sleep
 from pathlib import Path
 import dill
 import click
-import platform
 
 from pendulum import DateTime
 from pendulum import duration
 from pendulum.period import Period
 from pickle import HIGHEST_PROTOCOL
-from ptpython.repl import embed
 
-from d3a.d3a_core.area_serializer import are_all_areas_unique
 from d3a.constants import TIME_ZONE, DATE_TIME_FORMAT, SIMULATION_PAUSE_TIMEOUT
 from d3a.d3a_core.exceptions import SimulationException
-from d3a.d3a_core.export import ExportAndPlot
 from d3a.models.config import SimulationConfig
-from d3a.models.power_flow.pandapower import PandaPowerFlow
 # noinspection PyUnresolvedReferences
+import d3a.constants
 from d3a import setup as d3a_setup  # noqa
 from d3a.d3a_core.util import NonBlockingConsole, validate_const_settings_for_simulation, \
-    get_market_slot_time_str
+    get_market_slot_time_str, enable_trace_buffer, dump_trace_buffer
 from d3a.d3a_core.sim_results.endpoint_buffer import SimulationEndpointBuffer
 from d3a.d3a_core.redis_connections.redis_communication import RedisSimulationCommunication
 from d3a_interface.constants_limits import ConstSettings, GlobalConfig
 from d3a.d3a_core.exceptions import D3AException
+from d3a.d3a_core.ids import IdGenerator, get_id_generator, set_id_generator
 from d3a.models.area.event_deserializer import deserialize_events_to_areas
 from d3a.d3a_core.live_events import LiveEvents
+from d3a.d3a_core.tick_scheduler import TickScheduler
 import os
-import psutil
-import gc
-
-if platform.python_implementation() != "PyPy" and \
-        ConstSettings.BlockchainSettings.BC_INSTALLED is True:
-    from d3a.blockchain import BlockChainInterface
+import logging
+import signal
+import threading
 
 log = getLogger(__name__)
 
@@ -81,7 +76,9 @@ class Simulation:
                  simulation_events: str = None, slowdown: int = 0, seed=None,
                  paused: bool = False, pause_after: duration = None, repl: bool = False,
                  no_export: bool = False, export_path: str = None,
-                 export_subdir: str = None, redis_job_id=None, enable_bc=False):
+                 export_subdir: str = None, redis_job_id=None, enable_bc=False,
+                 bc_settlement_mode: str = "transaction", local_bc: bool = False,
+                 fast_forward: bool = False, headless: bool = False):
         self.initial_params = dict(
             slowdown=slowdown,
             seed=seed,
@@ -105,6 +102,13 @@ class Simulation:
 
         self.setup_module_name = setup_module_name
         self.use_bc = enable_bc
+        self.bc_settlement_mode = bc_settlement_mode
+        self.use_local_bc = local_bc
+        self.fast_forward = fast_forward
+        self.headless = headless
+        # Set whenever the pause state or the slowdown changes, headless simulations only
+        # check this flag between ticks
+        self._control_requested = False
         self.is_stopped = False
 
         self.live_events = LiveEvents(self.simulation_config)
@@ -122,6 +126,8 @@ class Simulation:
 
         validate_const_settings_for_simulation()
         if self.export_on_finish and not self.redis_connection.is_enabled():
+            # Plotly is only imported for simulations that export their results
+            from d3a.d3a_core.export import ExportAndPlot
             self.export = ExportAndPlot(self.area, self.export_path, self.export_subdir,
                                         self.endpoint_buffer)
 
@@ -157,6 +163,15 @@ class Simulation:
             raise SimulationException(
                 "Invalid setup module '{}'".format(self.setup_module_name)) from ex
 
+    @property
+    def slowdown(self):
+        return self._slowdown
+
+    @slowdown.setter
+    def slowdown(self, slowdown):
+        self._slowdown = slowdown
+        self._control_requested = True
+
     def _init(self, slowdown, seed, paused, pause_after, redis_job_id):
         self.paused = paused
         self.pause_after = pause_after
@@ -169,6 +184,15 @@ class Simulation:
             random.seed(random_seed)
             self.initial_params["seed"] = random_seed
             log.info("Random seed: {}".format(random_seed))
+        if self.simulation_config is not None and \
+                self.simulation_config.external_redis_communicator.is_enabled:
+            # External clients expect uuids that are unique across simulations
+            set_id_generator(IdGenerator("uuid"))
+        else:
+            set_id_generator(IdGenerator(d3a.constants.ID_MODE,
+                                         seed=int(self.initial_params["seed"])))
+        if d3a.constants.TRACE_BUFFER_SIZE > 0:
+            enable_trace_buffer(d3a.constants.TRACE_BUFFER_SIZE)
 
         self.area = self.setup_module.get_setup(self.simulation_config)
         self.endpoint_buffer = SimulationEndpointBuffer(
@@ -177,20 +201,39 @@ class Simulation:
 
         self._update_and_send_results()
 
+        self.power_flow_worker = None
         if GlobalConfig.POWER_FLOW:
+            from d3a.models.power_flow.pandapower import PandaPowerFlow
             self.power_flow = PandaPowerFlow(self.area)
             self.power_flow.run_power_flow()
+            if d3a.constants.POWER_FLOW_TIME_SERIES:
+                from d3a.models.power_flow.time_series import PowerFlowWorker
+                self.power_flow_worker = PowerFlowWorker(self.power_flow)
         self.bc = None
-        if self.use_bc:
-            self.bc = BlockChainInterface()
+        if self.use_bc and self.use_local_bc:
+            from d3a.blockchain.local_chain import LocalBlockChainInterface
+            self.bc = LocalBlockChainInterface(settlement_mode=self.bc_settlement_mode)
+        elif self.use_bc:
+            from d3a.blockchain import BlockChainInterface
+            self.bc = BlockChainInterface(settlement_mode=self.bc_settlement_mode)
         log.debug("Starting simulation with config %s", self.simulation_config)
 
         self._set_traversal_length()
 
-        are_all_areas_unique(self.area, set())
+        # Building the area registry validates that all area names are unique
+        self.area.registry
 
         self.area.activate(self.bc)
 
+    def _is_fast_forward_possible(self):
+        # Ticks can not be skipped if they are paced by wall clock time or if external
+        # clients are connected to the simulation
+        return self.fast_forward and \
+            not self.slowdown and \
+            not ConstSettings.GeneralSettings.RUN_REAL_TIME and \
+            not ConstSettings.GeneralSettings.EVENT_DISPATCHING_VIA_REDIS and \
+            not self.simulation_config.external_redis_communicator.is_enabled
+
     @property
     def finished(self):
         return self.area.current_tick >= self.area.config.total_ticks
@@ -238,13 +281,19 @@ class Simulation:
                 slot_resume = tick_resume = 0
 
             try:
-                self._run_cli_execute_cycle(slot_resume, tick_resume) \
-                    if self._started_from_cli \
-                    else self._execute_simulation(slot_resume, tick_resume)
+                if self.headless:
+                    self._run_headless_execute_cycle(slot_resume, tick_resume)
+                elif self._started_from_cli:
+                    self._run_cli_execute_cycle(slot_resume, tick_resume)
+                else:
+                    self._execute_simulation(slot_resume, tick_resume)
             except KeyboardInterrupt:
                 break
             except SimulationResetException:
                 break
+            except Exception:
+                dump_trace_buffer()
+                raise
             else:
                 break
 
@@ -252,6 +301,24 @@ class Simulation:
         with NonBlockingConsole() as console:
             self._execute_simulation(slot_resume, tick_resume, console)
 
+    def _run_headless_execute_cycle(self, slot_resume, tick_resume):
+        """
+        Runs the simulation without console, SIGUSR1 toggles the pause and SIGTERM stops it.
+        """
+        if threading.current_thread() is not threading.main_thread() or \
+                not hasattr(signal, "SIGUSR1"):
+            self._execute_simulation(slot_resume, tick_resume)
+            return
+        previous_handlers = {
+            signal.SIGUSR1: signal.signal(signal.SIGUSR1, lambda *_: self.toggle_pause()),
+            signal.SIGTERM: signal.signal(signal.SIGTERM, lambda *_: self.stop())
+        }
+        try:
+            self._execute_simulation(slot_resume, tick_resume)
+        finally:
+            for signal_number, handler in previous_handlers.items():
+                signal.signal(signal_number, handler)
+
     def _update_and_send_results(self, is_final=False):
         self.endpoint_buffer.update_stats(self.area, self.status, self.progress_info)
         if not self.redis_connection.is_enabled():
@@ -282,26 +349,46 @@ class Simulation:
         self.progress_info.next_slot_str = get_market_slot_time_str(
             slot_no + 1, self.simulation_config)
 
+    def _report_progress(self, slot_no, slot_count):
+        self._update_progress_info(slot_no, slot_count)
+
+        if self.headless:
+            # Only the progress log is rate limited, the progress info is sent with the stats
+            now = time.monotonic()
+            if now < self._next_progress_report:
+                return
+            self._next_progress_report = now + d3a.constants.HEADLESS_PROGRESS_INTERVAL
+
+        log.warning(
+            "Slot %d of %d (%2.0f%%) - %s elapsed, ETA: %s",
+            slot_no + 1,
+            slot_count,
+            self.progress_info.percentage_completed,
+            self.progress_info.elapsed_time,
+            self.progress_info.eta
+        )
+
+    def _paced_tick_length_s(self):
+        """
+        Wall clock duration of a tick, 0 if the simulation is not paced.
+        """
+        tick_length_s = self.simulation_config.tick_length.total_seconds()
+        if ConstSettings.GeneralSettings.RUN_REAL_TIME:
+            return tick_length_s
+        return tick_length_s * self.slowdown / SLOWDOWN_FACTOR
+
     def _execute_simulation(self, slot_resume, tick_resume, console=None):
         config = self.simulation_config
-        tick_lengths_s = config.tick_length.total_seconds()
         slot_count = int(config.sim_duration / config.slot_length)
+        self.tick_scheduler = TickScheduler(self._paced_tick_length_s())
+        self._next_progress_report = 0
 
         self.simulation_config.external_redis_communicator.sub_to_aggregator()
         self.simulation_config.external_redis_communicator.start_communication()
         self._update_and_send_results()
         for slot_no in range(slot_resume, slot_count):
 
-            self._update_progress_info(slot_no, slot_count)
-
-            log.warning(
-                "Slot %d of %d (%2.0f%%) - %s elapsed, ETA: %s",
-                slot_no + 1,
-                slot_count,
-                self.progress_info.percentage_completed,
-                self.progress_info.elapsed_time,
-                self.progress_info.eta
-            )
+            self._report_progress(slot_no, slot_count)
 
             if self.is_stopped:
                 log.info("Received stop command.")
@@ -312,48 +399,63 @@ class Simulation:
 
             self.area._cycle_markets()
 
-            gc.collect()
-            process = psutil.Process(os.getpid())
-            mbs_used = process.memory_info().rss / 1000000.0
-            log.debug(f"Used {mbs_used} MBs.")
-
-            for tick_no in range(tick_resume, config.ticks_per_slot):
-                tick_start = time.time()
-
-                self._handle_paused(console, tick_start)
+            if log.isEnabledFor(logging.DEBUG):
+                import psutil
+                process = psutil.Process(os.getpid())
+                mbs_used = process.memory_info().rss / 1000000.0
+                log.debug(f"Used {mbs_used} MBs.")
 
-                # reset tick_resume after possible resume
+            if self.headless:
+                self._execute_headless_ticks(tick_resume)
                 tick_resume = 0
-                log.trace(
-                    "Tick %d of %d in slot %d (%2.0f%%)",
-                    tick_no + 1,
-                    config.ticks_per_slot,
-                    slot_no + 1,
-                    (tick_no + 1) / config.ticks_per_slot * 100,
-                )
-
-                self.simulation_config.external_redis_communicator.\
-                    approve_aggregator_commands()
-
-                self.area.tick_and_dispatch()
-
-                self.simulation_config.external_redis_communicator.\
-                    publish_aggregator_commands_responses_events()
-
-                realtime_tick_length = time.time() - tick_start
-                if self.slowdown and realtime_tick_length < tick_lengths_s:
-                    # Simulation runs faster than real time but a slowdown was
-                    # requested
-                    tick_diff = tick_lengths_s - realtime_tick_length
-                    diff_slowdown = tick_diff * self.slowdown / SLOWDOWN_FACTOR
-                    log.trace("Slowdown: %.4f", diff_slowdown)
+            else:
+                for tick_no in range(tick_resume, config.ticks_per_slot):
+                    self._handle_paused(console, time.time())
+
+                    # reset tick_resume after possible resume
+                    tick_resume = 0
+
+                    if self._is_fast_forward_possible() and \
+                            not self.area.has_pending_tick_actions():
+                        log.trace("Fast-forwarding %d ticks in slot %d",
+                                  config.ticks_per_slot - tick_no, slot_no + 1)
+                        for _ in range(tick_no, config.ticks_per_slot):
+                            self.area.fast_forward_tick()
+                        break
+                    log.trace(
+                        "Tick %d of %d in slot %d (%2.0f%%)",
+                        tick_no + 1,
+                        config.ticks_per_slot,
+                        slot_no + 1,
+                        (tick_no + 1) / config.ticks_per_slot * 100,
+                    )
+
+                    self.simulation_config.external_redis_communicator.\
+                        approve_aggregator_commands()
+
+                    self.area.tick_and_dispatch()
+                    if self.bc is not None:
+                        self.bc.settle()
+
+                    self.simulation_config.external_redis_communicator.\
+                        publish_aggregator_commands_responses_events()
+
+                    # The slowdown can be changed from the console and via redis while running
+                    paced_tick_length_s = self._paced_tick_length_s()
+                    if paced_tick_length_s != self.tick_scheduler.tick_length_s:
+                        self.tick_scheduler.tick_length_s = paced_tick_length_s
                     if console is not None:
-                        self._handle_input(console, diff_slowdown)
+                        self.tick_scheduler.wait_for_next_tick(
+                            lambda delay: self._handle_input(console, delay))
                     else:
-                        sleep(diff_slowdown)
+                        self.tick_scheduler.wait_for_next_tick()
 
-                if ConstSettings.GeneralSettings.RUN_REAL_TIME:
-                    sleep(abs(tick_lengths_s - realtime_tick_length))
+            if self.bc is not None:
+                self.bc.settle(end_of_slot=True)
+            if self.power_flow_worker is not None and self.area.next_market is not None:
+                self.power_flow_worker.submit_slot(
+                    self.area.next_market.time_slot,
+                    self.power_flow.slot_injections_kW(config.slot_length))
 
             self._update_and_send_results()
             if self.export_on_finish and not self.redis_connection.is_enabled():
@@ -361,6 +463,8 @@ class Simulation:
 
         self.sim_status = "finished"
         self.deactivate_areas(self.area)
+        if self.power_flow_worker is not None:
+            self.power_flow_worker.shutdown()
 
         if not self.is_stopped:
             self._update_progress_info(slot_count - 1, slot_count)
@@ -371,6 +475,10 @@ class Simulation:
                 " ({} paused)".format(paused_duration) if paused_duration else "",
                 config.sim_duration / (self.progress_info.elapsed_time - paused_duration)
             )
+            if self.tick_scheduler.lateness.tick_count:
+                log.info("Tick lateness: %s", self.tick_scheduler.lateness)
+            if self.bc is not None:
+                self.bc.log_settlement_stats()
 
         self._update_and_send_results(is_final=True)
         if self.export_on_finish and not self.redis_connection.is_enabled():
@@ -384,6 +492,48 @@ class Simulation:
         if self.use_repl:
             self._start_repl()
 
+    def _execute_headless_ticks(self, tick_resume):
+        """
+        Tick loop of headless simulations, that only checks for pause and slowdown changes if
+        they were requested.
+        """
+        ticks_per_slot = self.simulation_config.ticks_per_slot
+        communicator = self.simulation_config.external_redis_communicator
+        area = self.area
+        tick_scheduler = self.tick_scheduler
+        if self.pause_after and self.time_since_start >= self.pause_after:
+            self.pause_after = None
+            self.toggle_pause()
+        fast_forward = self._is_fast_forward_possible()
+
+        for tick_no in range(tick_resume, ticks_per_slot):
+            if self._control_requested:
+                self._handle_control_request()
+                fast_forward = self._is_fast_forward_possible()
+
+            if fast_forward and not area.has_pending_tick_actions():
+                for _ in range(tick_no, ticks_per_slot):
+                    area.fast_forward_tick()
+                return
+
+            communicator.approve_aggregator_commands()
+            area.tick_and_dispatch()
+            if self.bc is not None:
+                self.bc.settle()
+            communicator.publish_aggregator_commands_responses_events()
+
+            tick_scheduler.wait_for_next_tick()
+
+    def _handle_control_request(self):
+        self._control_requested = False
+        if self.paused:
+            log.critical("Simulation paused. Send SIGUSR1 to resume or resume from API.")
+            self._handle_paused(None, time.time())
+            log.critical("Simulation resumed")
+        paced_tick_length_s = self._paced_tick_length_s()
+        if paced_tick_length_s != self.tick_scheduler.tick_length_s:
+            self.tick_scheduler.tick_length_s = paced_tick_length_s
+
     @property
     def should_export_plots(self):
         return not self.redis_connection.is_enabled()
@@ -392,6 +542,7 @@ class Simulation:
         if self.finished:
             return False
         self.paused = not self.paused
+        self._control_requested = True
         return True
 
     def _handle_input(self, console, sleep: float = 0):
@@ -460,6 +611,7 @@ class Simulation:
             else:
                 self._update_and_send_results()
             start = time.time()
+            self.tick_scheduler.pause()
         while self.paused:
             paused_flag = True
             if console:
@@ -469,6 +621,7 @@ class Simulation:
                 self.is_stopped = True
                 self.paused = False
             sleep(0.5)
+        self.tick_scheduler.resume()
 
         if console and paused_flag:
             log.critical("Simulation resumed")
@@ -500,6 +653,7 @@ class Simulation:
             "An interactive REPL has been started. The root Area is available as "
             "`root_area`.")
         log.debug("Ctrl-D to quit.")
+        from ptpython.repl import embed
         embed({'root_area': self.area})
 
     def save_state(self):
@@ -527,11 +681,13 @@ class Simulation:
     def __getstate__(self):
         state = self.__dict__.copy()
         state['_random_state'] = random.getstate()
+        state['_id_generator'] = get_id_generator()
         del state['setup_module']
         return state
 
     def __setstate__(self, state):
         random.setstate(state.pop('_random_state'))
+        set_id_generator(state.pop('_id_generator'))
         self.__dict__.update(state)
         self._load_setup_module()
 
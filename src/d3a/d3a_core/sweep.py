@@ -0,0 +1,269 @@
+"""
+Copyright 2018 Grid Singularity
+This file is part of D3A.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import csv
+import hashlib
+import itertools
+import json
+import multiprocessing
+import os
+import pathlib
+import time
+import traceback
+from logging import getLogger
+
+from d3a_interface.settings_validators import validate_global_settings
+from d3a_interface.utils import mkdir_from_str
+
+from d3a.d3a_core.simulation import Simulation
+from d3a.d3a_core.util import IntervalType, update_advanced_settings
+from d3a.models.config import SimulationConfig
+from d3a.models.read_user_profile import preload_resource_profiles
+
+log = getLogger(__name__)
+
+SWEEP_SUMMARY_FILE = "sweep_summary.csv"
+SWEEP_RUN_PARAMETERS_FILE = "sweep_parameters.json"
+
+SETUP_KEY = "setup"
+SEED_KEY = "seed"
+SIMULATION_CONFIG_KEY = "simulation_config"
+ADVANCED_SETTINGS_KEY = "advanced_settings"
+
+KPI_FIELDS = ("self_sufficiency", "self_consumption", "total_energy_demanded_wh",
+              "total_energy_produced_wh", "total_self_consumption_wh")
+
+SUMMARY_FIELDS = ("run_id", "status", "runtime_s") + KPI_FIELDS + ("error", )
+
+_INTERVAL_TYPES = {
+    "sim_duration": IntervalType('D:H'),
+    "slot_length": IntervalType('M:S'),
+    "tick_length": IntervalType('M:S'),
+}
+
+
+def _flatten_grid(grid, prefix=()):
+    """
+    Converts the nested parameter grid into a list of (parameter path, values) tuples.
+    Every leaf of the grid has to be a list of values that should be swept.
+    """
+    flat = []
+    for key, value in grid.items():
+        path = prefix + (key, )
+        if isinstance(value, dict):
+            flat.extend(_flatten_grid(value, path))
+        elif isinstance(value, list):
+            flat.append((path, value))
+        else:
+            flat.append((path, [value]))
+    return flat
+
+
+def _flatten_point(point, prefix=()):
+    flat = []
+    for key, value in point.items():
+        path = prefix + (key, )
+        if isinstance(value, dict):
+            flat.extend(_flatten_point(value, path))
+        else:
+            flat.append((path, value))
+    return flat
+
+
+def _unflatten_point(flat_point):
+    point = {}
+    for path, value in flat_point:
+        target = point
+        for key in path[:-1]:
+            target = target.setdefault(key, {})
+        target[path[-1]] = value
+    return point
+
+
+def parameter_name(path):
+    return ".".join(path)
+
+
+def expand_parameter_grid(grid):
+    """
+    Expands a parameter grid to the list of all of its parameter combinations.
+    The grid can contain the keys 'setup' (setup module names), 'seed' (random seeds),
+    'simulation_config' (SimulationConfig arguments) and 'advanced_settings'
+    (ConstSettings, same structure as the advanced settings of the settings file).
+    :return: list of nested parameter dicts, one for each simulation run
+    """
+    unknown_keys = set(grid.keys()) - {SETUP_KEY, SEED_KEY, SIMULATION_CONFIG_KEY,
+                                       ADVANCED_SETTINGS_KEY}
+    if unknown_keys:
+        raise ValueError(f"Unknown parameter grid keys: {unknown_keys}")
+    flat_grid = _flatten_grid(grid)
+    paths = [path for path, _ in flat_grid]
+    return [_unflatten_point(zip(paths, values))
+            for values in itertools.product(*(values for _, values in flat_grid))]
+
+
+def sweep_run_id(point, base_settings=None, setup_module_name=None, seed=None):
+    """
+    Deterministic identifier of a parameter combination, used for the export directory name
+    and for detecting already completed runs when resuming a sweep. Besides the parameter
+    combination it depends on the base settings, setup module and seed of the sweep, so that
+    runs are repeated if those change.
+    """
+    run_str = json.dumps({"point": point,
+                          "base_settings": base_settings,
+                          SETUP_KEY: point.get(SETUP_KEY, setup_module_name),
+                          SEED_KEY: point.get(SEED_KEY, seed)},
+                         sort_keys=True, default=str)
+    return hashlib.sha1(run_str.encode("utf-8")).hexdigest()[:12]
+
+
+def read_completed_runs(summary_file):
+    """
+    Reads the rows of the summary file of a previous (possibly interrupted) sweep run.
+    :return: Dict[run_id, row] of all successfully finished runs
+    """
+    if not os.path.isfile(summary_file):
+        return {}
+    with open(summary_file, "r") as csv_file:
+        return {row["run_id"]: row for row in csv.DictReader(csv_file)
+                if row.get("status") == "finished"}
+
+
+def _create_simulation_config(base_settings, config_overrides):
+    config_settings = dict(base_settings)
+    for key, value in config_overrides.items():
+        if key in _INTERVAL_TYPES and isinstance(value, str):
+            value = _INTERVAL_TYPES[key](value)
+        config_settings[key] = value
+    validate_global_settings({k: v for k, v in config_settings.items()
+                              if k in ("sim_duration", "slot_length", "tick_length",
+                                       "cloud_coverage", "market_count")})
+    config_settings["external_connection_enabled"] = False
+    return SimulationConfig(**config_settings)
+
+
+def run_sweep_point(run_id, point, base_settings, setup_module_name, seed, export_dir):
+    """
+    Runs the simulation of one parameter combination. Executed in a pool worker process.
+    :return: summary row of the run
+    """
+    row = {"run_id": run_id, "status": "failed", "runtime_s": None}
+    for path, value in _flatten_point(point):
+        row[parameter_name(path)] = value
+    start = time.time()
+    try:
+        if ADVANCED_SETTINGS_KEY in point:
+            update_advanced_settings(point[ADVANCED_SETTINGS_KEY])
+        simulation_config = _create_simulation_config(
+            base_settings, point.get(SIMULATION_CONFIG_KEY, {}))
+        mkdir_from_str(export_dir)
+        with open(os.path.join(export_dir, SWEEP_RUN_PARAMETERS_FILE), "w") as params_file:
+            json.dump(point, params_file, indent=2, default=str)
+
+        simulation = Simulation(
+            setup_module_name=point.get(SETUP_KEY, setup_module_name),
+            simulation_config=simulation_config,
+            seed=point.get(SEED_KEY, seed),
+            export_path=export_dir,
+            export_subdir="results"
+        )
+        simulation.run()
+
+        kpis = simulation.endpoint_buffer.kpi.performance_indices.get(simulation.area.name, {})
+        row.update({field: kpis.get(field) for field in KPI_FIELDS})
+        row["status"] = simulation.status
+    except Exception:
+        row["error"] = traceback.format_exc().splitlines()[-1]
+        log.error(f"Sweep run {run_id} failed: {traceback.format_exc()}")
+    row["runtime_s"] = round(time.time() - start, 3)
+    return row
+
+
+def _run_sweep_point_star(args):
+    return run_sweep_point(*args)
+
+
+class SweepRunner:
+    """
+    Runs one simulation per parameter combination of a parameter grid on a bounded
+    process pool. Every run exports its results to its own directory and appends a row
+    with its KPIs and runtime to the sweep summary table.
+    """
+
+    def __init__(self, grid, base_settings, setup_module_name, seed=None, export_path=None,
+                 processes=None, resume=True):
+        self.points = expand_parameter_grid(grid)
+        self.base_settings = base_settings
+        self.setup_module_name = setup_module_name
+        self.seed = seed
+        self.export_path = pathlib.Path(
+            os.path.abspath(export_path) if export_path is not None
+            else str(pathlib.Path.home()) + "/d3a-simulation/sweep")
+        self.processes = processes if processes is not None else os.cpu_count()
+        self.resume = resume
+        self.parameter_fields = sorted({parameter_name(path)
+                                        for point in self.points
+                                        for path, _ in _flatten_point(point)})
+
+    @property
+    def summary_file(self):
+        return str(self.export_path.joinpath(SWEEP_SUMMARY_FILE))
+
+    def run_id(self, point):
+        return sweep_run_id(point, self.base_settings, self.setup_module_name, self.seed)
+
+    def pending_runs(self, completed_runs):
+        pending = []
+        for point in self.points:
+            run_id = self.run_id(point)
+            if run_id not in completed_runs:
+                pending.append((run_id, point))
+        return pending
+
+    def run(self):
+        mkdir_from_str(str(self.export_path))
+        completed_runs = read_completed_runs(self.summary_file) if self.resume else {}
+        pending_runs = self.pending_runs(completed_runs)
+        log.warning(f"Parameter sweep: {len(self.points)} runs, "
+                    f"{len(self.points) - len(pending_runs)} already completed, "
+                    f"{len(pending_runs)} pending, {self.processes} processes.")
+        # Profiles that are parsed before the pool is created are inherited by all workers
+        preload_resource_profiles()
+
+        fieldnames = list(SUMMARY_FIELDS[:3]) + self.parameter_fields + \
+            list(SUMMARY_FIELDS[3:])
+        with open(self.summary_file, "w") as csv_file:
+            writer = csv.DictWriter(csv_file, fieldnames=fieldnames, extrasaction="ignore")
+            writer.writeheader()
+            for row in completed_runs.values():
+                writer.writerow(row)
+            csv_file.flush()
+
+            arguments = [(run_id, point, self.base_settings, self.setup_module_name, self.seed,
+                          str(self.export_path.joinpath(run_id)))
+                         for run_id, point in pending_runs]
+            # Use one fresh forked process per run, so that ConstSettings modifications
+            # of a run do not leak into the following runs of the same worker.
+            context = multiprocessing.get_context("fork")
+            with context.Pool(processes=self.processes, maxtasksperchild=1) as pool:
+                for index, row in enumerate(
+                        pool.imap_unordered(_run_sweep_point_star, arguments)):
+                    writer.writerow(row)
+                    csv_file.flush()
+                    log.warning(f"Sweep run {row['run_id']} {row['status']} "
+                                f"in {row['runtime_s']}s ({index + 1}/{len(arguments)})")
+        return self.summary_file
@@ -0,0 +1,108 @@
+"""
+Copyright 2018 Grid Singularity
+This file is part of D3A.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import time
+
+
+class TickLateness:
+    """
+    Collects how late the ticks of a paced simulation started compared to their scheduled
+    wall clock time. Ticks that are less than late_tolerance_s late are not counted as late,
+    sleeping is not more accurate than that.
+    """
+    late_tolerance_s = 0.001
+
+    def __init__(self):
+        self.tick_count = 0
+        self.late_tick_count = 0
+        self.total_s = 0.0
+        self.max_s = 0.0
+
+    def add(self, lateness_s):
+        self.tick_count += 1
+        if lateness_s <= 0:
+            return
+        if lateness_s > self.late_tolerance_s:
+            self.late_tick_count += 1
+        self.total_s += lateness_s
+        if lateness_s > self.max_s:
+            self.max_s = lateness_s
+
+    @property
+    def mean_s(self):
+        return self.total_s / self.tick_count if self.tick_count else 0.0
+
+    def __str__(self):
+        return (f"{self.late_tick_count} of {self.tick_count} ticks late, "
+                f"max {self.max_s:.3f}s, mean {self.mean_s:.3f}s")
+
+
+class TickScheduler:
+    """
+    Paces the ticks of a simulation to absolute deadlines on a monotonic clock.
+
+    Tick n is due tick_length seconds after tick n - 1 was due, independent of how long the
+    ticks took to run, so that sleep inaccuracies do not add up over the simulation. After a
+    tick overran its deadline the following ticks are started without sleeping until the
+    simulation is back on schedule. Time spent paused shifts the schedule. A tick length of
+    0 disables pacing.
+    """
+    def __init__(self, tick_length_s, clock=time.monotonic):
+        self._clock = clock
+        self._tick_length_s = tick_length_s
+        self._origin = clock()
+        self._tick_count = 0
+        self._paused_at = None
+        self.lateness = TickLateness()
+
+    @property
+    def tick_length_s(self):
+        return self._tick_length_s
+
+    @tick_length_s.setter
+    def tick_length_s(self, tick_length_s):
+        # Keep the deadline of the upcoming tick and pace the following ones with the new length
+        if self._tick_length_s > 0:
+            next_deadline = self._origin + (self._tick_count + 1) * self._tick_length_s
+            self._origin = next_deadline - tick_length_s
+        else:
+            self._origin = self._clock()
+        self._tick_count = 0
+        self._tick_length_s = tick_length_s
+
+    def wait_for_next_tick(self, sleep=time.sleep):
+        """
+        Blocks until the next tick is due and records how late it is started.
+        """
+        if self._tick_length_s <= 0:
+            return
+        self._tick_count += 1
+        deadline = self._origin + self._tick_count * self._tick_length_s
+        delay = deadline - self._clock()
+        if delay > 0:
+            sleep(delay)
+        self.lateness.add(self._clock() - deadline)
+
+    def pause(self):
+        if self._paused_at is None:
+            self._paused_at = self._clock()
+
+    def resume(self):
+        if self._paused_at is None:
+            return
+        self._origin += self._clock() - self._paused_at
+        self._paused_at = None
@@ -24,6 +24,8 @@ import json
 import d3a
 import inspect
 import os
+import time
+from collections import deque
 
 from click.types import ParamType
 from pendulum import duration, from_format
@@ -54,6 +56,49 @@ _CONTRACT_CACHE = {}
 TRACE = 5
 
 
+class TraceBuffer:
+    """
+    Ring buffer of the latest trace messages. Messages are formatted when they are added, so
+    that the dump shows the offers, bids and markets in their state at the time of the trace
+    and does not keep them alive.
+    """
+    def __init__(self, size):
+        self.records = deque(maxlen=size)
+
+    def add(self, logger_name, tag, msg, args):
+        msg = msg % args if args else msg
+        if tag is not None:
+            msg = f"[{tag}] {msg}"
+        self.records.append((time.time(), logger_name, msg))
+
+    def dump(self, logger=None):
+        logger = logger or log
+        logger.error("Last %d trace messages:", len(self.records))
+        while self.records:
+            created, logger_name, msg = self.records.popleft()
+            logger.error("%s %s %s", pendulum.from_timestamp(created).format("HH:mm:ss.SSS"),
+                         logger_name, msg)
+
+
+# Trace messages are stored in the trace buffer instead of being logged, if it is enabled
+_trace_buffer = None
+
+
+def enable_trace_buffer(size):
+    global _trace_buffer
+    _trace_buffer = TraceBuffer(size)
+
+
+def disable_trace_buffer():
+    global _trace_buffer
+    _trace_buffer = None
+
+
+def dump_trace_buffer():
+    if _trace_buffer is not None:
+        _trace_buffer.dump()
+
+
 class TraceLogger(getLoggerClass()):
     def __init__(self, name, level=NOTSET):
         super().__init__(name, level)
@@ -69,7 +114,9 @@ class TraceLogger(getLoggerClass()):
 
         logger.trace("Houston, we have a %s", "thorny problem", exc_info=1)
         """
-        if self.isEnabledFor(TRACE):
+        if _trace_buffer is not None:
+            _trace_buffer.add(self.name, None, msg, args)
+        elif self.isEnabledFor(TRACE):
             self._log(TRACE, msg, args, **kwargs)
 
 
@@ -90,7 +137,24 @@ class TaggedLogWrapper(LoggerAdapter):
         """
         Delegate a trace call to the underlying logger.
         """
-        self.log(TRACE, msg, *args, **kwargs)
+        if _trace_buffer is not None:
+            _trace_buffer.add(self.logger.name, self.extra, msg, args)
+        elif self.logger.isEnabledFor(TRACE):
+            self.log(TRACE, msg, *args, **kwargs)
+
+
+class LazyLogStr:
+    """
+    Log message argument that is only formatted by func(*args) if the message is logged.
+    """
+    __slots__ = ("func", "args")
+
+    def __init__(self, func, *args):
+        self.func = func
+        self.args = args
+
+    def __str__(self):
+        return self.func(*self.args)
 
 
 class DateType(ParamType):
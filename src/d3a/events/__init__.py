@@ -19,42 +19,47 @@ from typing import Union, List  # noqa
 from d3a.events.event_structures import MarketEvent, AreaEvent
 
 
+# Event type -> name of the EventMixin method that handles it
+EVENT_HANDLERS = {
+    AreaEvent.TICK: "event_tick",
+    AreaEvent.MARKET_CYCLE: "event_market_cycle",
+    AreaEvent.BALANCING_MARKET_CYCLE: "event_balancing_market_cycle",
+    AreaEvent.ACTIVATE: "event_activate",
+    MarketEvent.OFFER: "event_offer",
+    MarketEvent.OFFER_SPLIT: "event_offer_split",
+    MarketEvent.OFFER_DELETED: "event_offer_deleted",
+    MarketEvent.OFFER_CHANGED: "event_offer_changed",
+    MarketEvent.TRADE: "event_trade",
+    MarketEvent.BID_TRADED: "event_bid_traded",
+    MarketEvent.BID_DELETED: "event_bid_deleted",
+    MarketEvent.BID_SPLIT: "event_bid_split",
+    MarketEvent.BID_CHANGED: "event_bid_changed",
+    MarketEvent.BALANCING_OFFER: "event_balancing_offer",
+    MarketEvent.BALANCING_OFFER_SPLIT: "event_balancing_offer_split",
+    MarketEvent.BALANCING_OFFER_DELETED: "event_balancing_offer_deleted",
+    MarketEvent.BALANCING_TRADE: "event_balancing_trade",
+}
+
+
 class EventMixin:
+    # Event types whose handlers are overridden by the class, other events are not
+    # dispatched to its instances
+    subscribed_events = frozenset()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.subscribed_events = frozenset(
+            event_type for event_type, handler in EVENT_HANDLERS.items()
+            if getattr(cls, handler) is not getattr(EventMixin, handler))
+
+    def is_subscribed(self, event_type: Union[AreaEvent, MarketEvent]):
+        return event_type in self.subscribed_events
 
     def _event_mapping(self, event):
-        if event == AreaEvent.TICK:
-            return self.event_tick
-        elif event == AreaEvent.MARKET_CYCLE:
-            return self.event_market_cycle
-        elif event == AreaEvent.BALANCING_MARKET_CYCLE:
-            return self.event_balancing_market_cycle
-        elif event == AreaEvent.ACTIVATE:
-            return self.event_activate
-        elif event == MarketEvent.OFFER:
-            return self.event_offer
-        elif event == MarketEvent.OFFER_SPLIT:
-            return self.event_offer_split
-        elif event == MarketEvent.OFFER_DELETED:
-            return self.event_offer_deleted
-        elif event == MarketEvent.TRADE:
-            return self.event_trade
-        elif event == MarketEvent.BID_TRADED:
-            return self.event_bid_traded
-        elif event == MarketEvent.BID_DELETED:
-            return self.event_bid_deleted
-        elif event == MarketEvent.BID_SPLIT:
-            return self.event_bid_split
-        elif event == MarketEvent.BALANCING_OFFER:
-            return self.event_balancing_offer
-        elif event == MarketEvent.BALANCING_OFFER_SPLIT:
-            return self.event_balancing_offer_split
-        elif event == MarketEvent.BALANCING_OFFER_DELETED:
-            return self.event_balancing_offer_deleted
-        elif event == MarketEvent.BALANCING_TRADE:
-            return self.event_balancing_trade
+        return getattr(self, EVENT_HANDLERS[event])
 
     def event_listener(self, event_type: Union[AreaEvent, MarketEvent], **kwargs):
-        self.log.trace("Dispatching event %s", event_type.name)
+        self.log.trace("Dispatching event %s", event_type)
         self._event_mapping(event_type)(**kwargs)
 
     def event_tick(self):
@@ -78,6 +83,9 @@ class EventMixin:
     def event_offer_deleted(self, *, market_id, offer):
         pass
 
+    def event_offer_changed(self, *, market_id, offer):
+        pass
+
     def event_trade(self, *, market_id, trade):
         pass
 
@@ -90,6 +98,9 @@ class EventMixin:
     def event_bid_split(self, *, market_id, original_bid, accepted_bid, residual_bid):
         pass
 
+    def event_bid_changed(self, *, market_id, bid):
+        pass
+
     def event_balancing_offer(self, *, market_id, offer):
         pass
 
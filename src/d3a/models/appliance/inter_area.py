@@ -59,7 +59,6 @@ class InterAreaAppliance(SimpleAppliance):
             return 0
         energy = sum(
             t.offer.energy * (1 if t.seller == self.own_name else -1)
-            for t in market.trades
-            if self.own_name in (t.buyer, t.seller)
+            for t in market.trades_of(self.own_name)
         )
         return energy
@@ -23,6 +23,7 @@ from slugify import slugify
 from uuid import uuid4
 from d3a.constants import TIME_ZONE
 from d3a.d3a_core.exceptions import AreaException
+from d3a.d3a_core.area_registry import AreaRegistry
 from d3a.models.appliance.base import BaseAppliance
 from d3a.models.config import SimulationConfig
 from d3a.events.event_structures import TriggerMixin
@@ -38,6 +39,8 @@ from d3a.models.area.events import Events
 from d3a_interface.constants_limits import GlobalConfig
 from d3a_interface.area_validator import validate_area
 from d3a.models.area.redis_external_market_connection import RedisMarketExternalConnection
+from d3a.models.market.path_compressed_matching import PathCompressedMatcher, \
+    path_compressed_matching_enabled
 from d3a_interface.utils import key_in_dict_and_not_none
 import d3a.constants
 
@@ -95,6 +98,10 @@ class Area:
         self.uuid = uuid if uuid is not None else str(uuid4())
         self.slug = slugify(name, to_lower=True)
         self.parent = None
+        self._registry = None
+        # Cached by has_open_orders until an order of the area tree changes
+        self._has_open_orders = False
+        self._open_orders_changed = True
         self.children = children if children is not None else []
         for child in self.children:
             child.parent = self
@@ -117,6 +124,7 @@ class Area:
         self._markets = AreaMarkets(self.log)
         self.endpoint_stats = {}
         self.stats = AreaStats(self._markets)
+        self._path_compressed_matcher = PathCompressedMatcher(self)
         log.debug(f"External connection {external_connection_available} for area {self.name}")
         self.redis_ext_conn = RedisMarketExternalConnection(self) \
             if external_connection_available is True else None
@@ -171,6 +179,31 @@ class Area:
             export_capacity_kVA * self.config.slot_length.total_minutes() / 60.0 \
             if export_capacity_kVA is not None else 0.
 
+    @property
+    def registry(self) -> AreaRegistry:
+        """
+        Registry of all areas of the tree, shared by all areas and owned by the root area.
+        """
+        if self.parent is not None:
+            return self.parent.registry
+        if self._registry is None:
+            self._registry = AreaRegistry(self)
+        return self._registry
+
+    def add_child(self, child):
+        if self.strategy is not None:
+            raise AreaException("A leaf area can not have children.")
+        self.registry.register(child)
+        child.parent = self
+        self.children.append(child)
+        self.open_orders_changed()
+
+    def remove_child(self, child):
+        self.children.remove(child)
+        self.registry.unregister(child)
+        child.parent = None
+        self.open_orders_changed()
+
     def set_events(self, event_list):
         self.events = Events(event_list, self)
 
@@ -239,6 +272,7 @@ class Area:
 
         self.log.debug("Cycling markets")
         self._markets.rotate_markets(self.now, self.stats, self.dispatcher)
+        self.open_orders_changed()
         self.dispatcher._delete_past_agents(self.dispatcher._inter_area_agents)
 
         if deactivate:
@@ -276,10 +310,17 @@ class Area:
                 ConstSettings.IAASettings.MARKET_TYPE == 3:
             if ConstSettings.GeneralSettings.EVENT_DISPATCHING_VIA_REDIS:
                 self.dispatcher.publish_market_clearing()
+            elif path_compressed_matching_enabled():
+                # The markets of the whole area tree are matched at once by the top area
+                if self.parent is None:
+                    self._path_compressed_matcher.match()
             else:
                 for market in self.all_markets:
                     market.match_offers_bids()
 
+        self._advance_clock()
+
+    def _advance_clock(self):
         self.events.update_events(self.now)
         self.current_tick += 1
         if self._markets:
@@ -294,6 +335,68 @@ class Area:
             self.tick()
             self.dispatcher.broadcast_tick()
 
+    def fast_forward_tick(self):
+        """
+        Advances the area tree by one tick without matching and without dispatching the tick
+        to strategies. Only valid while has_pending_tick_actions() is False.
+        """
+        if d3a.constants.DISPATCH_EVENTS_BOTTOM_TO_TOP:
+            self.dispatcher.broadcast_fast_forward_tick()
+            self._advance_clock()
+        else:
+            self._advance_clock()
+            self.dispatcher.broadcast_fast_forward_tick()
+
+    def has_pending_tick_actions(self):
+        """
+        Return True if anything in the area tree can happen during the remaining ticks of the
+        current slot, i.e. if there are open offers or bids in any market, a strategy or agent
+        that could act on tick, or a strategy or config event due before the end of the slot.
+        """
+        # Strategies and agents are only asked once no orders are left in the whole tree
+        return self.has_open_orders or self._has_pending_actions()
+
+    def _has_pending_actions(self):
+        if self.redis_ext_conn is not None:
+            return True
+        if self.strategy is not None and self.strategy.has_pending_tick_actions():
+            return True
+        if self.dispatcher.has_pending_agent_tick_actions:
+            return True
+        remaining_ticks = self.config.ticks_per_slot - self.current_tick_in_slot
+        last_tick_time = self.now.add(
+            seconds=self.config.tick_length.seconds * (remaining_ticks - 1))
+        if self.events.has_pending_reconfiguration(self.now, last_tick_time):
+            return True
+        return any(child._has_pending_actions() for child in self.children)
+
+    def open_orders_changed(self):
+        """
+        Invalidate has_open_orders of this area and of its parents. Called by the markets of the
+        area whenever an offer or a bid is added or removed, and when the markets are cycled.
+        """
+        area = self
+        # Parents of an invalidated area are invalidated as well
+        while area is not None and not area._open_orders_changed:
+            area._open_orders_changed = True
+            area = area.parent
+
+    @property
+    def has_open_orders(self):
+        """
+        True if any future market of the area tree has open offers or bids.
+        """
+        if self._open_orders_changed:
+            # All children are validated, otherwise an invalidated child could not invalidate
+            # this area anymore
+            children_have_open_orders = [child.has_open_orders for child in self.children]
+            self._has_open_orders = any(children_have_open_orders) or any(
+                market.offers or market.bids
+                for markets in (self._markets.markets, self._markets.balancing_markets)
+                for market in markets.values())
+            self._open_orders_changed = False
+        return self._has_open_orders
+
     def __repr__(self):
         return "<Area '{s.name}' markets: {markets}>".format(
             s=self,
@@ -324,16 +427,14 @@ class Area:
             return self.parent.bc
         return None
 
-    @cached_property
+    @property
     def child_by_slug(self):
-        slug_map = {}
-        areas = [self]
-        while areas:
-            for area in list(areas):
-                slug_map[area.slug] = area
-                areas.remove(area)
-                areas.extend(area.children)
-        return slug_map
+        """
+        This area and all its descendants by slug.
+        """
+        if self.parent is None:
+            return self.registry.by_slug
+        return self.registry.subtree_by_slug(self)
 
     @property
     def now(self) -> DateTime:
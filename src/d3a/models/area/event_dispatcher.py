@@ -89,7 +89,8 @@ class AreaDispatcher:
             if not self.area.events.is_connected:
                 break
             for area_name in sorted(agents, key=lambda _: random()):
-                agents[area_name].event_listener(event_type, **kwargs)
+                if agents[area_name].is_subscribed(event_type):
+                    agents[area_name].event_listener(event_type, **kwargs)
         # Also broadcast to BAs. Again in random order
         # TODO: Refactor to reuse the spot market mechanism
         for time_slot, agents in self._balancing_agents.items():
@@ -100,7 +101,55 @@ class AreaDispatcher:
             if not self.area.events.is_connected:
                 break
             for area_name in sorted(agents, key=lambda _: random()):
-                agents[area_name].event_listener(event_type, **kwargs)
+                if agents[area_name].is_subscribed(event_type):
+                    agents[area_name].event_listener(event_type, **kwargs)
+
+    def broadcast_fast_forward_tick(self):
+        """
+        Counterpart of broadcast_tick for ticks that are fast-forwarded. Visits the children
+        and agents in the same random order as a tick broadcast, but only the appliances
+        receive the tick event, strategies and agents are notified via skip_tick.
+        """
+        if not self.area.events.is_enabled:
+            return
+        for child in sorted(self.area.children, key=lambda _: random()):
+            child.dispatcher.fast_forward_tick_listener()
+        for time_slot, agents in self._inter_area_agents.items():
+            if time_slot not in self.area._markets.markets:
+                continue
+            if not self.area.events.is_connected:
+                break
+            for area_name in sorted(agents, key=lambda _: random()):
+                self._skip_tick(agents[area_name])
+        for time_slot, agents in self._balancing_agents.items():
+            if time_slot not in self.area._markets.balancing_markets:
+                continue
+            if not self.area.events.is_connected:
+                break
+            for area_name in sorted(agents, key=lambda _: random()):
+                self._skip_tick(agents[area_name])
+
+    def fast_forward_tick_listener(self):
+        if self._should_dispatch_to_strategies_appliances(AreaEvent.TICK):
+            self.area.fast_forward_tick()
+        if self._should_dispatch_to_strategies_appliances(AreaEvent.TICK):
+            if self.area.strategy:
+                self._skip_tick(self.area.strategy)
+            if self.area.appliance:
+                self.area.appliance.event_listener(AreaEvent.TICK)
+
+    @staticmethod
+    def _skip_tick(strategy):
+        # Disabled strategies do not receive tick events either
+        if strategy.enabled:
+            strategy.skip_tick()
+
+    @property
+    def has_pending_agent_tick_actions(self):
+        return any(agent.has_pending_tick_actions()
+                   for agents_dict in (self._inter_area_agents, self._balancing_agents)
+                   for agents in agents_dict.values()
+                   for agent in agents.values())
 
     def _should_dispatch_to_strategies_appliances(self, event_type):
         if event_type is AreaEvent.ACTIVATE:
@@ -117,40 +166,47 @@ class AreaDispatcher:
         elif event_type is AreaEvent.ACTIVATE:
             self.area.activate()
         if self._should_dispatch_to_strategies_appliances(event_type):
-            if self.area.strategy:
+            if self.area.strategy and self.area.strategy.is_subscribed(event_type):
                 self.area.strategy.event_listener(event_type, **kwargs)
-            if self.area.appliance:
+            if self.area.appliance and self.area.appliance.is_subscribed(event_type):
                 self.area.appliance.event_listener(event_type, **kwargs)
         elif (not self.area.events.is_enabled or not self.area.events.is_connected) \
                 and event_type == AreaEvent.MARKET_CYCLE and self.area.strategy is not None:
             self.area.strategy.event_on_disabled_area()
 
     @staticmethod
-    def create_agent_object(owner, higher_market, lower_market, is_spot_market):
-        agent_constructor_arguments = {
-            "owner": owner,
-            "higher_market": higher_market,
-            "lower_market": lower_market,
-            "min_offer_age": ConstSettings.IAASettings.MIN_OFFER_AGE
-        }
+    def select_agent_class(is_spot_market):
         if is_spot_market:
             if ConstSettings.IAASettings.MARKET_TYPE == 1:
                 if ConstSettings.IAASettings.AlternativePricing.PRICING_SCHEME != 0:
-                    return OneSidedAlternativePricingAgent(**agent_constructor_arguments)
+                    return OneSidedAlternativePricingAgent
                 else:
-                    return OneSidedAgent(**agent_constructor_arguments)
+                    return OneSidedAgent
             elif ConstSettings.IAASettings.MARKET_TYPE == 2:
-                return TwoSidedPayAsBidAgent(
-                    **agent_constructor_arguments,
-                    min_bid_age=ConstSettings.IAASettings.MIN_BID_AGE
-                )
+                return TwoSidedPayAsBidAgent
             elif ConstSettings.IAASettings.MARKET_TYPE == 3:
-                return TwoSidedPayAsClearAgent(
-                    **agent_constructor_arguments,
-                    min_bid_age=ConstSettings.IAASettings.MIN_BID_AGE
-                )
+                return TwoSidedPayAsClearAgent
         else:
-            return BalancingAgent(**agent_constructor_arguments)
+            return BalancingAgent
+
+    @staticmethod
+    def _agent_arguments(agent_class, higher_market, lower_market):
+        agent_arguments = {
+            "higher_market": higher_market,
+            "lower_market": lower_market,
+            "min_offer_age": ConstSettings.IAASettings.MIN_OFFER_AGE
+        }
+        if issubclass(agent_class, TwoSidedPayAsBidAgent):
+            agent_arguments["min_bid_age"] = ConstSettings.IAASettings.MIN_BID_AGE
+        return agent_arguments
+
+    @classmethod
+    def create_agent_object(cls, owner, higher_market, lower_market, is_spot_market):
+        agent_class = cls.select_agent_class(is_spot_market)
+        if agent_class is None:
+            return None
+        return agent_class(owner=owner,
+                           **cls._agent_arguments(agent_class, higher_market, lower_market))
 
     def create_area_agents(self, is_spot_market, market):
         if not self.area.parent:
@@ -167,9 +223,10 @@ class AreaDispatcher:
                     market.time_slot not in self.area.parent._markets.markets:
                 return
 
+            higher_market = self.area.parent._markets.markets[market.time_slot]
             iaa = self.create_agent_object(
                 owner=self.area,
-                higher_market=self.area.parent._markets.markets[market.time_slot],
+                higher_market=higher_market,
                 lower_market=market,
                 is_spot_market=True
             )
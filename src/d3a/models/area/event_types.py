@@ -28,7 +28,10 @@ class IntervalAreaEvent:
         return self._active
 
     def tick(self, current_time):
-        self._active = not self.disconnect_start <= current_time.hour < self.disconnect_end
+        self._active = self.active_at(current_time.hour)
+
+    def active_at(self, hour):
+        return not self.disconnect_start <= hour < self.disconnect_end
 
 
 class DisableIntervalAreaEvent(IntervalAreaEvent):
@@ -71,6 +74,9 @@ class StrategyEvents(SimpleEvent):
             strategy.area_reconfigure_event(**self.params)
             self._triggered = True
 
+    def is_pending(self, hours):
+        return self.event_time in hours and not self._triggered
+
 
 class ConfigEvents(SimpleEvent):
     def __init__(self, event_time, params):
@@ -82,3 +88,6 @@ class ConfigEvents(SimpleEvent):
         if current_time.hour == self.event_time and not self._triggered:
             area.update_config(**self.params)
             self._triggered = True
+
+    def is_pending(self, hours):
+        return self.event_time in hours and not self._triggered
@@ -28,9 +28,12 @@ class IndividualEvents:
         self._active = True
 
     def tick(self, current_time):
-        event_list = sorted(self.event_list, key=lambda e: e.event_time)
-        past_events = list(filter(lambda e: e.event_time <= current_time.hour, event_list))
-        self._active = len(past_events) == 0 or type(past_events[-1]) == self.trigger_type
+        self._active = self.active_at(current_time.hour)
+
+    def active_at(self, hour):
+        past_events = [e for e in sorted(self.event_list, key=lambda e: e.event_time)
+                       if e.event_time <= hour]
+        return len(past_events) == 0 or type(past_events[-1]) == self.trigger_type
 
     @property
     def active(self):
@@ -49,36 +52,73 @@ class IndividualConnectDisconnectEvents(IndividualEvents):
         super().__init__(event_list, ConnectAreaEvent)
 
 
-class EnableDisableEvents:
-    def __init__(self, isolated_events, interval_events):
-        self.isolated_ev = IndividualEnableDisableEvents(isolated_events)
-        assert all(type(e) is DisableIntervalAreaEvent for e in interval_events)
+class EventTimeline:
+    """
+    Transitions of an area state over the hours of the day, compiled once from the state
+    function. A cursor follows the current hour, so that updating the state on every tick
+    only compares the current hour with the next transition.
+    """
+    def __init__(self, active_at):
+        states = [active_at(hour) for hour in range(24)]
+        self.transitions = [(hour, state) for hour, state in enumerate(states)
+                            if hour == 0 or state != states[hour - 1]]
+        self._cursor = 0
+
+    def active_at(self, hour):
+        if hour < self.transitions[self._cursor][0]:
+            # The simulation has moved on to the next day
+            self._cursor = 0
+        while self._cursor + 1 < len(self.transitions) and \
+                self.transitions[self._cursor + 1][0] <= hour:
+            self._cursor += 1
+        return self.transitions[self._cursor][1]
+
+
+class AreaStateEvents:
+    """
+    Isolated and interval events that switch an area state on and off. The events are
+    compiled into a timeline on the first update, areas without events are always active.
+    """
+    def __init__(self, isolated_ev, interval_events):
+        self.isolated_ev = isolated_ev
         self.interval_ev = interval_events
+        self._timeline = None
+        self._active = True
+
+    @property
+    def has_events(self):
+        return bool(self.isolated_ev.event_list or self.interval_ev)
+
+    def _active_at(self, hour):
+        return self.isolated_ev.active_at(hour) and all(e.active_at(hour)
+                                                        for e in self.interval_ev)
 
     def update_events(self, current_time):
-        self.isolated_ev.tick(current_time)
-        for e in self.interval_ev:
-            e.tick(current_time)
+        if not self.has_events:
+            return
+        if self._timeline is None:
+            self._timeline = EventTimeline(self._active_at)
+        self._active = self._timeline.active_at(current_time.hour)
+
+
+class EnableDisableEvents(AreaStateEvents):
+    def __init__(self, isolated_events, interval_events):
+        assert all(type(e) is DisableIntervalAreaEvent for e in interval_events)
+        super().__init__(IndividualEnableDisableEvents(isolated_events), interval_events)
 
     @property
     def enabled(self):
-        return self.isolated_ev.active and all(e.active for e in self.interval_ev)
+        return self._active
 
 
-class ConnectDisconnectEvents:
+class ConnectDisconnectEvents(AreaStateEvents):
     def __init__(self, isolated_events, interval_events):
-        self.isolated_ev = IndividualConnectDisconnectEvents(isolated_events)
         assert all(type(e) is DisconnectIntervalAreaEvent for e in interval_events)
-        self.interval_ev = interval_events
-
-    def update_events(self, current_time):
-        self.isolated_ev.tick(current_time)
-        for e in self.interval_ev:
-            e.tick(current_time)
+        super().__init__(IndividualConnectDisconnectEvents(isolated_events), interval_events)
 
     @property
     def connected(self):
-        return self.isolated_ev.active and all(e.active for e in self.interval_ev)
+        return self._active
 
 
 class Events:
@@ -96,8 +136,11 @@ class Events:
 
         self.strategy_events = [e for e in event_list if type(e) == StrategyEvents]
         self.config_events = [e for e in event_list if type(e) == ConfigEvents]
+        self._has_events = len(event_list) > 0
 
     def update_events(self, current_time):
+        if not self._has_events:
+            return
         self.enable_disable_events.update_events(current_time)
         self.connect_disconnect_events.update_events(current_time)
         for ev in self.strategy_events:
@@ -105,6 +148,20 @@ class Events:
         for ev in self.config_events:
             ev.tick(current_time, self.area)
 
+    def has_pending_reconfiguration(self, start_time, end_time):
+        """
+        Return True if a strategy or config event can be triggered between start_time and
+        end_time (both inclusive).
+        """
+        if not self.strategy_events and not self.config_events:
+            return False
+        hours = {end_time.hour}
+        time = start_time
+        while time < end_time:
+            hours.add(time.hour)
+            time = time.add(hours=1)
+        return any(ev.is_pending(hours) for ev in self.strategy_events + self.config_events)
+
     @property
     def is_enabled(self):
         return self.enable_disable_events.enabled
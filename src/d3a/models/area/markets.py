@@ -16,7 +16,7 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 from pendulum import DateTime # noqa
-from typing import Dict  # noqa
+from typing import Dict, List  # noqa
 
 from d3a.models.market import TransferFees
 from d3a.models.market.two_sided_pay_as_bid import TwoSidedPayAsBid
@@ -39,6 +39,8 @@ class AreaMarkets:
         self.past_markets = OrderedDict()  # type: Dict[DateTime, Market]
         self.past_balancing_markets = OrderedDict()  # type: Dict[DateTime, BalancingMarket]
         self._indexed_future_markets = {}
+        # Markets of deleted time slots by class, recycled for new time slots
+        self._market_pool = {}  # type: Dict[type, List[Market]]
 
     @property
     def indexed_future_markets(self):
@@ -83,17 +85,20 @@ class AreaMarkets:
             delete_markets = [pm for pm in past_markets if
                               pm not in self.markets.values()]
             for pm in delete_markets:
+                market = past_markets.pop(pm)
+                del market.offers
+                del market.trades
+                del market._participant_trades
+                del market.offer_history
+                del market.notification_listeners
+                del market.bids
+                del market.bid_history
+                del market.traded_energy
+                del market.accumulated_actual_energy_agg
                 if ConstSettings.GeneralSettings.EVENT_DISPATCHING_VIA_REDIS:
-                    past_markets[pm].redis_api.stop()
-                del past_markets[pm].offers
-                del past_markets[pm].trades
-                del past_markets[pm].offer_history
-                del past_markets[pm].notification_listeners
-                del past_markets[pm].bids
-                del past_markets[pm].bid_history
-                del past_markets[pm].traded_energy
-                del past_markets[pm].accumulated_actual_energy_agg
-                del past_markets[pm]
+                    market.redis_api.stop()
+                else:
+                    self._market_pool.setdefault(type(market), []).append(market)
 
     @staticmethod
     def select_market_class(is_spot_market):
@@ -116,17 +121,23 @@ class AreaMarkets:
                        for i in range(area.config.market_count)):
             timeframe = current_time + offset
             if timeframe not in markets:
-                # Create markets for missing slots
-                market = market_class(
-                    time_slot=timeframe,
-                    bc=area.bc,
-                    notification_listener=area.dispatcher.broadcast_callback,
-                    grid_fee_type=area.config.grid_fee_type,
-                    transfer_fees=TransferFees(grid_fee_percentage=area.grid_fee_percentage,
-                                               transfer_fee_const=area.transfer_fee_const),
-                    name=area.name,
-                    in_sim_duration=is_timeslot_in_simulation_duration(area.config, timeframe)
-                )
+                # Create markets for missing slots, or recycle the markets of deleted slots
+                market_arguments = {
+                    "time_slot": timeframe,
+                    "notification_listener": area.dispatcher.broadcast_callback,
+                    "grid_fee_type": area.config.grid_fee_type,
+                    "transfer_fees": TransferFees(
+                        grid_fee_percentage=area.grid_fee_percentage,
+                        transfer_fee_const=area.transfer_fee_const),
+                    "in_sim_duration": is_timeslot_in_simulation_duration(area.config, timeframe)
+                }
+                recycled_markets = self._market_pool.get(market_class)
+                if recycled_markets:
+                    market = recycled_markets.pop()
+                    market.recycle(**market_arguments)
+                else:
+                    market = market_class(bc=area.bc, name=area.name, **market_arguments)
+                market.orders_changed_listener = area.open_orders_changed
 
                 area.dispatcher.create_area_agents(is_spot_market, market)
                 markets[timeframe] = market
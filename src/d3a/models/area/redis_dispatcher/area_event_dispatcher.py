@@ -45,6 +45,8 @@ class RedisAreaEventDispatcher(RedisEventDispatcherBase):
             if not self.area.events.is_connected:
                 break
             for area_name in sorted(agents, key=lambda _: random()):
+                if not agents[area_name].is_subscribed(event_type):
+                    continue
                 agents[area_name].event_listener(event_type, **kwargs)
                 self.root_dispatcher.market_notify_event_dispatcher.wait_for_futures()
 
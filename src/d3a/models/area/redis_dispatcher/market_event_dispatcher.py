@@ -77,7 +77,8 @@ class AreaRedisMarketEventDispatcher(RedisEventDispatcherBase):
             if not self.area.events.is_connected:
                 break
             for area_name in sorted(agents, key=lambda _: random()):
-                agents[area_name].event_listener(event_type, **kwargs)
+                if agents[area_name].is_subscribed(event_type):
+                    agents[area_name].event_listener(event_type, **kwargs)
 
     def publish_response(self, event_type):
         response_channel = f"{self.area.parent.uuid}/market_event_response"
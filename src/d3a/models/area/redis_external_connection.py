@@ -1,5 +1,6 @@
 from redis import StrictRedis
 import json
+from d3a.d3a_core.exceptions import AreaException
 from d3a.d3a_core.redis_connections.redis_communication import REDIS_URL
 from d3a.models.strategy.external_strategy import ExternalStrategy
 
@@ -23,9 +24,11 @@ class RedisAreaExternalConnection:
 
         for area in self.areas_to_unregister:
             try:
-                area_object = next(child for child in self.area.children if child.name == area)
+                area_object = self.area.registry.get_by_name(area)
+                if area_object is None or area_object.parent is not self.area:
+                    raise AreaException(f"Area {area} is not a child of {self.area.name}.")
                 area_object.deactivate()
-                self.area.children.remove(area_object)
+                self.area.remove_child(area_object)
             except Exception as e:
                 self.area.log.error(f"Unsubscribing of area {area} failed with error {str(e)}.")
                 self.publish(f"{self.area.slug}/unregister_participant/response",
@@ -42,8 +45,13 @@ class RedisAreaExternalConnection:
             return
         for new_area in self.areas_to_register:
             area_object = self.area.__class__(name=new_area)
-            area_object.parent = self.area
-            self.area.children.append(area_object)
+            try:
+                self.area.add_child(area_object)
+            except AreaException as e:
+                self.area.log.error(f"Registering of area {new_area} failed with error {str(e)}.")
+                self.publish(f"{self.area.slug}/register_participant/response",
+                             json.dumps({"response": "failed"}))
+                continue
             area_object.strategy = ExternalStrategy(area_object)
             area_object.activate()
 
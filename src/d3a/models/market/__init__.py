@@ -16,7 +16,6 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
-import uuid
 import sys
 from logging import getLogger
 from typing import Dict, List  # noqa
@@ -27,6 +26,7 @@ from functools import wraps
 from threading import RLock
 
 from d3a.d3a_core.device_registry import DeviceRegistry
+from d3a.d3a_core.ids import new_id
 from d3a.constants import FLOATING_POINT_TOLERANCE, DATE_TIME_FORMAT
 from d3a.models.market.market_structures import Offer, Trade, Bid  # noqa
 from d3a.d3a_core.util import add_or_create_key, subtract_or_create_key
@@ -64,19 +64,48 @@ class Market:
                  transfer_fees: TransferFees = None, name=None):
         self.name = name
         self.bc = bc
-        self.id = str(uuid.uuid4())
+        self.device_registry = DeviceRegistry.REGISTRY
+        setattr(self, RLOCK_MEMBER_NAME, RLock())
+        self._init_slot(time_slot, notification_listener, grid_fee_type, transfer_fees)
+        self.readonly = readonly
+        if ConstSettings.GeneralSettings.EVENT_DISPATCHING_VIA_REDIS:
+            self.redis_api = MarketRedisEventSubscriber(self) \
+                if ConstSettings.IAASettings.MARKET_TYPE == 1 \
+                else TwoSidedMarketRedisEventSubscriber(self)
+
+    def _init_slot(self, time_slot, notification_listener, grid_fee_type, transfer_fees):
+        """
+        Initialize the state of the market for the time slot. Subclasses extend it with their
+        own state of the time slot, since markets are recycled for new time slots (see
+        AreaMarkets).
+        """
+        self.id = new_id()
         self.time_slot = time_slot
         self.time_slot_str = time_slot.format(DATE_TIME_FORMAT) \
             if self.time_slot is not None \
             else None
-        self.readonly = readonly
+        self.readonly = False
+        # Called whenever an offer or a bid is added to or removed from the market, set by the
+        # area of the market (see AreaMarkets)
+        self.orders_changed_listener = None
         # offer-id -> Offer
         self.offers = {}  # type: Dict[str, Offer]
+        # Incremented whenever an offer is added to or removed from self.offers
+        self.offers_version = 0
         self.offer_history = []  # type: List[Offer]
         self.notification_listeners = []
         self.bids = {}  # type: Dict[str, Bid]
+        # Incremented whenever a bid is added to or removed from self.bids
+        self.bids_version = 0
         self.bid_history = []  # type: List[Bid]
         self.trades = []  # type: List[Trade]
+        # Per participant indexes of self.trades, updated whenever a trade is added
+        # participant name -> trades where the participant is buyer or seller
+        self._participant_trades = {}  # type: Dict[str, List[Trade]]
+        self._bought_energy = {}
+        self._sold_energy = {}
+        self._total_spent = {}
+        self._total_earned = {}
 
         self._create_fee_handler(grid_fee_type, transfer_fees)
         self.market_fee = 0
@@ -96,12 +125,6 @@ class Market:
         elif notification_listener:
             self.notification_listeners.append(notification_listener)
         self.current_tick_in_slot = 0
-        self.device_registry = DeviceRegistry.REGISTRY
-        if ConstSettings.GeneralSettings.EVENT_DISPATCHING_VIA_REDIS:
-            self.redis_api = MarketRedisEventSubscriber(self) \
-                if ConstSettings.IAASettings.MARKET_TYPE == 1 \
-                else TwoSidedMarketRedisEventSubscriber(self)
-        setattr(self, RLOCK_MEMBER_NAME, RLock())
 
     def _create_fee_handler(self, grid_fee_type, transfer_fees):
         if not transfer_fees:
@@ -142,6 +165,7 @@ class Market:
         # sequential approach, but once event handling is enabled this needs to be handled
         if not already_tracked:
             self.trades.append(trade)
+            self._index_trade(trade)
             self.market_fee += trade.fee_price
         self._update_accumulated_trade_price_energy(trade)
         self.traded_energy = add_or_create_key(self.traded_energy, offer.seller, offer.energy)
@@ -150,6 +174,26 @@ class Market:
         # Recalculate offer min/max price since offer was removed
         self._update_min_max_avg_offer_prices()
 
+    def _index_trade(self, trade):
+        self._participant_trades.setdefault(trade.seller, []).append(trade)
+        if trade.buyer != trade.seller:
+            self._participant_trades.setdefault(trade.buyer, []).append(trade)
+        self._bought_energy[trade.buyer] = \
+            self._bought_energy.get(trade.buyer, 0) + trade.offer.energy
+        self._sold_energy[trade.offer.seller] = \
+            self._sold_energy.get(trade.offer.seller, 0) + trade.offer.energy
+        self._total_spent[trade.buyer] = \
+            self._total_spent.get(trade.buyer, 0) + trade.offer.price
+        self._total_earned[trade.seller] = \
+            self._total_earned.get(trade.seller, 0) + trade.offer.price
+
+    def trades_of(self, participant):
+        """
+        Return the trades of the market where participant is buyer or seller, in the order
+        in which they were performed.
+        """
+        return self._participant_trades.get(participant, [])
+
     def _update_accumulated_trade_price_energy(self, trade):
         self.accumulated_trade_price += trade.offer.price
         self.accumulated_trade_energy += trade.offer.energy
@@ -178,6 +222,14 @@ class Market:
             self.accumulated_trade_price
         )
 
+    @staticmethod
+    def _accept_split_offer_on_chain(accepted_offer, original_offer):
+        """
+        The accepted part of a split offer is traded as the original offer on the chain, which
+        creates the residual offer itself.
+        """
+        accepted_offer.real_id = original_offer.real_id
+
     @staticmethod
     def sorting(obj, reverse_order=False):
         if reverse_order:
@@ -208,6 +260,33 @@ class Market:
             self._avg_trade_price = round(price / energy, 4) if energy else 0
         return self._avg_trade_price
 
+    @property
+    def offers_version(self):
+        return self._offers_version
+
+    @offers_version.setter
+    def offers_version(self, offers_version):
+        self._offers_version = offers_version
+        if self.orders_changed_listener is not None:
+            self.orders_changed_listener()
+
+    @property
+    def bids_version(self):
+        return self._bids_version
+
+    @bids_version.setter
+    def bids_version(self, bids_version):
+        self._bids_version = bids_version
+        if self.orders_changed_listener is not None:
+            self.orders_changed_listener()
+
+    @property
+    def book_version(self):
+        """
+        Changes whenever an offer or a bid is added to or removed from the market.
+        """
+        return self.offers_version, self.bids_version
+
     @property
     def sorted_offers(self):
         return self.sorting(self.offers)
@@ -238,16 +317,16 @@ class Market:
         return self.accumulated_actual_energy_agg
 
     def bought_energy(self, buyer):
-        return sum(trade.offer.energy for trade in self.trades if trade.buyer == buyer)
+        return self._bought_energy.get(buyer, 0)
 
     def sold_energy(self, seller):
-        return sum(trade.offer.energy for trade in self.trades if trade.offer.seller == seller)
+        return self._sold_energy.get(seller, 0)
 
     def total_spent(self, buyer):
-        return sum(trade.offer.price for trade in self.trades if trade.buyer == buyer)
+        return self._total_spent.get(buyer, 0)
 
     def total_earned(self, seller):
-        return sum(trade.offer.price for trade in self.trades if trade.seller == seller)
+        return self._total_earned.get(seller, 0)
 
     @property
     def info(self):
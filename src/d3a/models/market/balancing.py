@@ -15,7 +15,8 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
-import uuid
+from heapq import heappop, heappush
+from itertools import count
 from typing import Union  # noqa
 from pendulum import DateTime
 from logging import getLogger
@@ -27,8 +28,9 @@ from d3a.models.market.market_structures import BalancingOffer, BalancingTrade
 from d3a.d3a_core.exceptions import InvalidOffer, MarketReadOnlyException, \
     OfferNotFoundException, InvalidBalancingTradeException, \
     DeviceNotInRegistryError
-from d3a.d3a_core.util import short_offer_bid_log_str
+from d3a.d3a_core.util import short_offer_bid_log_str, LazyLogStr
 from d3a.d3a_core.device_registry import DeviceRegistry
+from d3a.d3a_core.ids import new_id
 from d3a.constants import FLOATING_POINT_TOLERANCE
 from d3a_interface.constants_limits import ConstSettings
 
@@ -39,15 +41,21 @@ class BalancingMarket(OneSidedMarket):
     def __init__(self, time_slot=None, bc=None, notification_listener=None, readonly=False,
                  grid_fee_type=ConstSettings.IAASettings.GRID_FEE_TYPE,
                  transfer_fees=None, name=None, in_sim_duration=True):
+        super().__init__(time_slot, bc, notification_listener, readonly, grid_fee_type,
+                         transfer_fees, name, in_sim_duration=in_sim_duration)
+
+    def _init_slot(self, time_slot, notification_listener, grid_fee_type, transfer_fees):
         self.unmatched_energy_upward = 0
         self.unmatched_energy_downward = 0
         self.accumulated_supply_balancing_trade_price = 0
         self.accumulated_supply_balancing_trade_energy = 0
         self.accumulated_demand_balancing_trade_price = 0
         self.accumulated_demand_balancing_trade_energy = 0
-
-        super().__init__(time_slot, bc, notification_listener, readonly, grid_fee_type,
-                         transfer_fees, name, in_sim_duration=in_sim_duration)
+        # Price ordered books of the offers of positive (True) and negative (False) balancing
+        # energy. Accepted and deleted offers are only removed when they reach the top.
+        self._offer_books = {True: [], False: []}
+        self._offer_book_counter = count()
+        super()._init_slot(time_slot, notification_listener, grid_fee_type, transfer_fees)
 
     def offer(self, price: float, energy: float, seller: str, offer_id=None,
               original_offer_price=None, dispatch_event=True, seller_origin=None,
@@ -72,21 +80,50 @@ class BalancingMarket(OneSidedMarket):
                 price = price * (1 + self.fee_class.grid_fee_rate)
 
         if offer_id is None:
-            offer_id = str(uuid.uuid4())
+            offer_id = new_id()
 
         offer = BalancingOffer(offer_id, self.now, price, energy,
                                seller, seller_origin=seller_origin)
-        self.offers[offer.id] = offer
+        self._add_to_offer_book(offer)
 
         self.offer_history.append(offer)
-        log.debug(f"[BALANCING_OFFER][NEW][{self.time_slot_str}] {offer}")
+        log.debug("[BALANCING_OFFER][NEW][%s] %s", self.time_slot_str, offer)
         if dispatch_event is True:
             self._notify_listeners(MarketEvent.BALANCING_OFFER, offer=offer)
         return offer
 
+    def _add_to_offer_book(self, offer):
+        self.offers[offer.id] = offer
+        self.offers_version += 1
+        heappush(self._offer_books[offer.energy > FLOATING_POINT_TOLERANCE],
+                 (offer.energy_rate, next(self._offer_book_counter), offer))
+
+    def cheapest_balancing_offers(self, positive_energy: bool):
+        """
+        Yields the open offers of positive or negative balancing energy in ascending energy
+        rate order, popping them from the book. Offers that are still open when the iteration
+        is closed are put back, so consuming k offers costs O(k log n).
+        """
+        book = self._offer_books[positive_energy]
+        yielded = {}
+        try:
+            while book:
+                entry = heappop(book)
+                offer = entry[2]
+                # Restored offers can be contained twice in the book
+                if self.offers.get(offer.id) is not offer or id(offer) in yielded:
+                    continue
+                yielded[id(offer)] = entry
+                yield offer
+        finally:
+            for entry in yielded.values():
+                if self.offers.get(entry[2].id) is entry[2]:
+                    heappush(book, entry)
+
     def split_offer(self, original_offer, energy, orig_offer_price=None):
 
         self.offers.pop(original_offer.id, None)
+        self.offers_version += 1
         # same offer id is used for the new accepted_offer
 
         accepted_offer = self.balancing_offer(offer_id=original_offer.id,
@@ -97,6 +134,7 @@ class BalancingMarket(OneSidedMarket):
                                               dispatch_event=False,
                                               seller_origin=original_offer.seller_origin,
                                               from_agent=True)
+        self._accept_split_offer_on_chain(accepted_offer, original_offer)
 
         residual_price = (1 - energy / original_offer.energy) * original_offer.price
         residual_energy = original_offer.energy - energy
@@ -114,10 +152,11 @@ class BalancingMarket(OneSidedMarket):
                                               adapt_price_with_fees=False,
                                               from_agent=True)
 
-        log.debug(f"[BALANCING_OFFER][SPLIT][{self.time_slot_str}, {self.name}] "
-                  f"({short_offer_bid_log_str(original_offer)} into "
-                  f"{short_offer_bid_log_str(accepted_offer)} and "
-                  f"{short_offer_bid_log_str(residual_offer)}")
+        log.debug("[BALANCING_OFFER][SPLIT][%s, %s] (%s into %s and %s",
+                  self.time_slot_str, self.name,
+                  LazyLogStr(short_offer_bid_log_str, original_offer),
+                  LazyLogStr(short_offer_bid_log_str, accepted_offer),
+                  LazyLogStr(short_offer_bid_log_str, residual_offer))
 
         self.bc_interface.change_offer(accepted_offer, original_offer, residual_offer)
 
@@ -146,6 +185,7 @@ class BalancingMarket(OneSidedMarket):
         if isinstance(offer_or_id, Offer):
             offer_or_id = offer_or_id.id
         offer = self.offers.pop(offer_or_id, None)
+        self.offers_version += 1
         if offer is None:
             raise OfferNotFoundException()
 
@@ -192,11 +232,12 @@ class BalancingMarket(OneSidedMarket):
 
         except Exception:
             # Exception happened - restore offer
-            self.offers[offer.id] = offer
+            self._add_to_offer_book(offer)
             raise
 
         # Delete the accepted offer from self.offers:
         self.offers.pop(offer.id, None)
+        self.offers_version += 1
 
         trade_id, residual_offer = \
             self.bc_interface.handle_blockchain_trade_event(
@@ -222,11 +263,12 @@ class BalancingMarket(OneSidedMarket):
         if isinstance(offer_or_id, Offer):
             offer_or_id = offer_or_id.id
         offer = self.offers.pop(offer_or_id, None)
+        self.offers_version += 1
 
         self._update_min_max_avg_offer_prices()
         if not offer:
             raise OfferNotFoundException()
-        log.debug(f"[BALANCING_OFFER][DEL][{self.time_slot_str}] {offer}")
+        log.debug("[BALANCING_OFFER][DEL][%s] %s", self.time_slot_str, offer)
         self._notify_listeners(MarketEvent.BALANCING_OFFER_DELETED, offer=offer)
 
     def _update_accumulated_trade_price_energy(self, trade):
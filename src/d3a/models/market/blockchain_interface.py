@@ -15,17 +15,12 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
-import uuid
+from collections import namedtuple
+from typing import Dict, List  # noqa
 from d3a.events.event_structures import MarketEvent
 from d3a.d3a_core.exceptions import InvalidTrade
-from d3a_interface.constants_limits import ConstSettings, GlobalConfig
-import platform
-
-
-if platform.python_implementation() != "PyPy" and \
-        ConstSettings.BlockchainSettings.BC_INSTALLED is True:
-    from d3a.models.market.blockchain_utils import create_market_contract, create_new_offer, \
-        cancel_offer, trade_offer
+from d3a.d3a_core.ids import new_id
+from d3a_interface.constants_limits import GlobalConfig
 
 
 BC_EVENT_MAP = {
@@ -35,13 +30,24 @@ BC_EVENT_MAP = {
     b"OfferSplit": MarketEvent.OFFER_SPLIT
 }
 
+OFFER_TRANSACTION = "offer"
+CANCEL_TRANSACTION = "cancel"
+TRADE_TRANSACTION = "trade"
+
+# offer_id is the local id of the offer that is created, cancelled or traded. Trades also
+# reference the local ids of the trade and of the residual offer that the chain creates.
+BlockchainTransaction = namedtuple('BlockchainTransaction', (
+    'type', 'offer_id', 'sender', 'energy', 'price', 'trade_id', 'residual_offer_id'))
+
 
 class NonBlockchainInterface:
+    supports_in_place_fills = True
+
     def __init__(self):
         pass
 
     def create_new_offer(self, energy, price, seller):
-        return str(uuid.uuid4())
+        return new_id()
 
     def cancel_offer(self, offer):
         pass
@@ -50,7 +56,7 @@ class NonBlockchainInterface:
         pass
 
     def handle_blockchain_trade_event(self, offer, buyer, original_offer, residual_offer):
-        return str(uuid.uuid4()), residual_offer
+        return new_id(), residual_offer
 
     def track_trade_event(self, trade):
         pass
@@ -60,21 +66,24 @@ class NonBlockchainInterface:
 
 
 class MarketBlockchainInterface:
+    # The market contract splits every partially traded offer into a new residual offer,
+    # therefore offers can neither be standing nor be filled in place
+    supports_in_place_fills = False
+
     def __init__(self, bc):
         self.offers_deleted = {}  # type: Dict[str, Offer]
         self.offers_changed = {}  # type: Dict[str, (Offer, Offer)]
         self._trades_by_id = {}  # type: Dict[str, Trade]
 
         self.bc_interface = bc
-        self.bc_contract = create_market_contract(bc,
-                                                  GlobalConfig.sim_duration.in_seconds(),
-                                                  [self.bc_listener])
+        self.bc_contract = bc.create_market_contract(
+            GlobalConfig.sim_duration.in_seconds(), [self.bc_listener])
 
     def create_new_offer(self, energy, price, seller):
-        return create_new_offer(self.bc_interface, self.bc_contract, energy, price, seller)
+        return self.bc_interface.create_new_offer(self.bc_contract, energy, price, seller)
 
     def cancel_offer(self, offer):
-        cancel_offer(self.bc_interface, self.bc_contract, offer)
+        self.bc_interface.cancel_offer(self.bc_contract, offer)
         # Hold on to deleted offer until bc event is processed
         self.offers_deleted[offer.id] = offer
 
@@ -82,8 +91,8 @@ class MarketBlockchainInterface:
         self.offers_changed[offer.id] = (original_offer, residual_offer)
 
     def handle_blockchain_trade_event(self, offer, buyer, original_offer, residual_offer):
-        trade_id, new_offer_id = trade_offer(
-            self.bc_interface, self.bc_contract, offer.real_id, offer.energy, buyer
+        trade_id, new_offer_id = self.bc_interface.trade_offer(
+            self.bc_contract, offer.real_id, offer.energy, buyer
         )
 
         if residual_offer is not None:
@@ -113,3 +122,70 @@ class MarketBlockchainInterface:
         #     kwargs['trade'] = interface._trades_by_id.pop(event['tradeId'])
         # interface._notify_listeners(event_type, **kwargs)
         return
+
+
+class BatchedMarketBlockchainInterface(MarketBlockchainInterface):
+    """
+    Collects the offers, cancellations and trades of a market and settles them on the chain in
+    batches (see BlockchainSettlement.settle), instead of one synchronous chain transaction
+    per market action. Offers and trades get local ids, that are mapped to the ids of the
+    chain once the transactions are settled.
+    """
+    def __init__(self, bc):
+        super().__init__(bc)
+        self.pending_transactions = []  # type: List[BlockchainTransaction]
+        # local offer id -> index of the pending transaction that creates the offer
+        self._pending_offers = {}  # type: Dict[str, int]
+        # local offer or trade id -> id on the chain
+        self.chain_ids = {}
+
+    def _add_transaction(self, transaction):
+        if not self.pending_transactions:
+            self.bc_interface.add_pending_market(self)
+        self.pending_transactions.append(transaction)
+
+    def _discard_pending_offer(self, offer_id):
+        index = self._pending_offers.pop(offer_id, None)
+        if index is None:
+            return False
+        self.pending_transactions[index] = None
+        return True
+
+    def create_new_offer(self, energy, price, seller):
+        offer_id = new_id()
+        self._pending_offers[offer_id] = len(self.pending_transactions)
+        self._add_transaction(BlockchainTransaction(
+            OFFER_TRANSACTION, offer_id, seller, energy, price, None, None))
+        return offer_id
+
+    def cancel_offer(self, offer):
+        if offer is None:
+            return
+        self.offers_deleted[offer.id] = offer
+        # Offers that are not on the chain yet are not sent at all
+        if not self._discard_pending_offer(offer.id):
+            self._add_transaction(BlockchainTransaction(
+                CANCEL_TRANSACTION, offer.id, offer.seller, None, None, None, None))
+
+    def handle_blockchain_trade_event(self, offer, buyer, original_offer, residual_offer):
+        trade_id = new_id()
+        residual_offer_id = None
+        if residual_offer is not None:
+            # The chain creates the residual offer as part of the trade
+            self._discard_pending_offer(residual_offer.id)
+            residual_offer_id = residual_offer.id
+        self._add_transaction(BlockchainTransaction(
+            TRADE_TRANSACTION, offer.id, buyer, offer.energy, None, trade_id, residual_offer_id))
+        return trade_id, residual_offer
+
+    def settle(self):
+        """
+        Sends the pending transactions to the chain, returns the number of transactions.
+        """
+        transactions = [t for t in self.pending_transactions if t is not None]
+        self.pending_transactions = []
+        self._pending_offers = {}
+        if transactions:
+            self.bc_interface.settle_transactions(self.bc_contract, transactions,
+                                                  self.chain_ids)
+        return len(transactions)
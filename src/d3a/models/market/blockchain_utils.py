@@ -20,6 +20,7 @@ from logging import getLogger
 from d3a.d3a_core.exceptions import D3AException
 from d3a.d3a_core.util import retry_function
 from d3a.blockchain.utils import unlock_account, wait_for_node_synchronization
+from d3a.models.market.blockchain_interface import OFFER_TRANSACTION, CANCEL_TRANSACTION
 from d3a_interface.utils import wait_until_timeout_blocking
 
 log = getLogger(__name__)
@@ -128,6 +129,10 @@ def trade_offer(bc_interface, bc_contract, offer_id, energy, buyer):
         new_trade_retval = bc_contract.events.NewTrade().processReceipt(tx_receipt)
         log.debug(f"new_trade_retval after retry: {new_trade_retval}")
 
+    return _trade_ids(bc_contract, tx_receipt, new_trade_retval)
+
+
+def _trade_ids(bc_contract, tx_receipt, new_trade_retval):
     offer_changed_retval = bc_contract.events \
         .OfferChanged() \
         .processReceipt(tx_receipt)
@@ -146,3 +151,42 @@ def trade_offer(bc_interface, bc_contract, offer_id, energy, buyer):
         if len(offer_changed_retval) > 0 \
         else None
     return trade_id, new_offer_id
+
+
+def send_transaction(bc_interface, bc_contract, transaction, chain_ids):
+    """
+    Sends a transaction to the market contract without waiting for its receipt.
+    """
+    sender = bc_interface.users[transaction.sender].address
+    unlock_account(bc_interface.chain, sender)
+    if transaction.type == OFFER_TRANSACTION:
+        function = bc_contract.functions.offer(int(transaction.energy * BC_NUM_FACTOR),
+                                               int(transaction.price * BC_NUM_FACTOR))
+    elif transaction.type == CANCEL_TRANSACTION:
+        function = bc_contract.functions.cancel(chain_ids[transaction.offer_id])
+    else:
+        function = bc_contract.functions.trade(chain_ids[transaction.offer_id],
+                                               int(transaction.energy * BC_NUM_FACTOR))
+    return function.transact({"from": sender})
+
+
+def transaction_results(bc_interface, bc_contract, transactions, tx_hashes):
+    """
+    Waits for the receipts of sent transactions, returns the offer ids of the offer
+    transactions and the trade and residual offer ids of the trade transactions.
+    """
+    tx_receipts = [bc_interface.chain.eth.waitForTransactionReceipt(tx_hash)
+                   for tx_hash in tx_hashes]
+    wait_for_node_synchronization(bc_interface)
+    results = []
+    for transaction, tx_receipt in zip(transactions, tx_receipts):
+        assert tx_receipt["status"] > 0
+        if transaction.type == OFFER_TRANSACTION:
+            results.append(
+                bc_contract.events.NewOffer().processReceipt(tx_receipt)[0]['args']["offerId"])
+        elif transaction.type == CANCEL_TRANSACTION:
+            results.append(None)
+        else:
+            results.append(_trade_ids(bc_contract, tx_receipt,
+                                      bc_contract.events.NewTrade().processReceipt(tx_receipt)))
+    return results
@@ -33,7 +33,7 @@ def my_converter(o):
 
 class Offer:
     def __init__(self, id, time, price, energy, seller,
-                 original_offer_price=None, seller_origin=None):
+                 original_offer_price=None, seller_origin=None, standing=False):
         self.id = str(id)
         self.real_id = id
         self.price = price
@@ -43,6 +43,8 @@ class Offer:
         self.seller_origin = seller_origin
         self.energy_rate = price / energy
         self.time = time
+        # Standing offers are never exhausted, partial trades are filled without splitting them
+        self.standing = standing
 
     def update_price(self, price):
         self.price = price
@@ -95,8 +97,18 @@ class Offer:
 
 
 def copy_offer(offer):
-    return Offer(offer.id, offer.time, offer.price, offer.energy, offer.seller,
-                 offer.original_offer_price, offer.seller_origin)
+    offer_copy = Offer(offer.id, offer.time, offer.price, offer.energy, offer.seller,
+                       offer.original_offer_price, offer.seller_origin, offer.standing)
+    offer_copy.real_id = offer.real_id
+    return offer_copy
+
+
+def is_standing_pair(offer, bid):
+    """
+    Standing offers and bids are never matched with each other, since they would trade
+    unlimited energy on every matching
+    """
+    return offer.standing and bid.standing
 
 
 def offer_from_JSON_string(offer_string, current_time):
@@ -112,14 +124,14 @@ def offer_from_JSON_string(offer_string, current_time):
 
 
 class Bid(namedtuple('Bid', ('id', 'time', 'price', 'energy', 'buyer', 'seller',
-                             'original_bid_price', 'buyer_origin', 'energy_rate'))):
+                             'original_bid_price', 'buyer_origin', 'energy_rate', 'standing'))):
     def __new__(cls, id, time, price, energy, buyer, seller, original_bid_price=None,
-                buyer_origin=None, energy_rate=None):
+                buyer_origin=None, energy_rate=None, standing=False):
         if energy_rate is None:
             energy_rate = price / energy
         # overridden to give the residual field a default value
         return super(Bid, cls).__new__(cls, str(id), time, price, energy, buyer, seller,
-                                       original_bid_price, buyer_origin, energy_rate)
+                                       original_bid_price, buyer_origin, energy_rate, standing)
 
     def __repr__(self):
         return (
@@ -203,6 +215,14 @@ class Trade(namedtuple('Trade', ('id', 'time', 'offer', 'seller', 'buyer', 'resi
                                          already_tracked, offer_bid_trade_info, seller_origin,
                                          buyer_origin, fee_price)
 
+    @property
+    def filled_in_place(self):
+        """
+        True if only part of the offer or bid was traded and its remaining energy stayed in
+        the market under the same id, as the residual of the trade.
+        """
+        return self.residual is not None and self.residual.id == self.offer.id
+
     def __str__(self):
         return (
             "{{{s.id!s:.6s}}} [origin: {s.seller_origin} -> {s.buyer_origin}] "
@@ -280,6 +300,8 @@ class BalancingTrade(namedtuple('BalancingTrade', ('id', 'time', 'offer', 'selle
                                                   buyer, residual, offer_bid_trade_info,
                                                   seller_origin, buyer_origin, fee_price)
 
+    filled_in_place = Trade.filled_in_place
+
     def __str__(self):
         return (
             "{{{s.id!s:.6s}}} [{s.seller} -> {s.buyer}] "
@@ -15,18 +15,18 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
-from typing import Union  # noqa
+from typing import Dict, Union  # noqa
 from logging import getLogger
 from pendulum import DateTime
 
 from d3a.events.event_structures import MarketEvent
-from d3a.models.market.market_structures import Offer, Trade
+from d3a.models.market.market_structures import Offer, Trade, copy_offer
 from d3a.models.market import Market, lock_market_action
 from d3a.d3a_core.exceptions import InvalidOffer, MarketReadOnlyException, \
     OfferNotFoundException, InvalidTrade
-from d3a.d3a_core.util import short_offer_bid_log_str
-from d3a.models.market.blockchain_interface import MarketBlockchainInterface, \
-    NonBlockchainInterface
+from d3a.d3a_core.util import short_offer_bid_log_str, LazyLogStr
+from d3a.models.market.blockchain_interface import NonBlockchainInterface
+from d3a.constants import FLOATING_POINT_TOLERANCE
 from d3a_interface.constants_limits import ConstSettings
 
 log = getLogger(__name__)
@@ -39,9 +39,24 @@ class OneSidedMarket(Market):
                  transfer_fees=None, name=None, in_sim_duration=True):
         super().__init__(time_slot, bc, notification_listener, readonly, grid_fee_type,
                          transfer_fees, name)
-        self.bc_interface = MarketBlockchainInterface(bc) \
-            if bc is not None \
+        self.in_sim_duration = in_sim_duration
+
+    def _init_slot(self, time_slot, notification_listener, grid_fee_type, transfer_fees):
+        super()._init_slot(time_slot, notification_listener, grid_fee_type, transfer_fees)
+        self.bc_interface = self.bc.create_market_interface() \
+            if self.bc \
             else NonBlockchainInterface()
+        # offer-id -> index of the offer in offer_history, as long as the history entry is
+        # the live offer itself. It is replaced by a copy before the offer is first reduced.
+        self._offer_history_index = {}  # type: Dict[str, int]
+
+    def recycle(self, time_slot, notification_listener, grid_fee_type, transfer_fees,
+                in_sim_duration=True):
+        """
+        Reset the market of a deleted time slot to an empty market of the time slot, with a
+        new id. Used instead of creating a new market at market cycle.
+        """
+        self._init_slot(time_slot, notification_listener, grid_fee_type, transfer_fees)
         self.in_sim_duration = in_sim_duration
 
     def __repr__(self):  # pragma: no cover
@@ -78,7 +93,7 @@ class OneSidedMarket(Market):
     @lock_market_action
     def offer(self, price: float, energy: float, seller: str, seller_origin,
               offer_id=None, original_offer_price=None, dispatch_event=True,
-              adapt_price_with_fees=True, add_to_history=True) -> Offer:
+              adapt_price_with_fees=True, add_to_history=True, standing=False) -> Offer:
         if self.readonly:
             raise MarketReadOnlyException()
         if energy <= 0:
@@ -92,14 +107,17 @@ class OneSidedMarket(Market):
         if offer_id is None:
             offer_id = self.bc_interface.create_new_offer(energy, price, seller)
         offer = Offer(offer_id, self.now, price, energy, seller, original_offer_price,
-                      seller_origin=seller_origin)
+                      seller_origin=seller_origin,
+                      standing=standing and self.bc_interface.supports_in_place_fills)
 
         self.offers[offer.id] = offer
+        self.offers_version += 1
         if add_to_history is True:
+            self._offer_history_index[offer.id] = len(self.offer_history)
             self.offer_history.append(offer)
             self._update_min_max_avg_offer_prices()
 
-        log.debug(f"[OFFER][NEW][{self.name}][{self.time_slot_str}] {offer}")
+        log.debug("[OFFER][NEW][%s][%s] %s", self.name, self.time_slot_str, offer)
         if dispatch_event is True:
             self.dispatch_market_offer_event(offer)
         return offer
@@ -114,15 +132,55 @@ class OneSidedMarket(Market):
         if isinstance(offer_or_id, Offer):
             offer_or_id = offer_or_id.id
         offer = self.offers.pop(offer_or_id, None)
-        self.bc_interface.cancel_offer(offer)
+        self.offers_version += 1
 
         self._update_min_max_avg_offer_prices()
         if not offer:
             raise OfferNotFoundException()
-        log.debug(f"[OFFER][DEL][{self.name}][{self.time_slot_str}] {offer}")
+        self.bc_interface.cancel_offer(offer)
+        log.debug("[OFFER][DEL][%s][%s] %s", self.name, self.time_slot_str, offer)
         # TODO: Once we add event-driven blockchain, this should be asynchronous
         self._notify_listeners(MarketEvent.OFFER_DELETED, offer=offer)
 
+    @lock_market_action
+    def reduce_offer(self, offer_or_id: Union[str, Offer], energy: float) -> Offer:
+        """
+        Reduce the energy of an offer in place to energy, the offer keeps its id. Offers without
+        remaining energy are deleted. Used to mirror the partial trades of an offer on the
+        forwarded copies of it, which are notified by the OFFER_CHANGED event.
+        """
+        if self.readonly:
+            raise MarketReadOnlyException()
+        if isinstance(offer_or_id, Offer):
+            offer_or_id = offer_or_id.id
+        offer = self.offers.get(offer_or_id)
+        if offer is None:
+            raise OfferNotFoundException()
+        if energy > offer.energy or not self.bc_interface.supports_in_place_fills:
+            raise InvalidOffer()
+        if energy <= FLOATING_POINT_TOLERANCE:
+            self.delete_offer(offer)
+            return None
+
+        self._reduce_offer_energy(offer, energy, self._calculate_original_prices(offer))
+        self._update_min_max_avg_offer_prices()
+        self._notify_listeners(MarketEvent.OFFER_CHANGED, offer=offer)
+        return offer
+
+    def _reduce_offer_energy(self, offer, energy, orig_offer_price):
+        # The history keeps the offer as it was posted
+        history_index = self._offer_history_index.pop(offer.id, None)
+        if history_index is not None:
+            self.offer_history[history_index] = copy_offer(offer)
+
+        log.debug("[OFFER][REDUCE][%s][%s] %s to %s kWh", self.name, self.time_slot_str,
+                  LazyLogStr(short_offer_bid_log_str, offer), energy)
+        offer.original_offer_price = energy / offer.energy * orig_offer_price
+        remaining_price = energy / offer.energy * offer.price
+        offer.energy = energy
+        offer.update_price(remaining_price)
+        self.offers_version += 1
+
     def _update_offer_fee_and_calculate_final_price(self, energy, trade_rate,
                                                     energy_portion, original_price):
         if self._is_constant_fees:
@@ -140,6 +198,7 @@ class OneSidedMarket(Market):
     def split_offer(self, original_offer, energy, orig_offer_price):
 
         self.offers.pop(original_offer.id, None)
+        self.offers_version += 1
         # same offer id is used for the new accepted_offer
         original_accepted_price = energy / original_offer.energy * orig_offer_price
         accepted_offer = self.offer(offer_id=original_offer.id,
@@ -151,6 +210,7 @@ class OneSidedMarket(Market):
                                     seller_origin=original_offer.seller_origin,
                                     adapt_price_with_fees=False,
                                     add_to_history=False)
+        self._accept_split_offer_on_chain(accepted_offer, original_offer)
 
         residual_price = (1 - energy / original_offer.energy) * original_offer.price
         residual_energy = original_offer.energy - energy
@@ -166,10 +226,11 @@ class OneSidedMarket(Market):
                                     seller_origin=original_offer.seller_origin,
                                     adapt_price_with_fees=False)
 
-        log.debug(f"[OFFER][SPLIT][{self.time_slot_str}, {self.name}] "
-                  f"({short_offer_bid_log_str(original_offer)} into "
-                  f"{short_offer_bid_log_str(accepted_offer)} and "
-                  f"{short_offer_bid_log_str(residual_offer)}")
+        log.debug("[OFFER][SPLIT][%s, %s] (%s into %s and %s",
+                  self.time_slot_str, self.name,
+                  LazyLogStr(short_offer_bid_log_str, original_offer),
+                  LazyLogStr(short_offer_bid_log_str, accepted_offer),
+                  LazyLogStr(short_offer_bid_log_str, residual_offer))
 
         self.bc_interface.change_offer(accepted_offer, original_offer, residual_offer)
 
@@ -181,6 +242,19 @@ class OneSidedMarket(Market):
 
         return accepted_offer, residual_offer
 
+    def fill_offer(self, offer, energy, orig_offer_price):
+        """
+        Return the traded part of an offer, which keeps the id of the offer. Unlike
+        split_offer, neither a residual offer nor an OFFER_SPLIT event is created and the
+        offer itself is left unchanged: standing offers stay in the market as they are, other
+        offers are reduced in place by accept_offer once the trade price is known.
+        """
+        filled_offer = Offer(offer.id, offer.time, offer.price * (energy / offer.energy),
+                             energy, offer.seller, energy / offer.energy * orig_offer_price,
+                             seller_origin=offer.seller_origin, standing=offer.standing)
+        filled_offer.real_id = offer.real_id
+        return filled_offer
+
     def determine_offer_price(self, energy_portion, energy, trade_rate,
                               trade_bid_info, orig_offer_price):
         if ConstSettings.IAASettings.MARKET_TYPE == 1:
@@ -205,13 +279,20 @@ class OneSidedMarket(Market):
 
         if isinstance(offer_or_id, Offer):
             offer_or_id = offer_or_id.id
-        offer = self.offers.pop(offer_or_id, None)
+        offer = self.offers.get(offer_or_id)
         if offer is None:
             raise OfferNotFoundException()
 
         if energy is None:
             energy = offer.energy
 
+        # Standing offers and partially traded offers stay in the market with their id
+        fill_in_place = offer.standing or \
+            (energy < offer.energy and self.bc_interface.supports_in_place_fills)
+        if not fill_in_place:
+            del self.offers[offer_or_id]
+        self.offers_version += 1
+
         original_offer = offer
         residual_offer = None
 
@@ -226,16 +307,33 @@ class OneSidedMarket(Market):
 
             if energy == 0:
                 raise InvalidTrade("Energy can not be zero.")
+            elif offer.standing and energy <= offer.energy:
+                filled_offer = self.fill_offer(offer, energy, orig_offer_price)
+
+                fee_price, trade_price = self.determine_offer_price(
+                    energy_portion=1, energy=energy, trade_rate=trade_rate,
+                    trade_bid_info=trade_bid_info,
+                    orig_offer_price=filled_offer.original_offer_price)
+
+                offer = filled_offer
+                offer.update_price(trade_price)
             elif energy < offer.energy:
                 # partial energy is requested
-
-                accepted_offer, residual_offer = self.split_offer(offer, energy, orig_offer_price)
+                if fill_in_place:
+                    accepted_offer = self.fill_offer(offer, energy, orig_offer_price)
+                else:
+                    accepted_offer, residual_offer = \
+                        self.split_offer(offer, energy, orig_offer_price)
 
                 fee_price, trade_price = self.determine_offer_price(
                     energy_portion=energy / accepted_offer.energy, energy=energy,
                     trade_rate=trade_rate, trade_bid_info=trade_bid_info,
                     orig_offer_price=orig_offer_price)
 
+                if fill_in_place:
+                    # Only reduce the offer once the trade can not fail anymore
+                    self._reduce_offer_energy(offer, offer.energy - energy, orig_offer_price)
+                    residual_offer = original_offer
                 offer = accepted_offer
                 offer.update_price(trade_price)
 
@@ -248,7 +346,9 @@ class OneSidedMarket(Market):
                 offer.update_price(trade_price)
         except Exception:
             # Exception happened - restore offer
-            self.offers[offer.id] = offer
+            if not fill_in_place:
+                self.offers[offer.id] = offer
+                self.offers_version += 1
             raise
 
         trade_id, residual_offer = \
@@ -256,8 +356,10 @@ class OneSidedMarket(Market):
                 offer, buyer, original_offer, residual_offer
             )
 
-        # Delete the accepted offer from self.offers:
-        self.offers.pop(offer.id, None)
+        # Delete the accepted offer from self.offers, unless it was filled in place:
+        if not fill_in_place:
+            self.offers.pop(offer.id, None)
+            self.offers_version += 1
         offer_bid_trade_info = self.fee_class.propagate_original_bid_info_on_offer_trade(
             trade_original_info=trade_bid_info)
         trade = Trade(trade_id, time, offer, offer.seller, buyer, residual_offer,
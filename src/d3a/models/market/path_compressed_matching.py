@@ -0,0 +1,189 @@
+"""
+Copyright 2018 Grid Singularity
+This file is part of D3A.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+from collections import namedtuple
+
+import d3a.constants
+from d3a.constants import FLOATING_POINT_TOLERANCE
+from d3a.models.market.market_structures import is_standing_pair
+from d3a_interface.constants_limits import ConstSettings
+
+
+# Market of a time slot in the area tree. The engine forwards the orders of the market to the
+# market of the parent node.
+MarketNode = namedtuple('MarketNode', ('market', 'engine', 'children'))
+# Open order of a market below a node, with its rate in the market of the node, the name it is
+# traded with in the market of the node and the engines that forward it there
+PathOrder = namedtuple('PathOrder', ('order', 'market', 'rate', 'trader', 'engines'))
+
+
+def path_compressed_matching_enabled():
+    return d3a.constants.PATH_COMPRESSED_MATCHING and \
+        ConstSettings.IAASettings.MARKET_TYPE == 2 and \
+        not ConstSettings.GeneralSettings.EVENT_DISPATCHING_VIA_REDIS
+
+
+def forwarded_offer_rate(target_market, offer_rate, original_offer_rate):
+    """Rate of an offer that is forwarded to the target market, including its grid fee"""
+    fee_class = target_market.fee_class
+    return fee_class.update_incoming_offer_with_fee(
+        fee_class.update_forwarded_offer_with_fee(offer_rate, original_offer_rate),
+        original_offer_rate)
+
+
+def forwarded_bid_rate(source_market, target_market, bid_rate, original_bid_rate):
+    """Rate of a bid that is forwarded from the source to the target market"""
+    return target_market.fee_class.update_incoming_bid_with_fee(
+        source_market.fee_class.update_forwarded_bid_with_fee(bid_rate, original_bid_rate),
+        original_bid_rate)
+
+
+class PathCompressedMatcher:
+    """
+    Matches the offers and bids of all markets of a time slot in the area tree at once, instead
+    of forwarding them one market at a time by the IAAs and matching every market on its own.
+    The rates of the orders in the ancestor markets are calculated from the grid fees along
+    their paths, and every pair is matched in the lowest market that both orders reach.
+    Only the traded energy of a matched pair is forwarded along the paths by the IAA engines,
+    and traded in the market where it was matched, which settles the chain of trades in the
+    markets below it as usual.
+    """
+
+    def __init__(self, area):
+        self.area = area
+        # time slot -> book versions of the markets of the time slot after the last matching
+        self._matched_book_versions = {}
+
+    def match(self):
+        matched_book_versions = {}
+        for market in self.area.all_markets:
+            agent_names = set()
+            root = self._market_node(self.area, market, None, agent_names)
+            book_versions = self._book_versions(root)
+            if self._matched_book_versions.get(market.time_slot) != book_versions:
+                self._match_node(root, agent_names)
+                book_versions = self._book_versions(root)
+            matched_book_versions[market.time_slot] = book_versions
+        self._matched_book_versions = matched_book_versions
+
+    def _market_node(self, area, market, engine, agent_names):
+        children = []
+        for child in area.children:
+            agent = child.dispatcher.interarea_agents.get(market.time_slot, {}).get(child.name)
+            if agent is None or not child.events.is_connected or not child.events.is_enabled:
+                continue
+            agent_names.add(agent.name)
+            child_engine = next(e for e in agent.engines
+                                if e.markets.source is agent.lower_market)
+            children.append(
+                self._market_node(child, agent.lower_market, child_engine, agent_names))
+        return MarketNode(market, engine, children)
+
+    def _book_versions(self, node):
+        book_versions = [node.market.book_version]
+        for child in node.children:
+            book_versions.extend(self._book_versions(child))
+        return book_versions
+
+    def _match_node(self, node, agent_names):
+        """
+        Match the orders of the markets of the subtree of the node, children first. Returns
+        the open offers and bids of the subtree with their rates in the market of the node.
+        """
+        market = node.market
+        offers = [PathOrder(offer, market, offer.energy_rate, offer.seller, ())
+                  for offer in market.offers.values() if offer.seller not in agent_names]
+        bids = [PathOrder(bid, market, bid.energy_rate, bid.buyer, ())
+                for bid in market.bids.values() if bid.buyer not in agent_names]
+        for child in node.children:
+            child_offers, child_bids = self._match_node(child, agent_names)
+            offers.extend(self._forward_offer(offer, child.engine)
+                          for offer in child_offers if offer.order.price >= 0.0)
+            bids.extend(self._forward_bid(bid, child.engine) for bid in child_bids)
+
+        pairs = self._pay_as_bid_pairs(offers, bids)
+        while pairs:
+            traded = [self._trade(market, bid, offer) for bid, offer in pairs]
+            offers = self._open_offers(offers)
+            bids = self._open_bids(bids)
+            if not any(traded):
+                break
+            pairs = self._pay_as_bid_pairs(offers, bids)
+        return offers, bids
+
+    @staticmethod
+    def _forward_offer(offer, engine):
+        original_offer_rate = offer.order.original_offer_price / offer.order.energy
+        return PathOrder(
+            offer.order, offer.market,
+            forwarded_offer_rate(engine.markets.target, offer.rate, original_offer_rate),
+            engine.owner.name, offer.engines + (engine, ))
+
+    @staticmethod
+    def _forward_bid(bid, engine):
+        original_bid_rate = bid.order.original_bid_price / bid.order.energy
+        return PathOrder(
+            bid.order, bid.market,
+            forwarded_bid_rate(engine.markets.source, engine.markets.target, bid.rate,
+                               original_bid_rate),
+            engine.owner.name, bid.engines + (engine, ))
+
+    @staticmethod
+    def _open_offers(offers):
+        return [offer._replace(order=offer.market.offers[offer.order.id])
+                for offer in offers if offer.order.id in offer.market.offers]
+
+    @staticmethod
+    def _open_bids(bids):
+        return [bid._replace(order=bid.market.bids[bid.order.id])
+                for bid in bids if bid.order.id in bid.market.bids]
+
+    @staticmethod
+    def _pay_as_bid_pairs(offers, bids):
+        # Same pairing as TwoSidedPayAsBid._perform_pay_as_bid_matching, on the rates of the
+        # orders in the market of the node
+        sorted_bids = sorted(bids, key=lambda b: b.rate, reverse=True)
+        sorted_offers = sorted(offers, key=lambda o: o.rate, reverse=True)
+
+        already_selected_bids = set()
+        offer_bid_pairs = []
+        for offer in sorted_offers:
+            for bid in sorted_bids:
+                if bid.order.id not in already_selected_bids and \
+                        (offer.rate - bid.rate) <= FLOATING_POINT_TOLERANCE and \
+                        offer.trader != bid.trader and \
+                        not is_standing_pair(offer.order, bid.order):
+                    already_selected_bids.add(bid.order.id)
+                    offer_bid_pairs.append((bid, offer))
+                    break
+        return offer_bid_pairs
+
+    @staticmethod
+    def _trade(market, bid, offer):
+        # Trades of the previous pairs may have changed the orders
+        offer_order = offer.market.offers.get(offer.order.id)
+        bid_order = bid.market.bids.get(bid.order.id)
+        if offer_order is None or bid_order is None:
+            return False
+
+        energy = min(offer_order.energy, bid_order.energy)
+        for engine in offer.engines:
+            offer_order = engine.forward_offer_part(offer_order, energy)
+        for engine in bid.engines:
+            bid_order = engine.forward_bid_part(bid_order, energy)
+        market.match_bid_offer_pair(bid_order, offer_order)
+        return True
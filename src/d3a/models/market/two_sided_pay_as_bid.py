@@ -15,23 +15,26 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
-import uuid
 from typing import Union  # noqa
 from logging import getLogger
 
 from d3a.models.market import lock_market_action
 from d3a.models.market.one_sided import OneSidedMarket
-from d3a.d3a_core.exceptions import BidNotFound, InvalidBid, InvalidTrade
-from d3a.models.market.market_structures import Bid, Trade, TradeBidInfo
+from d3a.d3a_core.exceptions import BidNotFound, InvalidBid, InvalidTrade, \
+    MarketReadOnlyException
+from d3a.models.market.market_structures import Bid, Trade, TradeBidInfo, is_standing_pair
 from d3a.events.event_structures import MarketEvent
 from d3a.constants import FLOATING_POINT_TOLERANCE
-from d3a.d3a_core.util import short_offer_bid_log_str
+from d3a.d3a_core.util import short_offer_bid_log_str, LazyLogStr
+from d3a.d3a_core.ids import new_id
 from d3a_interface.constants_limits import ConstSettings
 
 log = getLogger(__name__)
 
 
 class TwoSidedPayAsBid(OneSidedMarket):
+    # Skip matching if no offer or bid has been added or removed since the last matching
+    skip_unchanged_book = True
 
     def __init__(self, time_slot=None, bc=None, notification_listener=None, readonly=False,
                  grid_fee_type=ConstSettings.IAASettings.GRID_FEE_TYPE,
@@ -39,6 +42,11 @@ class TwoSidedPayAsBid(OneSidedMarket):
         super().__init__(time_slot, bc, notification_listener, readonly, grid_fee_type,
                          transfer_fees, name, in_sim_duration=in_sim_duration)
 
+    def _init_slot(self, time_slot, notification_listener, grid_fee_type, transfer_fees):
+        super()._init_slot(time_slot, notification_listener, grid_fee_type, transfer_fees)
+        # Book version of the last matching, skipped if the book has not changed since
+        self._matched_book_version = None
+
     def __repr__(self):  # pragma: no cover
         return "<TwoSidedPayAsBid{} bids: {} (E: {} kWh V:{}) " \
                "offers: {} (E: {} kWh V: {}) trades: {} (E: {} kWh, V: {})>"\
@@ -63,7 +71,8 @@ class TwoSidedPayAsBid(OneSidedMarket):
 
     @lock_market_action
     def bid(self, price: float, energy: float, buyer: str, seller: str, buyer_origin,
-            bid_id: str = None, original_bid_price=None, adapt_price_with_fees=True) -> Bid:
+            bid_id: str = None, original_bid_price=None, adapt_price_with_fees=True,
+            standing=False) -> Bid:
         if energy <= 0:
             raise InvalidBid()
 
@@ -73,11 +82,13 @@ class TwoSidedPayAsBid(OneSidedMarket):
         if adapt_price_with_fees:
             price = self._update_new_bid_price_with_fee(price, original_bid_price)
 
-        bid = Bid(str(uuid.uuid4()) if bid_id is None else bid_id,
-                  self.now, price, energy, buyer, seller, original_bid_price, buyer_origin)
+        bid = Bid(new_id() if bid_id is None else bid_id,
+                  self.now, price, energy, buyer, seller, original_bid_price, buyer_origin,
+                  standing=standing)
         self.bids[bid.id] = bid
+        self.bids_version += 1
         self.bid_history.append(bid)
-        log.debug(f"[BID][NEW][{self.time_slot_str}] {bid}")
+        log.debug("[BID][NEW][%s] %s", self.time_slot_str, bid)
         return bid
 
     @lock_market_action
@@ -87,12 +98,14 @@ class TwoSidedPayAsBid(OneSidedMarket):
         bid = self.bids.pop(bid_or_id, None)
         if not bid:
             raise BidNotFound(bid_or_id)
-        log.debug(f"[BID][DEL][{self.time_slot_str}] {bid}")
+        self.bids_version += 1
+        log.debug("[BID][DEL][%s] %s", self.time_slot_str, bid)
         self._notify_listeners(MarketEvent.BID_DELETED, bid=bid)
 
     def split_bid(self, original_bid, energy, orig_bid_price):
 
         self.bids.pop(original_bid.id, None)
+        self.bids_version += 1
         # same bid id is used for the new accepted_bid
         original_accepted_price = energy / original_bid.energy * orig_bid_price
         accepted_bid = self.bid(bid_id=original_bid.id,
@@ -118,10 +131,11 @@ class TwoSidedPayAsBid(OneSidedMarket):
                                 buyer_origin=original_bid.buyer_origin,
                                 adapt_price_with_fees=False)
 
-        log.debug(f"[BID][SPLIT][{self.time_slot_str}, {self.name}] "
-                  f"({short_offer_bid_log_str(original_bid)} into "
-                  f"{short_offer_bid_log_str(accepted_bid)} and "
-                  f"{short_offer_bid_log_str(residual_bid)}")
+        log.debug("[BID][SPLIT][%s, %s] (%s into %s and %s",
+                  self.time_slot_str, self.name,
+                  LazyLogStr(short_offer_bid_log_str, original_bid),
+                  LazyLogStr(short_offer_bid_log_str, accepted_bid),
+                  LazyLogStr(short_offer_bid_log_str, residual_bid))
 
         self._notify_listeners(MarketEvent.BID_SPLIT,
                                original_bid=original_bid,
@@ -130,6 +144,56 @@ class TwoSidedPayAsBid(OneSidedMarket):
 
         return accepted_bid, residual_bid
 
+    def fill_bid(self, bid, energy, orig_bid_price):
+        """
+        Return the traded part of a bid, which keeps the id of the bid. Unlike split_bid,
+        neither a residual bid with a new id nor a BID_SPLIT event is created and the bid in
+        the market is left unchanged: standing bids stay in the market as they are, other bids
+        are replaced by their remaining part by accept_bid once the trade price is known.
+        """
+        return bid._replace(
+            price=bid.price * (energy / bid.energy),
+            energy=energy,
+            original_bid_price=energy / bid.energy * orig_bid_price)
+
+    @lock_market_action
+    def reduce_bid(self, bid_or_id: Union[str, Bid], energy: float) -> Bid:
+        """
+        Reduce the energy of a bid to energy, the bid keeps its id. Bids without remaining
+        energy are deleted. Used to mirror the partial trades of a bid on the forwarded copies
+        of it, which are notified by the BID_CHANGED event.
+        """
+        if self.readonly:
+            raise MarketReadOnlyException()
+        if isinstance(bid_or_id, Bid):
+            bid_or_id = bid_or_id.id
+        bid = self.bids.get(bid_or_id)
+        if bid is None:
+            raise BidNotFound(bid_or_id)
+        if energy > bid.energy:
+            raise InvalidBid()
+        if energy <= FLOATING_POINT_TOLERANCE:
+            self.delete_bid(bid_or_id)
+            return None
+
+        orig_bid_price = bid.original_bid_price \
+            if bid.original_bid_price is not None else bid.price
+        bid = self._reduce_bid_energy(bid, energy, orig_bid_price)
+        self._notify_listeners(MarketEvent.BID_CHANGED, bid=bid)
+        return bid
+
+    def _reduce_bid_energy(self, bid, energy, orig_bid_price):
+        # Bids are immutable, the bid history keeps the bid as it was posted
+        remaining_price = energy / bid.energy * bid.price
+        remaining_bid = bid._replace(price=remaining_price, energy=energy,
+                                     original_bid_price=energy / bid.energy * orig_bid_price,
+                                     energy_rate=remaining_price / energy)
+        self.bids[bid.id] = remaining_bid
+        self.bids_version += 1
+        log.debug("[BID][REDUCE][%s][%s] %s to %s kWh", self.name, self.time_slot_str,
+                  LazyLogStr(short_offer_bid_log_str, bid), energy)
+        return remaining_bid
+
     def determine_bid_price(self, trade_offer_info, energy):
         revenue, grid_fee_rate, final_trade_rate = \
             self.fee_class.calculate_trade_price_and_fees(trade_offer_info)
@@ -139,7 +203,7 @@ class TwoSidedPayAsBid(OneSidedMarket):
     def accept_bid(self, bid: Bid, energy: float = None,
                    seller: str = None, buyer: str = None, already_tracked: bool = False,
                    trade_rate: float = None, trade_offer_info=None, seller_origin=None):
-        market_bid = self.bids.pop(bid.id, None)
+        market_bid = self.bids.get(bid.id)
         if market_bid is None:
             raise BidNotFound("During accept bid: " + str(bid))
 
@@ -147,6 +211,11 @@ class TwoSidedPayAsBid(OneSidedMarket):
         buyer = market_bid.buyer if buyer is None else buyer
         energy = market_bid.energy if energy is None else energy
 
+        # Standing bids and partially traded bids stay in the market with their id
+        if not market_bid.standing and energy >= market_bid.energy:
+            del self.bids[bid.id]
+            self.bids_version += 1
+
         orig_price = bid.original_bid_price if bid.original_bid_price is not None else bid.price
         residual_bid = None
 
@@ -154,21 +223,18 @@ class TwoSidedPayAsBid(OneSidedMarket):
             raise InvalidTrade("Energy cannot be negative or zero.")
         elif energy > market_bid.energy:
             raise InvalidTrade("Traded energy cannot be more than the bid energy.")
-        elif energy < market_bid.energy:
-            # partial bid trade
-            accepted_bid, residual_bid = self.split_bid(market_bid, energy, orig_price)
-            bid = accepted_bid
-
-            # Delete the accepted bid from self.bids:
-            try:
-                self.bids.pop(accepted_bid.id)
-            except KeyError:
-                raise BidNotFound(f"Bid {accepted_bid.id} not found in self.bids ({self.name}).")
+        elif market_bid.standing or energy < market_bid.energy:
+            # Standing bids and partial bid trades are filled without splitting the bid
+            bid = self.fill_bid(market_bid, energy, orig_price)
         else:
             # full bid trade, nothing further to do here
             pass
 
         fee_price, trade_price = self.determine_bid_price(trade_offer_info, energy)
+        if not market_bid.standing and energy < market_bid.energy:
+            # Only reduce the bid once the trade can not fail anymore
+            residual_bid = self._reduce_bid_energy(
+                market_bid, market_bid.energy - energy, orig_price)
         bid = bid._replace(price=trade_price)
 
         # Do not adapt grid fees when creating the bid_trade_info structure, to mimic
@@ -177,7 +243,7 @@ class TwoSidedPayAsBid(OneSidedMarket):
             trade_offer_info, ignore_fees=True
         )
 
-        trade = Trade(str(uuid.uuid4()), self.now, bid, seller,
+        trade = Trade(new_id(), self.now, bid, seller,
                       buyer, residual_bid, already_tracked=already_tracked,
                       offer_bid_trade_info=updated_bid_trade_info,
                       buyer_origin=bid.buyer_origin, seller_origin=seller_origin,
@@ -210,7 +276,8 @@ class TwoSidedPayAsBid(OneSidedMarket):
             for bid in sorted_bids:
                 if bid.id not in already_selected_bids and \
                         (offer.energy_rate - bid.energy_rate) <= \
-                        FLOATING_POINT_TOLERANCE and offer.seller != bid.buyer:
+                        FLOATING_POINT_TOLERANCE and offer.seller != bid.buyer and \
+                        not is_standing_pair(offer, bid):
                     already_selected_bids.add(bid.id)
                     offer_bid_pairs.append(tuple((bid, offer)))
                     break
@@ -236,19 +303,34 @@ class TwoSidedPayAsBid(OneSidedMarket):
                                     seller_origin=offer.seller_origin)
         return bid_trade, trade
 
+    def _is_book_unchanged(self):
+        return self.skip_unchanged_book and self.book_version == self._matched_book_version
+
     def match_offers_bids(self):
-        while len(self._perform_pay_as_bid_matching()) > 0:
-            for bid, offer in self._perform_pay_as_bid_matching():
-                selected_energy = bid.energy if bid.energy < offer.energy else offer.energy
-                original_bid_rate = bid.original_bid_price / bid.energy
-                matched_rate = bid.energy_rate
-
-                trade_bid_info = TradeBidInfo(
-                    original_bid_rate=original_bid_rate,
-                    propagated_bid_rate=bid.price/bid.energy,
-                    original_offer_rate=offer.original_offer_price/offer.energy,
-                    propagated_offer_rate=offer.price/offer.energy,
-                    trade_rate=original_bid_rate)
-
-                self.accept_bid_offer_pair(bid, offer, matched_rate,
-                                           trade_bid_info, selected_energy)
+        if self._is_book_unchanged():
+            return
+        offer_bid_pairs = self._perform_pay_as_bid_matching()
+        while len(offer_bid_pairs) > 0:
+            for bid, offer in offer_bid_pairs:
+                self.match_bid_offer_pair(bid, offer)
+            offer_bid_pairs = self._perform_pay_as_bid_matching()
+        self._matched_book_version = self.book_version
+
+    def match_bid_offer_pair(self, bid, offer):
+        """
+        Trade the matched bid and offer of this market at the bid rate, for the energy of the
+        smaller of the two.
+        """
+        selected_energy = bid.energy if bid.energy < offer.energy else offer.energy
+        original_bid_rate = bid.original_bid_price / bid.energy
+        matched_rate = bid.energy_rate
+
+        trade_bid_info = TradeBidInfo(
+            original_bid_rate=original_bid_rate,
+            propagated_bid_rate=bid.price/bid.energy,
+            original_offer_rate=offer.original_offer_price/offer.energy,
+            propagated_offer_rate=offer.price/offer.energy,
+            trade_rate=original_bid_rate)
+
+        return self.accept_bid_offer_pair(bid, offer, matched_rate,
+                                          trade_bid_info, selected_energy)
@@ -21,7 +21,7 @@ from collections import OrderedDict
 
 from d3a.models.market.two_sided_pay_as_bid import TwoSidedPayAsBid
 from d3a.models.market.market_structures import MarketClearingState, BidOfferMatch, \
-    TradeBidInfo, Clearing
+    TradeBidInfo, Clearing, is_standing_pair
 from d3a_interface.constants_limits import ConstSettings, GlobalConfig
 from d3a.d3a_core.util import add_or_create_key
 from d3a.constants import FLOATING_POINT_TOLERANCE
@@ -37,8 +37,12 @@ class TwoSidedPayAsClear(TwoSidedPayAsBid):
         super().__init__(time_slot, bc, notification_listener, readonly,
                          grid_fee_type, transfer_fees, name,
                          in_sim_duration=in_sim_duration)
+
+    def _init_slot(self, time_slot, notification_listener, grid_fee_type, transfer_fees):
+        super()._init_slot(time_slot, notification_listener, grid_fee_type, transfer_fees)
         self.state = MarketClearingState()
         self.sorted_bids = []
+        self._last_clearing_time = None
         self.mcp_update_point = \
             GlobalConfig.ticks_per_slot / \
             ConstSettings.GeneralSettings.MARKET_CLEARING_FREQUENCY_PER_SLOT
@@ -142,10 +146,28 @@ class TwoSidedPayAsClear(TwoSidedPayAsBid):
             self._smooth_discrete_point_curve(cumulative_bids, max_rate, False)
         return max_rate
 
+    def _reuse_last_clearing_state(self):
+        """
+        Record the curves and the clearing point of the last clearing for the current tick,
+        since clearing the unchanged book would result in the same ones.
+        """
+        for state in (self.state.cumulative_offers, self.state.cumulative_bids,
+                      self.state.clearing):
+            if self._last_clearing_time in state:
+                state[self.now] = state[self._last_clearing_time]
+
     def match_offers_bids(self):
         if not (self.current_tick_in_slot + 1) % int(self.mcp_update_point) == 0:
             return
 
+        if self._is_book_unchanged():
+            self._reuse_last_clearing_state()
+            return
+        # Clearing the book can leave matching offers and bids for the next clearing, hence
+        # the book is only considered as matched if the clearing resulted in no trades
+        self._matched_book_version = self.book_version
+        self._last_clearing_time = self.now
+
         clearing = self._perform_pay_as_clear_matching()
 
         if clearing is None:
@@ -165,6 +187,8 @@ class TwoSidedPayAsClear(TwoSidedPayAsBid):
         for index, match in enumerate(matchings):
             offer = match.offer
             bid = match.bid
+            if is_standing_pair(offer, bid):
+                continue
 
             assert math.isclose(match.offer_energy, match.bid_energy)
 
@@ -251,10 +275,11 @@ class TwoSidedPayAsClear(TwoSidedPayAsBid):
             cls, matchings, start_index, offer_trade, bid_trade
     ):
         def _convert_match_to_residual(match):
-            if match.offer.id == offer_trade.offer.id:
+            # Standing offers and bids are not split and stay valid for the following matches
+            if match.offer.id == offer_trade.offer.id and not match.offer.standing:
                 assert offer_trade.residual is not None
                 match = match._replace(offer=offer_trade.residual)
-            if match.bid.id == bid_trade.offer.id:
+            if match.bid.id == bid_trade.offer.id and not match.bid.standing:
                 assert bid_trade.residual is not None
                 match = match._replace(bid=bid_trade.residual)
             return match
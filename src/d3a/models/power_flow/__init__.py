@@ -17,6 +17,9 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+import csv
+import os
 import sys
 
 from d3a.models.strategy.load_hours import LoadHoursStrategy
@@ -35,6 +38,10 @@ class PowerFlowBase(ABC):
         :param root_voltage: contains the voltage of the top most hierarchy
         """
         self.root_voltage = root_voltage
+        # Device areas, whose power is updated for every slot of the time-series power flow
+        self.device_areas = []
+        # Results of the time-series power flow per slot, None if it did not converge
+        self.time_series_results = OrderedDict()
         self._d3a_area_to_electrical_grid(root_area)
 
     def _d3a_area_to_electrical_grid(self, area):
@@ -62,9 +69,59 @@ class PowerFlowBase(ABC):
         elif isinstance(area.strategy, CommercialStrategy):
             area.power_plant = \
                 self.add_generation_device(area, int(sys.maxsize))
+        if isinstance(area.strategy, (LoadHoursStrategy, StorageStrategy, PVStrategy,
+                                      CommercialStrategy)) and \
+                not isinstance(area.strategy, InfiniteBusStrategy):
+            self.device_areas.append(area)
         for child in area.children:
             self._d3a_area_to_electrical_grid(child)
 
+    def slot_injections_kW(self, slot_length):
+        """
+        :param slot_length: duration of the market slot
+        :return: average power that every device feeds into (positive) or draws from
+        (negative) the grid, derived from the energy it traded in the spot market of its parent
+        """
+        slot_length_h = slot_length.total_seconds() / 3600
+        injections_kW = {}
+        for area in self.device_areas:
+            market = area.parent.next_market
+            if market is None:
+                continue
+            traded_energy_kWh = market.sold_energy(area.name) - market.bought_energy(area.name)
+            injections_kW[area.name] = traded_energy_kWh / slot_length_h
+        return injections_kW
+
+    def run_time_series_step(self, time_slot, injections_kW):
+        """
+        :param time_slot: market slot of the injections
+        :param injections_kW: device power per device area name, as returned by
+        slot_injections_kW
+        :return: runs the power flow of a single slot, only the device power of the network
+        is changed between the slots
+        """
+        self.update_injections(injections_kW)
+        self.time_series_results[time_slot] = self.run_time_series_power_flow()
+
+    def export_time_series_results(self, directory):
+        """
+        :param directory: directory where results has to exported
+        :return: export the per slot results of the time-series power flow as csv files
+        """
+        for result_key in ("bus_vm_pu", "line_loading_percent"):
+            element_names = []
+            for results in self.time_series_results.values():
+                if results is not None:
+                    element_names = list(results[result_key].keys())
+                    break
+            with open(os.path.join(directory, f"power_flow_{result_key}.csv"), "w") as csv_file:
+                writer = csv.writer(csv_file)
+                writer.writerow(["slot"] + element_names)
+                for time_slot, results in self.time_series_results.items():
+                    values = [results[result_key][name] for name in element_names] \
+                        if results is not None else [None] * len(element_names)
+                    writer.writerow([time_slot] + values)
+
     @abstractmethod
     def create_bus(self, area, voltage):
         """
@@ -124,6 +181,23 @@ class PowerFlowBase(ABC):
         """
         pass
 
+    @abstractmethod
+    def update_injections(self, injections_kW):
+        """
+        :param injections_kW: device power per device area name, positive for generation
+        :return: updates the power of the devices in the existing network
+        """
+        pass
+
+    @abstractmethod
+    def run_time_series_power_flow(self):
+        """
+        :return: triggers power flow calculation of a slot, starting from the results of the
+        previous slot. Returns the bus voltages (bus_vm_pu) and line loadings
+        (line_loading_percent) per element name, None if the power flow did not converge
+        """
+        pass
+
     @abstractmethod
     def export_power_flow_results(self, directory):
         """
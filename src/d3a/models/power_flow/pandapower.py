@@ -17,19 +17,27 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 import os
 import platform
+from logging import getLogger
 
 from d3a.models.power_flow import PowerFlowBase
 from d3a.d3a_core.util import convert_unit_to_mega, convert_kilo_to_mega, convert_percent_to_ratio
-from d3a.d3a_core.export import mkdir_from_str
+from d3a_interface.utils import mkdir_from_str
 from d3a_interface.constants_limits import GlobalConfig
 if platform.python_implementation() != "PyPy" and GlobalConfig.POWER_FLOW is True:
     import pandapower as pp
     from pandapower.plotting import to_html
 
+log = getLogger(__name__)
+
 
 class PandaPowerFlow(PowerFlowBase):
     def __init__(self, root_area, root_voltage=400):
         self.network = pp.create_empty_network()
+        # Device area name -> (element table, element index, sign of the injected power)
+        self._device_elements = {}
+        # Whether the network holds the results of a converged power flow, which initialize
+        # the power flow of the next slot
+        self._has_results = False
         super().__init__(root_area, root_voltage)
 
     def create_bus(self, area, voltage):
@@ -39,22 +47,29 @@ class PandaPowerFlow(PowerFlowBase):
         return pp.create_ext_grid(self.network, bus=area.parent.bus, vm_pu=1.0, name=area.name)
 
     def add_load_device(self, area, avg_power_w):
-        return pp.create_load(self.network, bus=area.parent.bus,
+        load = pp.create_load(self.network, bus=area.parent.bus,
                               p_mw=convert_unit_to_mega(avg_power_w),
                               name=area.name)
+        self._device_elements[area.name] = ("load", load, -1)
+        return load
 
     def add_generation_device(self, area, peak_power_kw):
-        return pp.create_gen(self.network, bus=area.parent.bus,
-                             p_mw=convert_kilo_to_mega(peak_power_kw),
-                             name=area.name)
+        gen = pp.create_gen(self.network, bus=area.parent.bus,
+                            p_mw=convert_kilo_to_mega(peak_power_kw),
+                            name=area.name)
+        self._device_elements[area.name] = ("gen", gen, 1)
+        return gen
 
     def add_storage_device(self, area):
         soc_ratio = convert_percent_to_ratio(area.strategy.initial_soc)
         battery_capacity_mwh = convert_kilo_to_mega(area.strategy.state.capacity)
         min_energy_mwh = area.strategy.state.min_allowed_soc_ratio * battery_capacity_mwh
-        return pp.create_storage(self.network, bus=area.parent.bus, p_mw=battery_capacity_mwh,
-                                 max_e_mwh=battery_capacity_mwh, min_e_mwh=min_energy_mwh,
-                                 soc_percent=soc_ratio, name=area.name)
+        storage = pp.create_storage(self.network, bus=area.parent.bus,
+                                    p_mw=battery_capacity_mwh, max_e_mwh=battery_capacity_mwh,
+                                    min_e_mwh=min_energy_mwh, soc_percent=soc_ratio,
+                                    name=area.name)
+        self._device_elements[area.name] = ("storage", storage, -1)
+        return storage
 
     def add_line(self, source_area, target_area):
         line_name = str(source_area.name) + str("->") + str(target_area.name)
@@ -62,9 +77,33 @@ class PandaPowerFlow(PowerFlowBase):
                               length_km=0.1, std_type="NAYY 4x150 SE", name=line_name)
 
     def run_power_flow(self):
-        return pp.runpp(self.network)
+        result = pp.runpp(self.network)
+        self._has_results = True
+        return result
+
+    def update_injections(self, injections_kW):
+        for area_name, (table, index, sign) in self._device_elements.items():
+            # Loads and storages use the load reference system, positive power is consumed
+            self.network[table].at[index, "p_mw"] = \
+                sign * convert_kilo_to_mega(injections_kW.get(area_name, 0))
+
+    def run_time_series_power_flow(self):
+        try:
+            pp.runpp(self.network, init="results" if self._has_results else "auto")
+        except pp.LoadflowNotConverged:
+            log.warning("Power flow did not converge.")
+            self._has_results = False
+            return None
+        self._has_results = True
+        return {
+            "bus_vm_pu": dict(zip(self.network.bus.name, self.network.res_bus.vm_pu)),
+            "line_loading_percent": dict(zip(self.network.line.name,
+                                             self.network.res_line.loading_percent))
+        }
 
     def export_power_flow_results(self, directory: dir):
         mkdir_from_str(directory)
         filename = os.path.join(directory, 'power_flow.html')
         to_html(self.network, filename)
+        if self.time_series_results:
+            self.export_time_series_results(directory)
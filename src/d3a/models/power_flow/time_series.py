@@ -0,0 +1,59 @@
+"""
+Copyright 2018 Grid Singularity
+This file is part of D3A.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+
+class PowerFlowWorker:
+    """
+    Runs the time-series power flow of a network on a background thread, so that the market
+    slots do not wait for the power flow. The slots are processed in order by a single
+    thread, which is the only one that accesses the network after it is built.
+    """
+    def __init__(self, power_flow):
+        self.power_flow = power_flow
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._futures = []
+
+    def submit_slot(self, time_slot, injections_kW):
+        # Raise errors of finished slots early instead of at the end of the simulation
+        for future in self._futures:
+            if future.done():
+                future.result()
+        self._futures = [future for future in self._futures if not future.done()]
+        self._futures.append(self._executor.submit(
+            self.power_flow.run_time_series_step, time_slot, injections_kW))
+
+    def wait(self):
+        for future in self._futures:
+            future.result()
+        self._futures = []
+
+    def shutdown(self):
+        self.wait()
+        self._executor.shutdown()
+
+    def __getstate__(self):
+        # Saved simulation states contain the results of all submitted slots
+        self.wait()
+        state = self.__dict__.copy()
+        del state['_executor']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._executor = ThreadPoolExecutor(max_workers=1)
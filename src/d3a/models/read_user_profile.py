@@ -22,13 +22,19 @@ from enum import Enum
 from pendulum import duration, from_format, from_timestamp, today, DateTime
 from typing import Dict
 from d3a.constants import TIME_FORMAT, DATE_TIME_FORMAT, TIME_ZONE
-from d3a_interface.constants_limits import GlobalConfig
-from d3a.d3a_core.util import generate_market_slot_list
+from d3a_interface.constants_limits import GlobalConfig, ConstSettings
+from d3a.d3a_core.util import generate_market_slot_list, d3a_path
 
 """
 Exposes mixins that can be used from strategy classes.
 """
 
+# path -> (modification time, raw csv rows)
+_CSV_PROFILE_CACHE = {}
+# (profile type, input profile, simulation time configuration) -> expanded profile
+_ARBITRARY_PROFILE_CACHE = {}
+_ARBITRARY_PROFILE_CACHE_SIZE = 1024
+
 
 class InputProfileTypes(Enum):
     IDENTITY = 1
@@ -113,13 +119,19 @@ def _eval_time_format(time_dict: Dict) -> str:
                             f"'{DATE_TIME_FORMAT}')")
 
 
-def _readCSV(path: str) -> Dict:
+def _read_csv_rows(path: str) -> Dict:
     """
-    Read a 2-column csv profile file. First column is the time, second column
-    is the value (power, energy, rate, ...)
+    Read the raw rows of a 2-column csv profile file, caching the result per file path.
+    The cached rows do not depend on the simulation configuration, therefore they can be
+    shared between simulations (e.g. inherited by forked sweep workers).
     :param path: path to csv file
-    :return: Dict[DateTime, value]
+    :return: Dict[str, float]
     """
+    path = os.path.realpath(path)
+    mtime = os.path.getmtime(path)
+    cached = _CSV_PROFILE_CACHE.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
     profile_data = {}
     with open(path) as csv_file:
         csv_rows = csv.reader(csv_file)
@@ -132,6 +144,41 @@ def _readCSV(path: str) -> Dict:
                 profile_data[row[0]] = float(row[1])
             except ValueError:
                 pass
+    _CSV_PROFILE_CACHE[path] = (mtime, profile_data)
+    return profile_data
+
+
+def preload_csv_profiles(paths):
+    """
+    Populate the csv profile cache, in order for processes that are forked afterwards to
+    reuse the already parsed profiles.
+    """
+    for path in paths:
+        if str(path).endswith(".csv") and os.path.isfile(path):
+            _read_csv_rows(path)
+
+
+def preload_resource_profiles():
+    """
+    Populate the csv profile cache with all profiles of the d3a resources and of the user
+    setup file path.
+    """
+    resources_path = os.path.join(d3a_path, "resources")
+    preload_csv_profiles(os.path.join(resources_path, f) for f in os.listdir(resources_path))
+    if ConstSettings.GeneralSettings.SETUP_FILE_PATH is not None:
+        preload_csv_profiles(
+            os.path.join(ConstSettings.GeneralSettings.SETUP_FILE_PATH, f)
+            for f in os.listdir(ConstSettings.GeneralSettings.SETUP_FILE_PATH))
+
+
+def _readCSV(path: str) -> Dict:
+    """
+    Read a 2-column csv profile file. First column is the time, second column
+    is the value (power, energy, rate, ...)
+    :param path: path to csv file
+    :return: Dict[DateTime, value]
+    """
+    profile_data = _read_csv_rows(path)
     time_format = _eval_time_format(profile_data)
     return dict((_str_to_datetime(time_str, time_format), value)
                 for time_str, value in profile_data.items())
@@ -296,9 +343,51 @@ def copy_profile_to_multiple_days(profile):
     return profile
 
 
+def arbitrary_profile_cache_key(profile_type: InputProfileTypes, input_profile):
+    """
+    Key of the expanded profile in the profile cache. Only scalar, tuple and string (serialized
+    profile or csv file path) inputs are cached, dict inputs can be modified by their owner.
+    :return: hashable key, or None if the profile can not be cached
+    """
+    if isinstance(input_profile, str):
+        if os.path.isfile(input_profile):
+            input_profile = (os.path.realpath(input_profile), os.path.getmtime(input_profile))
+    elif not isinstance(input_profile, (int, float, tuple)):
+        return None
+    key = (profile_type, input_profile, GlobalConfig.start_date, GlobalConfig.sim_duration,
+           GlobalConfig.slot_length, GlobalConfig.market_count)
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
 def read_arbitrary_profile(profile_type: InputProfileTypes,
                            input_profile) -> Dict[DateTime, float]:
     """
+    Reads arbitrary profile, see _read_arbitrary_profile.
+    Identical profile definitions (e.g. the same rate or profile file used by thousands of
+    devices) are only expanded once per simulation configuration, every caller receives its
+    own copy of the expanded profile, since strategies modify their profiles in place.
+    """
+    key = arbitrary_profile_cache_key(profile_type, input_profile)
+    if key is None:
+        return _read_arbitrary_profile(profile_type, input_profile)
+    profile = _ARBITRARY_PROFILE_CACHE.get(key)
+    if profile is None:
+        profile = _read_arbitrary_profile(profile_type, input_profile)
+        if profile is None:
+            return None
+        if len(_ARBITRARY_PROFILE_CACHE) >= _ARBITRARY_PROFILE_CACHE_SIZE:
+            _ARBITRARY_PROFILE_CACHE.clear()
+        _ARBITRARY_PROFILE_CACHE[key] = profile
+    return dict(profile)
+
+
+def _read_arbitrary_profile(profile_type: InputProfileTypes,
+                            input_profile) -> Dict[DateTime, float]:
+    """
     Reads arbitrary profile.
     Handles csv, dict and string input.
     Fills gaps in the profile.
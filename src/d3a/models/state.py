@@ -44,13 +44,13 @@ StorageSettings = ConstSettings.StorageSettings
 class PVState:
     def __init__(self):
         self.available_energy_kWh = \
-            {slot: 0. for slot in generate_market_slot_list()}
+            dict.fromkeys(generate_market_slot_list(), 0.)
 
 
 class LoadState:
     def __init__(self):
         self.desired_energy_Wh = \
-            {slot: 0. for slot in generate_market_slot_list()}
+            dict.fromkeys(generate_market_slot_list(), 0.)
         self.total_energy_demanded_wh = 0
 
 
@@ -63,7 +63,35 @@ class ESSEnergyOrigin(Enum):
 EnergyOrigin = namedtuple('EnergyOrigin', ('origin', 'value'))
 
 
+class SlotVersionedDict(dict):
+    """
+    Dict of per-slot values, that counts its modifications. Cached calculations on the values
+    compare the version of the dict to detect changes.
+    """
+    version = 0
+
+    def __setitem__(self, key, value):
+        self.version += 1
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self.version += 1
+        super().__delitem__(key)
+
+    def pop(self, key, *default):
+        self.version += 1
+        return super().pop(key, *default)
+
+    def update(self, *args, **kwargs):
+        self.version += 1
+        super().update(*args, **kwargs)
+
+
 class StorageState:
+    # The energy headroom (clamp_energy_to_*_kWh) and the state checks are only recalculated
+    # after trades, offers, bids, losses or market cycles changed the state of the storage
+    cache_energy_headroom = True
+
     def __init__(self,
                  initial_soc=StorageSettings.MIN_ALLOWED_SOC,
                  initial_energy_origin=ESSEnergyOrigin.EXTERNAL,
@@ -84,16 +112,16 @@ class StorageState:
 
         # storage capacity, that is already sold:
         self.pledged_sell_kWh = \
-            {slot: 0. for slot in generate_market_slot_list()}
+            SlotVersionedDict.fromkeys(generate_market_slot_list(), 0.)
         # storage capacity, that has been offered (but not traded yet):
         self.offered_sell_kWh = \
-            {slot: 0. for slot in generate_market_slot_list()}
+            SlotVersionedDict.fromkeys(generate_market_slot_list(), 0.)
         # energy, that has been bought:
         self.pledged_buy_kWh = \
-            {slot: 0. for slot in generate_market_slot_list()}
+            SlotVersionedDict.fromkeys(generate_market_slot_list(), 0.)
         # energy, that the storage wants to buy (but not traded yet):
         self.offered_buy_kWh = \
-            {slot: 0. for slot in generate_market_slot_list()}
+            SlotVersionedDict.fromkeys(generate_market_slot_list(), 0.)
         self.time_series_ess_share = \
             {slot: {ESSEnergyOrigin.UNKNOWN: 0.,
                     ESSEnergyOrigin.LOCAL: 0.,
@@ -101,19 +129,42 @@ class StorageState:
              for slot in generate_market_slot_list()}
 
         self.charge_history = \
-            {slot: 100.0 * initial_capacity_kWh / capacity for slot in generate_market_slot_list()}
+            dict.fromkeys(generate_market_slot_list(), 100.0 * initial_capacity_kWh / capacity)
         self.charge_history_kWh = \
-            {slot: initial_capacity_kWh for slot in generate_market_slot_list()}
+            dict.fromkeys(generate_market_slot_list(), initial_capacity_kWh)
         self.offered_history = \
-            {slot: '-' for slot in generate_market_slot_list()}
+            dict.fromkeys(generate_market_slot_list(), '-')
         self.used_history = \
-            {slot: '-' for slot in generate_market_slot_list()}  # type: Dict[DateTime, float]
-        self.energy_to_buy_dict = {slot: 0. for slot in generate_market_slot_list()}
-        self.energy_to_sell_dict = {slot: 0. for slot in generate_market_slot_list()}
+            dict.fromkeys(generate_market_slot_list(), '-')  # type: Dict[DateTime, float]
+        self.energy_to_buy_dict = SlotVersionedDict.fromkeys(generate_market_slot_list(), 0.)
+        self.energy_to_sell_dict = SlotVersionedDict.fromkeys(generate_market_slot_list(), 0.)
 
         self._used_storage = initial_capacity_kWh
         self._battery_energy_per_slot = 0.0
         self._used_storage_share = [EnergyOrigin(initial_energy_origin, initial_capacity_kWh)]
+        # calculation -> (state key, result) of the last calculation
+        self._headroom_cache = {}
+
+    def _state_key(self, *dicts):
+        """
+        Key of the current values of the given per-slot dicts and of the scalar state, None if
+        a dict does not count its modifications (e.g. replaced by a plain dict).
+        """
+        if not self.cache_energy_headroom:
+            return None
+        versions = []
+        for slot_dict in dicts:
+            if not isinstance(slot_dict, SlotVersionedDict):
+                return None
+            versions.append((id(slot_dict), slot_dict.version))
+        return (tuple(versions), self._used_storage, self.capacity, self.min_allowed_soc_ratio,
+                self._battery_energy_per_slot)
+
+    def _cached(self, calculation, key):
+        cached = self._headroom_cache.get(calculation)
+        if key is not None and cached is not None and cached[0] == key:
+            return cached[1]
+        return None
 
     @property
     def used_storage(self):
@@ -162,6 +213,14 @@ class StorageState:
         """
         Determines available energy to sell for each active market and returns a dict[TIME, FLOAT]
         """
+        key = self._state_key(self.pledged_sell_kWh, self.offered_sell_kWh,
+                              self.energy_to_sell_dict)
+        if key is not None:
+            key = (tuple(market_slot_time_list), key)
+            cached = self._cached("sell", key)
+            if cached is not None:
+                return dict(cached)
+
         accumulated_pledged = 0
         accumulated_offered = 0
         for time_slot in market_slot_time_list:
@@ -180,6 +239,10 @@ class StorageState:
                                                             self._battery_energy_per_slot))
             self.energy_to_sell_dict[time_slot] = storage_dict[time_slot]
 
+        if key is not None:
+            self._headroom_cache["sell"] = \
+                ((key[0], self._state_key(self.pledged_sell_kWh, self.offered_sell_kWh,
+                                          self.energy_to_sell_dict)), dict(storage_dict))
         return storage_dict
 
     def clamp_energy_to_buy_kWh(self, market_slot_time_list):
@@ -187,6 +250,12 @@ class StorageState:
         Determines amount of energy that can be bought for each active market and writes it to
         self.energy_to_buy_dict
         """
+        key = self._state_key(self.pledged_buy_kWh, self.offered_buy_kWh,
+                              self.energy_to_buy_dict)
+        if key is not None:
+            key = (tuple(market_slot_time_list), key)
+            if self._cached("buy", key) is not None:
+                return
 
         accumulated_bought = 0
         accumulated_sought = 0
@@ -204,10 +273,22 @@ class StorageState:
             clamped_energy = max(clamped_energy, 0)
             self.energy_to_buy_dict[time_slot] = clamped_energy
 
+        if key is not None:
+            self._headroom_cache["buy"] = \
+                ((key[0], self._state_key(self.pledged_buy_kWh, self.offered_buy_kWh,
+                                          self.energy_to_buy_dict)), True)
+
     def check_state(self, time_slot):
         """
         Sanity check of the state variables.
         """
+        key = self._state_key(self.offered_sell_kWh, self.pledged_sell_kWh,
+                              self.pledged_buy_kWh, self.offered_buy_kWh)
+        if key is not None:
+            key = (time_slot, key)
+            if self._cached("check", key) is not None:
+                return
+
         charge = limit_float_precision(self.used_storage / self.capacity)
         max_value = self.capacity - self.min_allowed_soc_ratio * self.capacity
         assert self.min_allowed_soc_ratio <= charge or \
@@ -217,6 +298,8 @@ class StorageState:
         assert 0 <= limit_float_precision(self.pledged_sell_kWh[time_slot]) <= max_value
         assert 0 <= limit_float_precision(self.pledged_buy_kWh[time_slot]) <= max_value
         assert 0 <= limit_float_precision(self.offered_buy_kWh[time_slot]) <= max_value
+        if key is not None:
+            self._headroom_cache["check"] = (key, True)
 
     def lose(self, loss_function, loss_per_hour):
         if loss_function == 1:
@@ -42,10 +42,7 @@ class _TradeLookerUpper:
         self.owner_name = owner_name
 
     def __getitem__(self, market):
-        for trade in market.trades:
-            owner_name = self.owner_name
-            if trade.seller == owner_name or trade.buyer == owner_name:
-                yield trade
+        yield from market.trades_of(self.owner_name)
 
 
 class Offers:
@@ -177,6 +174,10 @@ class Offers:
     def on_trade(self, market_id, trade):
         try:
             if trade.offer.seller == self.strategy.owner.name:
+                if trade.filled_in_place:
+                    # The rest of the offer stays posted with its remaining energy
+                    self._replace_posted_offer(trade.residual, market_id)
+                    return
                 if trade.offer.id in self.split and trade.offer in self.posted:
                     # remove from posted as it is traded already
                     self.remove(self.split[trade.offer.id])
@@ -184,6 +185,13 @@ class Offers:
         except AttributeError:
             raise SimulationException("Trade event before strategy was initialized.")
 
+    def _replace_posted_offer(self, offer, market_id):
+        if offer in self.posted:
+            return
+        for posted_offer in [o for o in self.posted if o.id == offer.id]:
+            self.posted.pop(posted_offer)
+        self.posted[offer] = market_id
+
     def on_offer_split(self, original_offer, accepted_offer, residual_offer, market_id):
         if original_offer.seller == self.strategy.owner.name:
             self.split[original_offer.id] = accepted_offer
@@ -241,6 +249,21 @@ class BaseStrategy(TriggerMixin, EventMixin, AreaBehaviorBase):
     def read_config_event(self):
         pass
 
+    def has_pending_tick_actions(self):
+        """
+        Return True if the strategy might post or update orders during the remaining ticks
+        of the current slot, even though there are no open offers or bids in any market.
+        The remaining ticks of a slot are only fast-forwarded if no strategy has pending
+        tick actions, therefore the default is the conservative answer.
+        """
+        return True
+
+    def skip_tick(self):
+        """
+        Called instead of the tick event for ticks that are fast-forwarded.
+        """
+        pass
+
     def non_attr_parameters(self):
         return dict()
 
@@ -400,7 +423,9 @@ class BaseStrategy(TriggerMixin, EventMixin, AreaBehaviorBase):
         self.event_responses = []
 
     def assert_if_trade_offer_price_is_too_low(self, market_id, trade):
-        if isinstance(trade.offer, Offer) and trade.offer.seller == self.owner.name:
+        # The offers of trades that were filled in place are not sold, but still open
+        if isinstance(trade.offer, Offer) and trade.offer.seller == self.owner.name and \
+                not trade.filled_in_place:
             offer = [o for o in self.offers.sold[market_id] if o.id == trade.offer.id][0]
             assert trade.offer.energy_rate >= \
                 offer.energy_rate - FLOATING_POINT_TOLERANCE
@@ -418,14 +443,15 @@ class BidEnabledStrategy(BaseStrategy):
         self._bids = {}
         self._traded_bids = {}
 
-    def post_bid(self, market, price, energy, buyer_origin=None):
+    def post_bid(self, market, price, energy, buyer_origin=None, standing=False):
         bid = market.bid(
             price,
             energy,
             self.owner.name,
             self.area.name,
             original_bid_price=price,
-            buyer_origin=buyer_origin
+            buyer_origin=buyer_origin,
+            standing=standing
         )
         self.add_bid_to_posted(market.id, bid)
         return bid
@@ -523,7 +549,13 @@ class BidEnabledStrategy(BaseStrategy):
             "Invalid state, cannot receive a bid if single sided market is globally configured."
 
         if bid_trade.buyer == self.owner.name:
-            self.add_bid_to_bought(bid_trade.offer, market_id)
+            # Standing bids and the rest of partially traded bids stay posted
+            self.add_bid_to_bought(bid_trade.offer, market_id,
+                                   remove_bid=not bid_trade.offer.standing and
+                                   not bid_trade.filled_in_place)
+            if bid_trade.filled_in_place:
+                self._bids[market_id] = [bid_trade.residual if bid.id == bid_trade.residual.id
+                                         else bid for bid in self._bids.get(market_id, [])]
 
     def event_market_cycle(self):
         if not ConstSettings.GeneralSettings.KEEP_PAST_MARKETS:
@@ -15,6 +15,7 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
+from contextlib import closing
 from numpy.random import random
 from d3a.constants import FLOATING_POINT_TOLERANCE
 from d3a.d3a_core.util import make_ba_name, make_iaa_name
@@ -27,15 +28,19 @@ class BalancingAgent(OneSidedAgent):
     def __init__(self, owner, higher_market, lower_market,
                  min_offer_age=ConstSettings.IAASettings.MIN_OFFER_AGE):
         self.balancing_spot_trade_ratio = owner.balancing_spot_trade_ratio
-        self.engines = [
-            BalancingEngine('High -> Low', higher_market, lower_market, min_offer_age, self),
-            BalancingEngine('Low -> High', lower_market, higher_market, min_offer_age, self),
-        ]
         super().__init__(owner=owner, higher_market=higher_market,
                          lower_market=lower_market,
-                         min_offer_age=min_offer_age, do_create_engine=False)
+                         min_offer_age=min_offer_age)
         self.name = make_ba_name(self.owner)
 
+    def _create_engines(self, higher_market, lower_market):
+        return [
+            BalancingEngine('High -> Low', higher_market, lower_market, self.min_offer_age,
+                            self),
+            BalancingEngine('Low -> High', lower_market, higher_market, self.min_offer_age,
+                            self),
+        ]
+
     def event_tick(self):
         super().event_tick()
         if self.lower_market.unmatched_energy_downward > 0.0 or \
@@ -43,6 +48,10 @@ class BalancingAgent(OneSidedAgent):
             self._trigger_balancing_trades(self.lower_market.unmatched_energy_upward,
                                            self.lower_market.unmatched_energy_downward)
 
+    def has_pending_tick_actions(self):
+        return self.lower_market.unmatched_energy_downward > 0.0 or \
+            self.lower_market.unmatched_energy_upward > 0.0
+
     def event_trade(self, *, market_id, trade):
         market = self._get_market_from_market_id(market_id)
         if market is None:
@@ -76,22 +85,23 @@ class BalancingAgent(OneSidedAgent):
         self._trigger_balancing_trades(positive_balancing_energy, negative_balancing_energy)
 
     def _trigger_balancing_trades(self, positive_balancing_energy, negative_balancing_energy):
-        for offer in self.lower_market.sorted_offers:
-            if offer.energy > FLOATING_POINT_TOLERANCE and \
-                    positive_balancing_energy > FLOATING_POINT_TOLERANCE:
-                balance_trade = self._balancing_trade(offer,
-                                                      positive_balancing_energy)
-                if balance_trade is not None:
-                    positive_balancing_energy -= abs(balance_trade.offer.energy)
-            elif offer.energy < FLOATING_POINT_TOLERANCE and \
-                    negative_balancing_energy > FLOATING_POINT_TOLERANCE:
-                balance_trade = self._balancing_trade(offer,
-                                                      -negative_balancing_energy)
+        self.lower_market.unmatched_energy_upward = \
+            self._consume_balancing_offers(True, positive_balancing_energy)
+        self.lower_market.unmatched_energy_downward = \
+            self._consume_balancing_offers(False, negative_balancing_energy)
+
+    def _consume_balancing_offers(self, positive_energy, balancing_energy):
+        if balancing_energy <= FLOATING_POINT_TOLERANCE:
+            return balancing_energy
+        sign = 1 if positive_energy else -1
+        with closing(self.lower_market.cheapest_balancing_offers(positive_energy)) as offers:
+            for offer in offers:
+                balance_trade = self._balancing_trade(offer, sign * balancing_energy)
                 if balance_trade is not None:
-                    negative_balancing_energy -= abs(balance_trade.offer.energy)
-
-        self.lower_market.unmatched_energy_upward = positive_balancing_energy
-        self.lower_market.unmatched_energy_downward = negative_balancing_energy
+                    balancing_energy -= abs(balance_trade.offer.energy)
+                if balancing_energy <= FLOATING_POINT_TOLERANCE:
+                    break
+        return balancing_energy
 
     def _balancing_trade(self, offer, target_energy):
         trade = None
@@ -40,10 +40,19 @@ class InterAreaAgent(BaseStrategy):
         self.lower_market = lower_market
         self.min_offer_age = min_offer_age
 
+    def _create_engines(self, higher_market, lower_market):
+        # The engines that forward offers and bids between the markets are created by the
+        # agents of the different market types
+        return []
+
     @staticmethod
     def _validate_constructor_arguments(min_offer_age):
         assert 0 <= min_offer_age <= 360
 
+    def has_pending_tick_actions(self):
+        # Agents only forward offers and bids that already exist in their markets
+        return False
+
     def area_reconfigure_event(self, min_offer_age):
         self._validate_constructor_arguments(min_offer_age)
         self.min_offer_age = min_offer_age
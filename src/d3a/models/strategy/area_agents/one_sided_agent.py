@@ -31,12 +31,15 @@ class OneSidedAgent(InterAreaAgent):
                          lower_market=lower_market,
                          min_offer_age=min_offer_age)
         if do_create_engine:
-            self.engines = [
-                IAAEngine('High -> Low', higher_market, lower_market, min_offer_age, self),
-                IAAEngine('Low -> High', lower_market, higher_market, min_offer_age, self),
-            ]
+            self.engines = self._create_engines(higher_market, lower_market)
         self.name = make_iaa_name(owner)
 
+    def _create_engines(self, higher_market, lower_market):
+        return [
+            IAAEngine('High -> Low', higher_market, lower_market, self.min_offer_age, self),
+            IAAEngine('Low -> High', lower_market, higher_market, self.min_offer_age, self),
+        ]
+
     def usable_offer(self, offer):
         """Prevent IAAEngines from trading their counterpart's offers"""
         return all(offer.id not in engine.forwarded_offers.keys() for engine in self.engines)
@@ -58,6 +61,12 @@ class OneSidedAgent(InterAreaAgent):
         for engine in sorted(self.engines, key=lambda _: random()):
             engine.tick(area=area)
 
+    def skip_tick(self):
+        # Draw the same random numbers as event_tick, in order to keep the simulation
+        # reproducible whether ticks are fast-forwarded or not
+        for _ in self.engines:
+            random()
+
     def event_trade(self, *, market_id, trade):
         for engine in sorted(self.engines, key=lambda _: random()):
             engine.event_trade(trade=trade)
@@ -66,6 +75,10 @@ class OneSidedAgent(InterAreaAgent):
         for engine in sorted(self.engines, key=lambda _: random()):
             engine.event_offer_deleted(offer=offer)
 
+    def event_offer_changed(self, *, market_id, offer):
+        for engine in sorted(self.engines, key=lambda _: random()):
+            engine.event_offer_changed(offer=offer)
+
     def event_offer_split(self, *, market_id,  original_offer, accepted_offer, residual_offer):
         for engine in sorted(self.engines, key=lambda _: random()):
             engine.event_offer_split(market_id=market_id,
@@ -37,7 +37,8 @@ class OneSidedAlternativePricingAgent(OneSidedAgent):
 
     @staticmethod
     def _get_children_by_name(area, name):
-        return next((c for c in area.children if c.name == name), None)
+        child = area.registry.get_by_name(name)
+        return child if child is not None and child.parent is area else None
 
     def _buy_energy_alternative_pricing_schemes(self, area):
         if not _is_house_node(self.owner):
@@ -72,6 +73,10 @@ class OneSidedAlternativePricingAgent(OneSidedAgent):
                 ConstSettings.IAASettings.AlternativePricing.PRICING_SCHEME != 0:
             self._buy_energy_alternative_pricing_schemes(area)
 
+    def skip_tick(self):
+        # Unlike OneSidedAgent.event_tick, the event_tick of this agent draws no random numbers
+        pass
+
     def event_market_cycle(self):
         if ConstSettings.IAASettings.AlternativePricing.PRICING_SCHEME != 0:
             energy_per_slot = int(sys.maxsize)
@@ -82,5 +87,6 @@ class OneSidedAlternativePricingAgent(OneSidedAgent):
                 energy_per_slot,
                 ConstSettings.IAASettings.AlternativePricing.ALT_PRICING_MARKET_MAKER_NAME,
                 ConstSettings.IAASettings.AlternativePricing.ALT_PRICING_MARKET_MAKER_NAME,
-                original_offer_price=energy_per_slot * energy_rate
+                original_offer_price=energy_per_slot * energy_rate,
+                standing=True
             )
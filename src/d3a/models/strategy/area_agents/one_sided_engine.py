@@ -19,7 +19,7 @@ from collections import namedtuple
 from typing import Dict, Set  # noqa
 from d3a.constants import FLOATING_POINT_TOLERANCE
 from d3a_interface.constants_limits import ConstSettings
-from d3a.d3a_core.util import short_offer_bid_log_str
+from d3a.d3a_core.util import short_offer_bid_log_str, LazyLogStr
 from d3a.d3a_core.exceptions import MarketException, OfferNotFoundException
 from d3a.models.market.market_structures import copy_offer
 
@@ -58,7 +58,8 @@ class IAAEngine:
             "seller": self.owner.name,
             "original_offer_price": offer.original_offer_price,
             "dispatch_event": False,
-            "seller_origin": offer.seller_origin
+            "seller_origin": offer.seller_origin,
+            "standing": offer.standing
         }
 
         if ConstSettings.GeneralSettings.EVENT_DISPATCHING_VIA_REDIS:
@@ -75,12 +76,33 @@ class IAAEngine:
         forwarded_offer = self._offer_in_market(offer)
 
         self._add_to_forward_offers(offer, forwarded_offer)
-        self.owner.log.trace(f"Forwarding offer {offer} to {forwarded_offer}")
+        self.owner.log.trace("Forwarding offer %s to %s", offer, forwarded_offer)
         # TODO: Ugly solution, required in order to decouple offer placement from
         # new offer event triggering
         self.markets.target.dispatch_market_offer_event(forwarded_offer)
         return forwarded_offer
 
+    def forward_offer_part(self, offer, energy):
+        """
+        Forward energy of the offer to the target market right away, regardless of the age of
+        the offer and without an offer event. Used by the path compressed matching, which only
+        forwards the matched part of an offer along its path, right before it is traded.
+        """
+        original_offer_rate = offer.original_offer_price / offer.energy
+        forwarded_offer = self.markets.target.offer(
+            price=self.markets.target.fee_class.update_forwarded_offer_with_fee(
+                offer.energy_rate, original_offer_rate) * energy,
+            energy=energy,
+            seller=self.owner.name,
+            original_offer_price=original_offer_rate * energy,
+            dispatch_event=False,
+            seller_origin=offer.seller_origin
+        )
+        self._add_to_forward_offers(offer, forwarded_offer)
+        self.owner.log.trace("Forwarding %s kWh of offer %s to %s", energy, offer,
+                             forwarded_offer)
+        return forwarded_offer
+
     def _delete_forwarded_offer_entries(self, offer):
         offer_info = self.forwarded_offers.pop(offer.id, None)
         if not offer_info:
@@ -126,8 +148,8 @@ class IAAEngine:
 
             forwarded_offer = self._forward_offer(offer)
             if forwarded_offer:
-                self.owner.log.debug(f"Forwarded offer to {self.markets.source.name} "
-                                     f"{self.owner.name}, {self.name} {forwarded_offer}")
+                self.owner.log.debug("Forwarded offer to %s %s, %s %s", self.markets.source.name,
+                                     self.owner.name, self.name, forwarded_offer)
 
     def event_trade(self, *, trade):
         offer_info = self.forwarded_offers.get(trade.offer.id)
@@ -163,10 +185,24 @@ class IAAEngine:
             self.owner.log.debug(
                 f"[{self.markets.source.time_slot_str}] Offer accepted {trade_source}")
 
+            if offer_info.target_offer.standing:
+                # Standing offers stay in both markets and remain forwarded
+                return
+            if trade.filled_in_place and trade_source.filled_in_place:
+                # The rest of the offer stays in both markets and remains forwarded
+                self._add_to_forward_offers(trade_source.residual, trade.residual)
+                return
             self._delete_forwarded_offer_entries(offer_info.source_offer)
             self.offer_age.pop(offer_info.source_offer.id, None)
 
         elif trade.offer.id == offer_info.source_offer.id:
+            if offer_info.source_offer.standing:
+                # Trades of a standing offer do not affect the forwarded offer
+                return
+            if trade.filled_in_place:
+                # Part of the offer was bought in source market
+                self._reduce_forwarded_offer(offer_info, trade.residual)
+                return
             # Offer was bought in source market by another party
             try:
                 self.owner.delete_offer(self.markets.target, offer_info.target_offer)
@@ -204,6 +240,30 @@ class IAAEngine:
         # TODO: Should potentially handle the flip side, by not deleting the source market offer
         # but by deleting the offered_offers entries
 
+    def event_offer_changed(self, *, offer):
+        offer_info = self.forwarded_offers.get(offer.id)
+        if offer_info and offer_info.source_offer.id == offer.id:
+            # Offer in source market was reduced - also reduce the offer in target market
+            self._reduce_forwarded_offer(offer_info, offer)
+
+    def _reduce_forwarded_offer(self, offer_info, source_offer):
+        target_offer = self.markets.target.offers.get(offer_info.target_offer.id)
+        if target_offer is None or \
+                target_offer.energy - source_offer.energy <= FLOATING_POINT_TOLERANCE:
+            # The source trade mirrors a trade of the forwarded offer in target market
+            return
+        try:
+            target_offer = self.markets.target.reduce_offer(offer_info.target_offer,
+                                                            source_offer.energy)
+        except MarketException as ex:
+            self.owner.log.error("Error reducing InterAreaAgent offer: {}".format(ex))
+            return
+        if target_offer is None:
+            self._delete_forwarded_offer_entries(offer_info.source_offer)
+            self.offer_age.pop(offer_info.source_offer.id, None)
+        else:
+            self._add_to_forward_offers(source_offer, target_offer)
+
     def event_offer_split(self, *, market_id, original_offer, accepted_offer, residual_offer):
         market = self.owner._get_market_from_market_id(market_id)
         if market is None:
@@ -249,9 +309,10 @@ class IAAEngine:
         if original_offer.id in self.offer_age:
             self.offer_age[residual_offer.id] = self.offer_age.pop(original_offer.id)
 
-        self.owner.log.debug(f"Offer {short_offer_bid_log_str(local_offer)} was split into "
-                             f"{short_offer_bid_log_str(local_split_offer)} and "
-                             f"{short_offer_bid_log_str(local_residual_offer)}")
+        self.owner.log.debug("Offer %s was split into %s and %s",
+                             LazyLogStr(short_offer_bid_log_str, local_offer),
+                             LazyLogStr(short_offer_bid_log_str, local_split_offer),
+                             LazyLogStr(short_offer_bid_log_str, local_residual_offer))
 
     def _add_to_forward_offers(self, source_offer, target_offer):
         offer_info = OfferInfo(copy_offer(source_offer), copy_offer(target_offer))
@@ -269,5 +330,6 @@ class BalancingEngine(IAAEngine):
             from_agent=True
         )
         self._add_to_forward_offers(offer, forwarded_balancing_offer)
-        self.owner.log.trace(f"Forwarding balancing offer {offer} to {forwarded_balancing_offer}")
+        self.owner.log.trace("Forwarding balancing offer %s to %s", offer,
+                             forwarded_balancing_offer)
         return forwarded_balancing_offer
@@ -26,15 +26,18 @@ class TwoSidedPayAsBidAgent(OneSidedAgent):
     def __init__(self, *, owner, higher_market, lower_market,
                  min_offer_age=ConstSettings.IAASettings.MIN_OFFER_AGE,
                  min_bid_age=ConstSettings.IAASettings.MIN_BID_AGE):
-        self.engines = [
-            TwoSidedPayAsBidEngine('High -> Low', higher_market, lower_market, min_offer_age,
-                                   min_bid_age, self),
-            TwoSidedPayAsBidEngine('Low -> High', lower_market, higher_market, min_offer_age,
-                                   min_bid_age, self),
-        ]
+        self.min_bid_age = min_bid_age
         super().__init__(owner=owner,
                          higher_market=higher_market, lower_market=lower_market,
-                         min_offer_age=min_offer_age, do_create_engine=False)
+                         min_offer_age=min_offer_age)
+
+    def _create_engines(self, higher_market, lower_market):
+        return [
+            TwoSidedPayAsBidEngine('High -> Low', higher_market, lower_market,
+                                   self.min_offer_age, self.min_bid_age, self),
+            TwoSidedPayAsBidEngine('Low -> High', lower_market, higher_market,
+                                   self.min_offer_age, self.min_bid_age, self),
+        ]
 
     def usable_bid(self, bid):
         """Prevent IAAEngines from trading their counterpart's bids"""
@@ -48,6 +51,10 @@ class TwoSidedPayAsBidAgent(OneSidedAgent):
         for engine in sorted(self.engines, key=lambda _: random()):
             engine.event_bid_deleted(bid=bid)
 
+    def event_bid_changed(self, *, market_id, bid):
+        for engine in sorted(self.engines, key=lambda _: random()):
+            engine.event_bid_changed(bid=bid)
+
     def event_bid_split(self, *, market_id, original_bid, accepted_bid, residual_bid):
         for engine in sorted(self.engines, key=lambda _: random()):
             engine.event_bid_split(market_id=market_id,
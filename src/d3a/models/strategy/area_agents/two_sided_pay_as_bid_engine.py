@@ -21,7 +21,8 @@ from d3a.models.strategy.area_agents.inter_area_agent import InterAreaAgent  # N
 from d3a.models.strategy.area_agents.one_sided_engine import IAAEngine
 from d3a.d3a_core.exceptions import BidNotFound, MarketException
 from d3a.models.market.market_structures import Bid
-from d3a.d3a_core.util import short_offer_bid_log_str
+from d3a.models.market.path_compressed_matching import path_compressed_matching_enabled
+from d3a.d3a_core.util import short_offer_bid_log_str, LazyLogStr
 from d3a.constants import FLOATING_POINT_TOLERANCE
 
 
@@ -55,11 +56,32 @@ class TwoSidedPayAsBidEngine(IAAEngine):
             buyer=self.owner.name,
             seller=self.markets.target.name,
             original_bid_price=bid.original_bid_price,
-            buyer_origin=bid.buyer_origin
+            buyer_origin=bid.buyer_origin,
+            standing=bid.standing
         )
 
         self._add_to_forward_bids(bid, forwarded_bid)
-        self.owner.log.trace(f"Forwarding bid {bid} to {forwarded_bid}")
+        self.owner.log.trace("Forwarding bid %s to %s", bid, forwarded_bid)
+        return forwarded_bid
+
+    def forward_bid_part(self, bid, energy):
+        """
+        Forward energy of the bid to the target market right away, regardless of the age of
+        the bid. Used by the path compressed matching, which only forwards the matched part
+        of a bid along its path, right before it is traded.
+        """
+        original_bid_rate = bid.original_bid_price / bid.energy
+        forwarded_bid = self.markets.target.bid(
+            price=self.markets.source.fee_class.update_forwarded_bid_with_fee(
+                bid.energy_rate, original_bid_rate) * energy,
+            energy=energy,
+            buyer=self.owner.name,
+            seller=self.markets.target.name,
+            original_bid_price=original_bid_rate * energy,
+            buyer_origin=bid.buyer_origin
+        )
+        self._add_to_forward_bids(bid, forwarded_bid)
+        self.owner.log.trace("Forwarding %s kWh of bid %s to %s", energy, bid, forwarded_bid)
         return forwarded_bid
 
     def _delete_forwarded_bid_entries(self, bid):
@@ -86,6 +108,9 @@ class TwoSidedPayAsBidEngine(IAAEngine):
         return True
 
     def tick(self, *, area):
+        if path_compressed_matching_enabled():
+            # Orders are only forwarded once they are matched by the path compressed matching
+            return
         super().tick(area=area)
 
         for bid_id, bid in self.markets.source.get_bids().items():
@@ -99,8 +124,8 @@ class TwoSidedPayAsBidEngine(IAAEngine):
         try:
             self.markets.target.delete_bid(bid_info.target_bid)
         except BidNotFound:
-            self.owner.log.trace(f"Bid {bid_info.target_bid.id} not "
-                                 f"found in the target market.")
+            self.owner.log.trace("Bid %s not found in the target market.",
+                                 bid_info.target_bid.id)
         self._delete_forwarded_bid_entries(bid_info.source_bid)
 
     def event_bid_traded(self, *, bid_trade):
@@ -135,7 +160,7 @@ class TwoSidedPayAsBidEngine(IAAEngine):
                 self.markets.source.fee_class.update_forwarded_bid_trade_original_info(
                     updated_trade_offer_info, market_bid
                 )
-            self.markets.source.accept_bid(
+            source_trade = self.markets.source.accept_bid(
                 bid=market_bid,
                 energy=bid_trade.offer.energy,
                 seller=self.owner.name,
@@ -144,10 +169,24 @@ class TwoSidedPayAsBidEngine(IAAEngine):
                 trade_offer_info=trade_offer_info,
                 seller_origin=bid_trade.seller_origin
             )
+            if bid_info.target_bid.standing:
+                # Standing bids stay in both markets and remain forwarded
+                return
+            if bid_trade.filled_in_place and source_trade.filled_in_place:
+                # The rest of the bid stays in both markets and remains forwarded
+                self._add_to_forward_bids(source_trade.residual, bid_trade.residual)
+                return
             self.delete_forwarded_bids(bid_info)
             self.bid_age.pop(bid_info.source_bid.id, None)
 
         elif bid_trade.offer.id == bid_info.source_bid.id:
+            if bid_info.source_bid.standing:
+                # Trades of a standing bid do not affect the forwarded bid
+                return
+            if bid_trade.filled_in_place:
+                # Part of the bid was traded in the source market
+                self._reduce_forwarded_bid(bid_info, bid_trade.residual)
+                return
             # Bid was traded in the source market by someone else
             self.delete_forwarded_bids(bid_info)
             self.bid_age.pop(bid_info.source_bid.id, None)
@@ -173,6 +212,29 @@ class TwoSidedPayAsBidEngine(IAAEngine):
         self._delete_forwarded_bid_entries(bid_info.source_bid)
         self.bid_age.pop(bid_info.source_bid.id, None)
 
+    def event_bid_changed(self, *, bid):
+        bid_info = self.forwarded_bids.get(bid.id)
+        if bid_info and bid_info.source_bid.id == bid.id:
+            # Bid in source market was reduced - also reduce the bid in target market
+            self._reduce_forwarded_bid(bid_info, bid)
+
+    def _reduce_forwarded_bid(self, bid_info, source_bid):
+        target_bid = self.markets.target.bids.get(bid_info.target_bid.id)
+        if target_bid is None or \
+                target_bid.energy - source_bid.energy <= FLOATING_POINT_TOLERANCE:
+            # The source trade mirrors a trade of the forwarded bid in target market
+            return
+        try:
+            target_bid = self.markets.target.reduce_bid(target_bid, source_bid.energy)
+        except MarketException as ex:
+            self.owner.log.error("Error reducing InterAreaAgent bid: {}".format(ex))
+            return
+        if target_bid is None:
+            self._delete_forwarded_bid_entries(bid_info.source_bid)
+            self.bid_age.pop(bid_info.source_bid.id, None)
+        else:
+            self._add_to_forward_bids(source_bid, target_bid)
+
     def event_bid_split(self, *, market_id, original_bid, accepted_bid, residual_bid):
         market = self.owner._get_market_from_market_id(market_id)
         if market is None:
@@ -219,9 +281,10 @@ class TwoSidedPayAsBidEngine(IAAEngine):
         else:
             return
 
-        self.owner.log.debug(f"Bid {short_offer_bid_log_str(local_bid)} was split into "
-                             f"{short_offer_bid_log_str(local_split_bid)} and "
-                             f"{short_offer_bid_log_str(local_residual_bid)}")
+        self.owner.log.debug("Bid %s was split into %s and %s",
+                             LazyLogStr(short_offer_bid_log_str, local_bid),
+                             LazyLogStr(short_offer_bid_log_str, local_split_bid),
+                             LazyLogStr(short_offer_bid_log_str, local_residual_bid))
 
     def _add_to_forward_bids(self, source_bid, target_bid):
         bid_info = BidInfo(source_bid, target_bid)
@@ -59,6 +59,9 @@ class CommercialStrategy(BaseStrategy):
                 balancing_market = self.area.balancing_markets[-1]
                 self._offer_balancing_energy(balancing_market)
 
+    def has_pending_tick_actions(self):
+        return False
+
     def offer_energy(self, market):
         energy_rate = self.energy_rate[market.time_slot]
         offer = market.offer(
@@ -66,7 +69,8 @@ class CommercialStrategy(BaseStrategy):
             self.energy_per_slot_kWh,
             self.owner.name,
             original_offer_price=self.energy_per_slot_kWh * energy_rate,
-            seller_origin=self.owner.name
+            seller_origin=self.owner.name,
+            standing=True
         )
 
         self.offers.post(offer, market.id)
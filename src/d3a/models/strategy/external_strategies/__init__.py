@@ -194,6 +194,10 @@ class ExternalMixin:
     def _device_info_dict(self):
         return {}
 
+    def has_pending_tick_actions(self):
+        # External clients are notified about ticks and can place orders at any time
+        return True
+
     def _reset_event_tick_counter(self):
         self._last_dispatched_tick = 0
 
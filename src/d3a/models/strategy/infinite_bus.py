@@ -44,8 +44,8 @@ class InfiniteBusStrategy(CommercialStrategy, BidEnabledStrategy):
 
     def buy_energy(self, market):
         for offer in market.sorted_offers:
-            if offer.seller == self.owner.name:
-                # Don't buy our own offer
+            if offer.seller == self.owner.name or offer.standing:
+                # Don't buy our own offer or unlimited energy from other standing offers
                 continue
             if offer.energy_rate <= self.energy_buy_rate[market.time_slot]:
                 try:
@@ -66,4 +66,4 @@ class InfiniteBusStrategy(CommercialStrategy, BidEnabledStrategy):
             for market in self.area.all_markets:
                 self.post_bid(market,
                               self.energy_buy_rate[market.time_slot] * INF_ENERGY, INF_ENERGY,
-                              buyer_origin=self.owner.name)
+                              buyer_origin=self.owner.name, standing=True)
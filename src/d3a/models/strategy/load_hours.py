@@ -16,6 +16,7 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 from numpy import random
+from weakref import WeakKeyDictionary, WeakSet
 from pendulum import duration, DateTime  # NOQA
 from typing import Union, Dict  # NOQA
 from collections import namedtuple
@@ -86,6 +87,8 @@ class LoadHoursStrategy(BidEnabledStrategy):
                                 use_market_maker_rate, initial_buying_rate, final_buying_rate)
         self._calculate_active_markets()
         self._cycled_market = set()
+        # LoadHoursPopulation of the loads of the area, joined on activate and market cycle
+        self._population = None
 
     def _init_price_update(self, fit_to_limit, energy_rate_increase_per_update, update_interval,
                            use_market_maker_rate, initial_buying_rate, final_buying_rate):
@@ -111,22 +114,28 @@ class LoadHoursStrategy(BidEnabledStrategy):
         self.fit_to_limit = fit_to_limit
 
     def _validate_rates(self):
+        rates = set()
         for time_slot in generate_market_slot_list():
             rate_change = None if self.fit_to_limit else \
                 self.bid_update.energy_rate_change_per_update[time_slot]
+            rates.add((self.bid_update.initial_rate[time_slot], rate_change,
+                       self.bid_update.final_rate[time_slot]))
+        for initial_buying_rate, rate_change, final_buying_rate in rates:
             validate_load_device_price(
-                initial_buying_rate=self.bid_update.initial_rate[time_slot],
+                initial_buying_rate=initial_buying_rate,
                 energy_rate_increase_per_update=rate_change,
-                final_buying_rate=self.bid_update.final_rate[time_slot],
+                final_buying_rate=final_buying_rate,
                 fit_to_limit=self.bid_update.fit_to_limit)
 
     def event_activate(self):
         self._calculate_active_markets()
         self.event_activate_price()
         self.event_activate_energy()
+        LoadHoursPopulation.join(self)
 
     def event_market_cycle(self):
         super().event_market_cycle()
+        LoadHoursPopulation.join(self)
         self._calculate_active_markets()
         for market in self.active_markets:
             current_day = self._get_day_of_timestamp(market.time_slot)
@@ -199,7 +208,8 @@ class LoadHoursStrategy(BidEnabledStrategy):
         self._set_alternative_pricing_scheme()
 
     def _find_acceptable_offer(self, market):
-        offers = market.most_affordable_offers
+        offers = market.most_affordable_offers if self._population is None \
+            else self._population.most_affordable_offers(market)
         return random.choice(offers)
 
     def _one_sided_market_event_tick(self, market, offer=None):
@@ -256,6 +266,10 @@ class LoadHoursStrategy(BidEnabledStrategy):
 
         self.bid_update.increment_update_counter_all_markets(self)
 
+    def has_pending_tick_actions(self):
+        # Ticks only accept existing offers or update the prices of already posted bids
+        return False
+
     def event_offer(self, *, market_id, offer):
         super().event_offer(market_id=market_id, offer=offer)
         market = self.area.get_future_market_from_id(market_id)
@@ -409,3 +423,54 @@ class LoadHoursStrategy(BidEnabledStrategy):
 
 class CellTowerLoadHoursStrategy(LoadHoursStrategy):
     pass
+
+
+class LoadHoursPopulation:
+    """
+    Shares the order book evaluation of all loads that trade in the same area: the most
+    affordable offers of a market are computed once and used by every load until the offers
+    of the market change. Every load still acts at its position in the random order of the
+    tick dispatch, therefore the loads make the same random choices and trades as with their
+    own evaluation of the order book.
+    """
+    # Smaller populations evaluate the order book for every load
+    MIN_SIZE = 2
+    # area the loads trade in -> population of the area
+    _populations = WeakKeyDictionary()
+
+    def __init__(self, area):
+        self.area = area
+        self.strategies = WeakSet()
+        # market id -> (offers_version, most affordable offers of the market)
+        self._most_affordable_offers = {}
+
+    @classmethod
+    def join(cls, strategy):
+        """
+        Attaches strategy to the population of the area it trades in. Called by the loads on
+        activate and market cycle, which also drops the offers of the past markets.
+        """
+        population = cls._populations.get(strategy.area)
+        if population is None:
+            population = cls._populations[strategy.area] = cls(strategy.area)
+        elif len(population._most_affordable_offers) > len(strategy.area.all_markets):
+            population.market_cycle()
+        population.strategies.add(strategy)
+        if len(population.strategies) == cls.MIN_SIZE:
+            for member in population.strategies:
+                member._population = population
+        elif len(population.strategies) > cls.MIN_SIZE:
+            strategy._population = population
+
+    def market_cycle(self):
+        market_ids = {market.id for market in self.area.all_markets}
+        self._most_affordable_offers = {
+            market_id: offers for market_id, offers in self._most_affordable_offers.items()
+            if market_id in market_ids}
+
+    def most_affordable_offers(self, market):
+        offers_version, offers = self._most_affordable_offers.get(market.id, (None, None))
+        if offers_version != market.offers_version:
+            offers = market.most_affordable_offers
+            self._most_affordable_offers[market.id] = (market.offers_version, offers)
+        return offers
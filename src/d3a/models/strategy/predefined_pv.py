@@ -19,9 +19,10 @@ import pathlib
 
 from pendulum import DateTime, duration
 from d3a.d3a_core.util import generate_market_slot_list
-from d3a.models.strategy.pv import PVStrategy
+from d3a.models.strategy.pv import PVStrategy, shared_energy_forecast, market_slots_key
 from d3a_interface.constants_limits import ConstSettings
-from d3a.models.read_user_profile import read_arbitrary_profile, InputProfileTypes
+from d3a.models.read_user_profile import read_arbitrary_profile, InputProfileTypes, \
+    arbitrary_profile_cache_key
 from d3a.d3a_core.util import d3a_path
 from typing import Dict
 from d3a_interface.utils import key_in_dict_and_not_none
@@ -87,23 +88,25 @@ class PVPredefinedStrategy(PVStrategy):
     def read_config_event(self):
         self._power_profile_index = self.cloud_coverage \
             if self.cloud_coverage is not None else self.area.config.cloud_coverage
-        data = self._read_predefined_profile_for_pv()
+        profile_key = arbitrary_profile_cache_key(InputProfileTypes.POWER,
+                                                  self._power_profile_input())
+        key = None if profile_key is None else \
+            ("profile", profile_key, self.panel_count, market_slots_key(self.area))
+        self._set_energy_forecast(shared_energy_forecast(key, self._profile_energy_forecast))
 
-        for slot_time in generate_market_slot_list(area=self.area):
-            self.energy_production_forecast_kWh[slot_time] = \
-                data[slot_time] * self.panel_count
-            self.state.available_energy_kWh[slot_time] = \
-                self.energy_production_forecast_kWh[slot_time]
+    def _profile_energy_forecast(self) -> Dict[DateTime, float]:
+        data = self._read_predefined_profile_for_pv()
+        return {slot_time: data[slot_time] * self.panel_count
+                for slot_time in generate_market_slot_list(area=self.area)}
 
-    def _read_predefined_profile_for_pv(self) -> Dict[DateTime, float]:
+    def _power_profile_input(self):
         """
-        Reads profile data from the predefined power profiles. Reads config and constructor
-        parameters and selects the appropriate predefined profile.
-        :return: key value pairs of time to energy in kWh
+        Selects the predefined power profile from the config and constructor parameters.
+        :return: path of the predefined profile, None if the user profile of the config is used
         """
         if self._power_profile_index is None or self._power_profile_index == 4:
             if self.owner.config.pv_user_profile is not None:
-                return self.owner.config.pv_user_profile
+                return None
             else:
                 self._power_profile_index = self.owner.config.cloud_coverage
         if self._power_profile_index == 0:  # 0:sunny
@@ -114,10 +117,20 @@ class PVPredefinedStrategy(PVStrategy):
             profile_path = pathlib.Path(d3a_path + '/resources/Solar_Curve_W_cloudy.csv')
         else:
             raise ValueError("Energy_profile has to be in [0,1,2]")
+        return str(profile_path)
+
+    def _read_predefined_profile_for_pv(self) -> Dict[DateTime, float]:
+        """
+        Reads profile data from the predefined power profiles. Reads config and constructor
+        parameters and selects the appropriate predefined profile.
+        :return: key value pairs of time to energy in kWh
+        """
+        profile_path = self._power_profile_input()
+        if profile_path is None:
+            return self.owner.config.pv_user_profile
 
         # Populate energy production forecast data
-        return read_arbitrary_profile(
-            InputProfileTypes.POWER, str(profile_path))
+        return read_arbitrary_profile(InputProfileTypes.POWER, profile_path)
 
     def area_reconfigure_event(self, validate=True, **kwargs):
         super().area_reconfigure_event(validate=validate, **kwargs)
@@ -162,6 +175,9 @@ class PVUserProfileStrategy(PVPredefinedStrategy):
                          use_market_maker_rate=use_market_maker_rate)
         self._power_profile_W = power_profile
 
+    def _power_profile_input(self):
+        return self._power_profile_W
+
     def _read_predefined_profile_for_pv(self) -> Dict[DateTime, float]:
         """
         Reads profile data from the power profile. Handles csv files and dicts.
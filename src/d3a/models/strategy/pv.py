@@ -18,6 +18,9 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 from typing import Dict  # noqa
 from pendulum import Time  # noqa
 import math
+from bisect import bisect_left
+from collections.abc import MutableMapping
+import numpy
 from pendulum import duration
 
 from d3a.d3a_core.util import generate_market_slot_list
@@ -32,6 +35,94 @@ from d3a.models.read_user_profile import read_arbitrary_profile, InputProfileTyp
 from d3a_interface.constants_limits import GlobalConfig
 from d3a_interface.utils import key_in_dict_and_not_none
 
+# (forecast parameters, market slots) -> energy forecast shared by the PVs with these parameters
+_ENERGY_FORECAST_CACHE = {}
+_ENERGY_FORECAST_CACHE_SIZE = 1024
+
+
+class EnergyForecast(MutableMapping):
+    """
+    View of an energy forecast that is shared by all PVs with the same parameters.
+    Every PV owns its view, past slots are hidden by advancing the first slot of the view
+    instead of being deleted from the shared forecast. A view that is modified copies the
+    forecast first, so that the shared forecast and the views of the other PVs stay unchanged.
+    """
+    __slots__ = ('_forecast', '_time_slots', '_start')
+
+    def __init__(self, forecast, time_slots=None, start=0):
+        self._forecast = forecast
+        # Forecasts are created in the order of the market slots
+        self._time_slots = tuple(forecast) if time_slots is None else time_slots
+        self._start = start
+
+    def __getitem__(self, time_slot):
+        if self._start > 0 and time_slot <= self._time_slots[self._start - 1]:
+            raise KeyError(time_slot)
+        return self._forecast[time_slot]
+
+    def __setitem__(self, time_slot, energy):
+        self._copy_forecast()
+        self._forecast[time_slot] = energy
+
+    def __delitem__(self, time_slot):
+        self._copy_forecast()
+        del self._forecast[time_slot]
+
+    def __iter__(self):
+        if self._time_slots is None:
+            return iter(self._forecast)
+        return iter(self._time_slots[self._start:])
+
+    def __len__(self):
+        if self._time_slots is None:
+            return len(self._forecast)
+        return len(self._time_slots) - self._start
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({dict(self)})"
+
+    def view(self):
+        return EnergyForecast(self._forecast, self._time_slots, self._start)
+
+    def delete_slots_before(self, time_slot):
+        if self._time_slots is None:
+            for past_slot in [slot for slot in self._forecast if slot < time_slot]:
+                del self._forecast[past_slot]
+        else:
+            self._start = bisect_left(self._time_slots, time_slot, self._start)
+
+    def _copy_forecast(self):
+        # A copied forecast is no longer ordered by the time slots of the shared forecast
+        if self._time_slots is not None:
+            self._forecast = dict(self)
+            self._time_slots = None
+            self._start = 0
+
+
+def shared_energy_forecast(key, calculate_forecast):
+    """
+    Returns a view of the energy forecast with the given key, that is only calculated
+    (calculate_forecast) for the first PV with these parameters.
+    A None key disables the sharing, e.g. for profiles that can be modified by their owner.
+    """
+    if key is None:
+        return calculate_forecast()
+    forecast = _ENERGY_FORECAST_CACHE.get(key)
+    if forecast is None:
+        forecast = EnergyForecast(calculate_forecast())
+        if len(_ENERGY_FORECAST_CACHE) >= _ENERGY_FORECAST_CACHE_SIZE:
+            _ENERGY_FORECAST_CACHE.clear()
+        _ENERGY_FORECAST_CACHE[key] = forecast
+    return forecast.view()
+
+
+def market_slots_key(area):
+    """
+    Key of the market slots of the simulation in the forecast cache, slots are equidistant.
+    """
+    slot_list = generate_market_slot_list(area=area)
+    return (slot_list[0] if slot_list else None, len(slot_list), area.config.slot_length)
+
 
 class PVStrategy(BaseStrategy):
 
@@ -127,10 +218,12 @@ class PVStrategy(BaseStrategy):
         self.offer_update.update_offer(self)
 
     def _validate_rates(self):
-        for time_slot in generate_market_slot_list():
-            validate_pv_device_price(
-                initial_selling_rate=self.offer_update.initial_rate[time_slot],
-                final_selling_rate=self.offer_update.final_rate[time_slot])
+        for initial_selling_rate, final_selling_rate in \
+                {(self.offer_update.initial_rate[time_slot],
+                  self.offer_update.final_rate[time_slot])
+                 for time_slot in generate_market_slot_list()}:
+            validate_pv_device_price(initial_selling_rate=initial_selling_rate,
+                                     final_selling_rate=final_selling_rate)
 
     def event_activate(self):
         self.event_activate_price()
@@ -155,20 +248,51 @@ class PVStrategy(BaseStrategy):
         self.offer_update.update_offer(self)
         self.offer_update.increment_update_counter_all_markets(self)
 
+    def has_pending_tick_actions(self):
+        # Ticks only update the prices of already posted offers
+        return False
+
     def produced_energy_forecast_kWh(self):
         # This forecast ist based on the real PV system data provided by enphase
         # They can be found in the tools folder
         # A fit of a gaussian function to those data results in a formula Energy(time)
-        for slot_time in generate_market_slot_list(area=self.area):
-            if slot_time >= self.area.now:
-                difference_to_midnight_in_minutes = \
-                    slot_time.diff(self.area.now.start_of("day")).in_minutes() % (60 * 24)
-                self.energy_production_forecast_kWh[slot_time] = \
-                    self.gaussian_energy_forecast_kWh(
-                        difference_to_midnight_in_minutes) * self.panel_count
-                self.state.available_energy_kWh[slot_time] = \
-                    self.energy_production_forecast_kWh[slot_time]
-                assert self.energy_production_forecast_kWh[slot_time] >= 0.0
+        slot_list = generate_market_slot_list(area=self.area)
+        now = self.area.now
+        first_slot = bisect_left(slot_list, now)
+        midnight = now.start_of("day")
+        key = ("gaussian", self.max_panel_power_W, self.panel_count, market_slots_key(self.area),
+               first_slot, midnight)
+        self._set_energy_forecast(shared_energy_forecast(
+            key, lambda: self._gaussian_energy_forecast(slot_list[first_slot:], midnight)))
+
+    def _gaussian_energy_forecast(self, slot_list, midnight):
+        """
+        Vectorized gaussian_energy_forecast_kWh of the given slots, scaled by the panel count.
+        """
+        time_in_minutes = numpy.array(
+            [slot_time.diff(midnight).in_minutes() % (60 * 24) for slot_time in slot_list])
+        gauss_forecast = numpy.where(
+            ((8 * 60) > time_in_minutes) | (time_in_minutes > (16.5 * 60)), 0,
+            self.max_panel_power_W * numpy.exp(
+                -((numpy.round(time_in_minutes / 5) - 147.2) / 38.60) ** 2))
+        w_to_wh_factor = (self.area.config.slot_length / duration(hours=1))
+        energy_kWh = (gauss_forecast / 1000) * w_to_wh_factor
+        forecast = {slot_time: round(energy, 4) * self.panel_count
+                    for slot_time, energy in zip(slot_list, energy_kWh.tolist())}
+        assert all(energy >= 0.0 for energy in forecast.values())
+        return forecast
+
+    def _set_energy_forecast(self, forecast):
+        """
+        Replaces the forecast of the slots of the given forecast, the available energy of these
+        slots is reset to the forecast. Forecasts of other slots are kept.
+        """
+        if any(slot_time not in forecast for slot_time in self.energy_production_forecast_kWh):
+            previous_forecast = dict(self.energy_production_forecast_kWh)
+            previous_forecast.update(forecast)
+            forecast = previous_forecast
+        self.energy_production_forecast_kWh = forecast
+        self.state.available_energy_kWh.update(forecast)
 
     def gaussian_energy_forecast_kWh(self, time_in_minutes=0):
         # The sun rises at approx 6:30 and sets at 18hr
@@ -208,7 +332,12 @@ class PVStrategy(BaseStrategy):
                 to_delete.append(k)
         for k in to_delete:
             self.state.available_energy_kWh.pop(k, None)
-            self.energy_production_forecast_kWh.pop(k, None)
+        if isinstance(self.energy_production_forecast_kWh, EnergyForecast):
+            self.energy_production_forecast_kWh.delete_slots_before(
+                self.area.current_market.time_slot)
+        else:
+            for k in to_delete:
+                self.energy_production_forecast_kWh.pop(k, None)
 
     def event_market_cycle_price(self):
         self.offer_update.update_market_cycle_offers(self)
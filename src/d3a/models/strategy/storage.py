@@ -97,10 +97,13 @@ class StorageStrategy(BidEnabledStrategy):
                                  fit_to_limit=fit_to_limit,
                                  energy_rate_change_per_update=energy_rate_decrease_per_update,
                                  update_interval=update_interval)
-        for time_slot in generate_market_slot_list():
-            validate_storage_device(
-                initial_selling_rate=self.offer_update.initial_rate[time_slot],
-                final_selling_rate=self.offer_update.final_rate[time_slot])
+        # Rates are mostly constant over time, validate each distinct combination only once
+        for initial_selling_rate, final_selling_rate in \
+                {(self.offer_update.initial_rate[time_slot],
+                  self.offer_update.final_rate[time_slot])
+                 for time_slot in generate_market_slot_list()}:
+            validate_storage_device(initial_selling_rate=initial_selling_rate,
+                                    final_selling_rate=final_selling_rate)
         self.bid_update = \
             UpdateFrequencyMixin(
                 initial_rate=initial_buying_rate,
@@ -110,10 +113,12 @@ class StorageStrategy(BidEnabledStrategy):
                 update_interval=update_interval,
                 rate_limit_object=min
             )
-        for time_slot in generate_market_slot_list():
-            validate_storage_device(
-                initial_buying_rate=self.bid_update.initial_rate[time_slot],
-                final_buying_rate=self.bid_update.final_rate[time_slot])
+        for initial_buying_rate, final_buying_rate in \
+                {(self.bid_update.initial_rate[time_slot],
+                  self.bid_update.final_rate[time_slot])
+                 for time_slot in generate_market_slot_list()}:
+            validate_storage_device(initial_buying_rate=initial_buying_rate,
+                                    final_buying_rate=final_buying_rate)
         self.state = \
             StorageState(initial_soc=initial_soc,
                          initial_energy_origin=initial_energy_origin,
@@ -164,15 +169,23 @@ class StorageStrategy(BidEnabledStrategy):
         self._validate_rates()
 
     def _validate_rates(self):
+        rates = set()
         for time_slot in generate_market_slot_list():
             bid_rate_change = None if self.bid_update.fit_to_limit else \
                 self.bid_update.energy_rate_change_per_update[time_slot]
             offer_rate_change = None if self.offer_update.fit_to_limit else \
                 self.offer_update.energy_rate_change_per_update[time_slot]
-            validate_storage_device(initial_selling_rate=self.offer_update.initial_rate[time_slot],
-                                    final_selling_rate=self.offer_update.final_rate[time_slot],
-                                    initial_buying_rate=self.bid_update.initial_rate[time_slot],
-                                    final_buying_rate=self.bid_update.final_rate[time_slot],
+            rates.add((self.offer_update.initial_rate[time_slot],
+                       self.offer_update.final_rate[time_slot],
+                       self.bid_update.initial_rate[time_slot],
+                       self.bid_update.final_rate[time_slot],
+                       bid_rate_change, offer_rate_change))
+        for initial_selling_rate, final_selling_rate, initial_buying_rate, final_buying_rate, \
+                bid_rate_change, offer_rate_change in rates:
+            validate_storage_device(initial_selling_rate=initial_selling_rate,
+                                    final_selling_rate=final_selling_rate,
+                                    initial_buying_rate=initial_buying_rate,
+                                    final_buying_rate=final_buying_rate,
                                     energy_rate_increase_per_update=bid_rate_change,
                                     energy_rate_decrease_per_update=offer_rate_change,
                                     fit_to_limit=self.bid_update.fit_to_limit,
@@ -307,6 +320,17 @@ class StorageStrategy(BidEnabledStrategy):
             for market in self.area.all_markets:
                 self.buy_energy(market)
 
+    def has_pending_tick_actions(self):
+        # The storage loses energy on every tick
+        if self.state.loss_per_hour != 0:
+            return True
+        if ConstSettings.IAASettings.MARKET_TYPE == 2 or \
+                ConstSettings.IAASettings.MARKET_TYPE == 3:
+            # The first bids are posted on tick
+            return any(self.state.energy_to_buy_dict[market.time_slot] >
+                       FLOATING_POINT_TOLERANCE for market in self.area.all_markets)
+        return False
+
     def event_trade(self, *, market_id, trade):
         market = self.area.get_future_market_from_id(market_id)
         super().event_trade(market_id=market_id, trade=trade)
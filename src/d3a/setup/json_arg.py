@@ -15,16 +15,20 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
-from d3a.d3a_core.area_serializer import area_from_dict
+from d3a.d3a_core.area_serializer import area_from_dict, area_from_payload
+from d3a.d3a_core.scenario_payload import is_scenario_payload, default_profile_store
 import d3a.constants
 
 
 def get_setup(config):
     try:
-        area_description = config.area
+        payload = config.area if is_scenario_payload(config.area) else None
+        area_description = payload["area"] if payload is not None else config.area
         if "collaboration_uuid" in area_description:
             d3a.constants.COLLABORATION_ID = area_description.pop("collaboration_uuid")
             d3a.constants.EXTERNAL_CONNECTION_WEB = True
+        if payload is not None:
+            return area_from_payload(payload, config, default_profile_store())
         return area_from_dict(area_description, config)
     except AttributeError as ex:
         raise RuntimeError('Area not found') from ex
@@ -0,0 +1,24 @@
+"""
+Copyright 2018 Grid Singularity
+This file is part of D3A.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import d3a.constants
+from d3a.setup.power_flow.test_power_flow import get_setup as get_power_flow_setup
+
+
+def get_setup(config):
+    d3a.constants.POWER_FLOW_TIME_SERIES = True
+    return get_power_flow_setup(config)
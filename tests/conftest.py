@@ -16,6 +16,13 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 import pytest
+from pendulum import duration, today
+
+from d3a.constants import TIME_ZONE
+from d3a.d3a_core.area_registry import iterate_area_tree
+from d3a.d3a_core.simulation import Simulation
+from d3a.models.config import SimulationConfig
+from d3a_interface.constants_limits import ConstSettings, GlobalConfig
 
 
 class Called:
@@ -34,3 +41,54 @@ class Called:
 @pytest.yield_fixture
 def called():
     yield Called()
+
+
+@pytest.fixture
+def simulation_settings():
+    """
+    Keeps the past markets of simulations and restores the global settings that simulations
+    and their setup modules change.
+    """
+    global_config = {key: value for key, value in vars(GlobalConfig).items()
+                     if not key.startswith("__")}
+    keep_past_markets = ConstSettings.GeneralSettings.KEEP_PAST_MARKETS
+    market_type = ConstSettings.IAASettings.MARKET_TYPE
+    ConstSettings.GeneralSettings.KEEP_PAST_MARKETS = True
+    yield
+    ConstSettings.GeneralSettings.KEEP_PAST_MARKETS = keep_past_markets
+    ConstSettings.IAASettings.MARKET_TYPE = market_type
+    for key in [key for key in vars(GlobalConfig)
+                if not key.startswith("__") and key not in global_config]:
+        delattr(GlobalConfig, key)
+    for key, value in global_config.items():
+        setattr(GlobalConfig, key, value)
+
+
+def create_simulation(setup_module_name, sim_duration, tick_length, start_date=None,
+                      **simulation_kwargs):
+    config = SimulationConfig(sim_duration=sim_duration,
+                              slot_length=duration(minutes=15),
+                              tick_length=tick_length,
+                              market_count=1,
+                              cloud_coverage=0,
+                              start_date=start_date or today(tz=TIME_ZONE),
+                              external_connection_enabled=False)
+    return Simulation(setup_module_name, config, seed=0, no_export=True, **simulation_kwargs)
+
+
+def run_simulation(setup_module_name, sim_duration, tick_length, start_date=None,
+                   **simulation_kwargs):
+    simulation = create_simulation(setup_module_name, sim_duration, tick_length, start_date,
+                                   **simulation_kwargs)
+    simulation.run()
+    return simulation
+
+
+def past_trades(simulation):
+    """
+    Trades of all past markets of the simulation, with rounded energy and price
+    """
+    return [(area.name, market.time_slot, trade.seller, trade.buyer,
+             round(trade.offer.energy, 8), round(trade.offer.price, 8))
+            for area in iterate_area_tree(simulation.area)
+            for market in area.past_markets for trade in market.trades]
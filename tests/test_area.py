@@ -17,7 +17,7 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 from pendulum import duration, today
 from collections import OrderedDict
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 import unittest
 from parameterized import parameterized
 from d3a.events.event_structures import AreaEvent, MarketEvent
@@ -26,6 +26,7 @@ from d3a.models.area.events import Events
 from d3a.models.area.markets import AreaMarkets
 from d3a.models.appliance.simple import SimpleAppliance
 from d3a.models.strategy.storage import StorageStrategy
+from d3a.models.strategy.pv import PVStrategy
 from d3a.models.config import SimulationConfig
 from d3a.models.market import Market
 from d3a.models.market.market_structures import Offer
@@ -107,6 +108,47 @@ class TestAreaClass(unittest.TestCase):
         assert len(self.area.past_markets) == 1
         assert list(self.area.past_markets)[-1].time_slot == today(tz=TIME_ZONE).add(hours=1)
 
+    def test_deleted_past_markets_are_recycled(self):
+        self.area = Area(name="Street", children=[Area(name="House")],
+                         config=GlobalConfig, grid_fee_percentage=5)
+        self.area.config.market_count = 1
+        self.area.activate()
+        self.area._bc = False
+
+        first_market = self.area.next_market
+        first_market_id = first_market.id
+        first_market.offer(1, 1, "test", "test")
+
+        current_time = today(tz=TIME_ZONE).add(hours=1)
+        self.area._markets.rotate_markets(current_time, self.stats, self.dispatcher)
+        self.area._markets.create_future_markets(current_time, True, self.area)
+        assert list(self.area.past_markets) == [first_market]
+
+        current_time = today(tz=TIME_ZONE).add(hours=2)
+        self.area._markets.rotate_markets(current_time, self.stats, self.dispatcher)
+        assert first_market not in self.area.past_markets
+        self.area._markets.create_future_markets(current_time, True, self.area)
+        assert self.area.next_market is first_market
+        assert first_market.id != first_market_id
+        assert first_market.time_slot == current_time
+        assert first_market.offers == {}
+        assert first_market.trades == []
+
+    def test_open_orders_are_tracked_through_the_area_tree(self):
+        house = Area(name="House", children=[Area(name="Load")])
+        self.config.market_count = 1
+        self.area = Area(name="Street", children=[house], config=self.config)
+        self.area.activate()
+        house._bc = False
+        assert not self.area.has_open_orders
+
+        offer = house.next_market.offer(1, 1, "Load", "Load")
+        assert house._open_orders_changed and self.area._open_orders_changed
+        assert self.area.has_open_orders
+        assert not house._open_orders_changed
+        house.next_market.delete_offer(offer)
+        assert not self.area.has_open_orders
+
     def test_keep_past_markets(self):
         ConstSettings.GeneralSettings.KEEP_PAST_MARKETS = True
         self.area = Area(name="Street", children=[Area(name="House")],
@@ -295,6 +337,24 @@ class TestEventDispatcher(unittest.TestCase):
         assert area.strategy.event_listener.call_count == 0
         assert area.appliance.event_listener.call_count == 0
 
+    def test_subscribed_events_are_derived_from_overridden_event_handlers(self):
+        assert SimpleAppliance.subscribed_events == {AreaEvent.TICK}
+        assert MarketEvent.TRADE in PVStrategy.subscribed_events
+        assert MarketEvent.BID_DELETED not in PVStrategy.subscribed_events
+        assert MarketEvent.BID_DELETED in StorageStrategy.subscribed_events
+
+    def test_event_listener_dispatches_only_subscribed_events(self):
+        area = Area(name="test_area", strategy=PVStrategy(), appliance=SimpleAppliance())
+        with patch.object(area.strategy, "event_listener") as strategy_listener, \
+                patch.object(area.appliance, "event_listener") as appliance_listener:
+            area.dispatcher.event_listener(MarketEvent.BID_DELETED, market_id="id", bid=None)
+            assert strategy_listener.call_count == 0
+            assert appliance_listener.call_count == 0
+            area.dispatcher.event_listener(MarketEvent.TRADE, market_id="id", trade=None)
+            strategy_listener.assert_called_once_with(MarketEvent.TRADE, market_id="id",
+                                                      trade=None)
+            assert appliance_listener.call_count == 0
+
     def test_event_on_disabled_area_triggered_for_market_cycle_on_disabled_area(self):
         area = self.strategy_appliance_mock()
         area.strategy.event_on_disabled_area = MagicMock()
@@ -0,0 +1,58 @@
+"""
+Copyright 2018 Grid Singularity
+This file is part of D3A.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import pytest
+from pendulum import datetime
+
+from d3a.models.area.event_types import ConnectAreaEvent, DisconnectAreaEvent, \
+    EnableAreaEvent, DisableAreaEvent, DisableIntervalAreaEvent, DisconnectIntervalAreaEvent
+from d3a.models.area.events import Events
+
+
+def _ticked_state(state_events, current_time):
+    state_events.isolated_ev.tick(current_time)
+    for event in state_events.interval_ev:
+        event.tick(current_time)
+    return state_events.isolated_ev.active and all(e.active for e in state_events.interval_ev)
+
+
+@pytest.mark.parametrize("event_list", [
+    [DisconnectAreaEvent(6), ConnectAreaEvent(16)],
+    [ConnectAreaEvent(16), DisconnectAreaEvent(6), DisconnectAreaEvent(20)],
+    [DisableAreaEvent(0)],
+    [DisableAreaEvent(12), EnableAreaEvent(16), DisableIntervalAreaEvent(2, 5)],
+    [DisableIntervalAreaEvent(6, 16), DisconnectIntervalAreaEvent(20, 30),
+     DisconnectAreaEvent(23)],
+])
+def test_event_timelines_match_the_events(event_list):
+    events = Events(event_list, area=None)
+    start = datetime(2020, 1, 1)
+    for minutes in range(0, 3 * 24 * 60, 20):
+        current_time = start.add(minutes=minutes)
+        events.update_events(current_time)
+        assert events.is_enabled == \
+            _ticked_state(events.enable_disable_events, current_time)
+        assert events.is_connected == \
+            _ticked_state(events.connect_disconnect_events, current_time)
+
+
+def test_event_timelines_are_not_compiled_for_areas_without_events():
+    events = Events([], area=None)
+    events.update_events(datetime(2020, 1, 1, 12))
+    assert events.enable_disable_events._timeline is None
+    assert events.connect_disconnect_events._timeline is None
+    assert events.is_enabled and events.is_connected
@@ -0,0 +1,87 @@
+"""
+Copyright 2018 Grid Singularity
+This file is part of D3A.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import unittest
+import pytest
+from d3a.d3a_core.exceptions import AreaException
+from d3a.models.area import Area
+from d3a.models.strategy.load_hours import LoadHoursStrategy
+
+
+class TestAreaRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.load = Area("H1 Load", strategy=LoadHoursStrategy(avg_power_W=100))
+        self.house1 = Area("House 1", children=[self.load])
+        self.house2 = Area("House 2")
+        self.grid = Area("Grid", children=[self.house1, self.house2])
+
+    def test_registry_is_shared_by_all_areas_of_the_tree(self):
+        assert self.load.registry is self.grid.registry
+        assert len(self.grid.registry) == 4
+
+    def test_areas_can_be_looked_up_by_uuid_name_and_slug(self):
+        registry = self.grid.registry
+        assert registry.get_by_uuid(self.load.uuid) is self.load
+        assert registry.get_by_name("House 2") is self.house2
+        assert registry.get_by_slug("house-1") is self.house1
+        assert registry.get_by_uuid("unknown") is None
+        assert self.load in registry
+
+    def test_duplicate_area_names_are_rejected(self):
+        with pytest.raises(AreaException):
+            Area("Grid", children=[Area("House"), Area("House")]).registry
+
+    def test_add_child_registers_the_whole_subtree(self):
+        new_load = Area("H2 Load", strategy=LoadHoursStrategy(avg_power_W=100))
+        self.house2.add_child(Area("Flat", children=[new_load]))
+        assert new_load.parent.parent is self.house2
+        assert self.grid.registry.get_by_uuid(new_load.uuid) is new_load
+        assert len(self.grid.registry) == 6
+
+    def test_add_child_with_duplicate_name_does_not_change_the_tree(self):
+        with pytest.raises(AreaException):
+            self.house2.add_child(Area("H1 Load"))
+        assert self.house2.children == []
+        assert self.grid.registry.get_by_name("H1 Load") is self.load
+
+    def test_add_child_to_leaf_area_is_rejected(self):
+        with pytest.raises(AreaException):
+            self.load.add_child(Area("H1 Load 2"))
+
+    def test_remove_child_unregisters_the_whole_subtree(self):
+        self.grid.remove_child(self.house1)
+        assert self.house1.parent is None
+        assert self.grid.registry.get_by_uuid(self.load.uuid) is None
+        assert self.grid.registry.get_by_name("House 1") is None
+        assert len(self.grid.registry) == 2
+
+    def test_removed_area_name_can_be_reused(self):
+        self.house1.remove_child(self.load)
+        new_load = Area("H1 Load", strategy=LoadHoursStrategy(avg_power_W=200))
+        self.house1.add_child(new_load)
+        assert self.grid.registry.get_by_name("H1 Load") is new_load
+
+    def test_child_by_slug_follows_changes_of_the_subtree(self):
+        assert dict(self.house1.child_by_slug) == {"house-1": self.house1,
+                                                   "h1-load": self.load}
+        assert self.house1.child_by_slug is self.house1.child_by_slug
+        self.house1.remove_child(self.load)
+        assert dict(self.house1.child_by_slug) == {"house-1": self.house1}
+        new_load = Area("H1 Load 2", strategy=LoadHoursStrategy(avg_power_W=200))
+        self.house1.add_child(new_load)
+        assert self.house1.child_by_slug["h1-load-2"] is new_load
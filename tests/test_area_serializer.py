@@ -18,7 +18,8 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 import json
 import pytest
 
-from d3a.d3a_core.area_serializer import area_to_string, area_from_string, are_all_areas_unique
+from d3a.d3a_core.area_serializer import area_to_string, area_from_string
+from d3a.d3a_core.exceptions import AreaException
 from d3a.models.appliance.pv import PVAppliance
 from d3a.models.area import Area
 from d3a.models.leaves import PV, LoadHours, Storage
@@ -114,6 +115,26 @@ def test_leaf_deserialization():
     assert pv2.display_type == "PV"
 
 
+def test_identical_leaves_do_not_share_state():
+    recovered = area_from_string(
+        '''{
+             "name": "house",
+             "children":[
+                 {"name": "storage1", "type": "Storage", "initial_soc": 50},
+                 {"name": "storage2", "type": "Storage", "initial_soc": 50}
+             ]
+           }
+        '''
+    )
+    storage1, storage2 = recovered.children
+    assert storage1.strategy.offer_update.initial_rate == \
+        storage2.strategy.offer_update.initial_rate
+    assert storage1.strategy.offer_update.initial_rate is not \
+        storage2.strategy.offer_update.initial_rate
+    assert storage1.strategy.state.pledged_sell_kWh is not \
+        storage2.strategy.state.pledged_sell_kWh
+
+
 def test_leaf_external_connection_deserialization():
     recovered = area_from_string(
         '''{
@@ -190,8 +211,8 @@ def test_area_does_not_allow_duplicate_subarea_names():
          Area('House 1', children=[Area('H2 General Load'), Area('H2 PV1')])],
     )
 
-    with pytest.raises(AssertionError):
-        are_all_areas_unique(area, set())
+    with pytest.raises(AreaException):
+        area.registry
 
     area = Area(
         'Grid',
@@ -199,8 +220,8 @@ def test_area_does_not_allow_duplicate_subarea_names():
          Area('House 2', children=[Area('H1 General Load'), Area('H2 PV1')])],
     )
 
-    with pytest.raises(AssertionError):
-        are_all_areas_unique(area, set())
+    with pytest.raises(AreaException):
+        area.registry
 
     area = Area(
         'Grid',
@@ -208,5 +229,5 @@ def test_area_does_not_allow_duplicate_subarea_names():
          Area('House 2', children=[Area('H2 General Load'), Area('H2 PV1')])],
     )
 
-    # Does not raise an assertion
-    are_all_areas_unique(area, set())
+    # Does not raise an exception
+    assert len(area.registry) == 7
@@ -53,6 +53,9 @@ class FakeBalancingMarket:
     def time_slot(self):
         return self._timeslot
 
+    def cheapest_balancing_offers(self, positive_energy):
+        return (o for o in self.sorted_offers if (o.energy > 0) == positive_energy)
+
     def accept_offer(self, offer_or_id, buyer, energy=None, time=None,
                      trade_rate: float = None):
         if time is None:
@@ -0,0 +1,93 @@
+"""
+Copyright 2018 Grid Singularity
+This file is part of D3A.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import pytest
+from pendulum import now
+
+from d3a.blockchain.local_chain import LocalBlockChainInterface
+from d3a.blockchain.settlement import BlockchainSettlement
+from d3a.d3a_core.exceptions import D3AException
+from d3a.models.market.blockchain_utils import BC_NUM_FACTOR
+from d3a.models.market.one_sided import OneSidedMarket
+
+
+def test_invalid_settlement_mode_is_rejected():
+    with pytest.raises(D3AException):
+        LocalBlockChainInterface(settlement_mode="block")
+
+
+def test_incomplete_settlement_chain_can_not_be_created():
+    class IncompleteChain(BlockchainSettlement):
+        def create_market_contract(self, duration_s, listeners=None):
+            return None
+
+    with pytest.raises(TypeError):
+        IncompleteChain()
+
+
+def test_transactions_are_sent_immediately_without_batching():
+    bc = LocalBlockChainInterface()
+    market = OneSidedMarket(bc=bc, time_slot=now())
+    offer = market.offer(10, 5, 'A', 'A')
+    contract = market.bc_interface.bc_contract
+    assert contract.offers[offer.real_id] == (5 * BC_NUM_FACTOR, 10 * BC_NUM_FACTOR, 'A')
+
+    market.accept_offer(offer, 'B')
+    assert offer.real_id not in contract.offers
+    assert contract.balances['B'] == 5 * BC_NUM_FACTOR
+
+
+def test_batched_transactions_are_sent_after_the_tick():
+    bc = LocalBlockChainInterface(settlement_mode="tick")
+    market = OneSidedMarket(bc=bc, time_slot=now())
+    contract = market.bc_interface.bc_contract
+    offer = market.offer(10, 5, 'A', 'A')
+    assert contract.offers == {}
+    bc.settle()
+    assert list(contract.offers) == [market.bc_interface.chain_ids[offer.id]]
+
+    trade = market.accept_offer(offer, 'C', energy=2)
+    market.delete_offer(market.offer(10, 5, 'B', 'B'))
+    bc.settle()
+
+    # The deleted offer never reached the chain, the residual offer is created by the trade
+    assert bc.transaction_count == 2
+    assert bc.settled_transaction_count == 2
+    chain_ids = market.bc_interface.chain_ids
+    assert list(contract.offers) == [chain_ids[trade.residual.id]]
+    assert contract.offers[chain_ids[trade.residual.id]][0] == 3 * BC_NUM_FACTOR
+    assert contract.balances['C'] == 2 * BC_NUM_FACTOR
+    assert trade.id in chain_ids
+
+
+def test_slot_settlement_waits_for_the_end_of_the_slot():
+    bc = LocalBlockChainInterface(settlement_mode="slot")
+    market = OneSidedMarket(bc=bc, time_slot=now())
+    market.offer(10, 5, 'A', 'A')
+    bc.settle()
+    assert bc.transaction_count == 0
+    bc.settle(end_of_slot=True)
+    assert bc.transaction_count == 1
+    assert len(market.bc_interface.bc_contract.offers) == 1
+
+
+def test_standing_offers_are_split_on_the_chain():
+    market = OneSidedMarket(bc=LocalBlockChainInterface(), time_slot=now())
+    offer = market.offer(10, 5, 'A', 'A', standing=True)
+    assert not offer.standing
+    trade = market.accept_offer(offer, 'B', energy=2)
+    assert trade.residual is not None
@@ -1,8 +1,12 @@
 import unittest
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 import json
+from pendulum import duration, today
+from d3a.constants import TIME_ZONE
 import d3a.models.area.redis_external_connection
 from d3a.models.area import Area
+from d3a.models.config import SimulationConfig
+from d3a.models.strategy.load_hours import LoadHoursStrategy
 from d3a.models.area.redis_external_connection import RedisAreaExternalConnection
 
 
@@ -96,3 +100,70 @@ class TestExternalConnectionRedis(unittest.TestCase):
         assert len(self.area.children) == 3
         self.external_connection.redis_db.publish.assert_called_with(
             "base-area/unregister_participant/response", json.dumps({"response": "failed"}))
+
+
+class TestExternalConnectionInRunningSimulation(unittest.TestCase):
+
+    def setUp(self):
+        self.strategy_patch = patch.object(d3a.models.area.redis_external_connection,
+                                           "ExternalStrategy")
+        self.redis_patch = patch.object(d3a.models.area.redis_external_connection,
+                                        "StrictRedis")
+        external_strategy = self.strategy_patch.start()
+        external_strategy.return_value.get_channel_list = MagicMock(return_value={})
+        self.redis_patch.start()
+        self.house = Area(name="House", children=[
+            Area(name="Load", strategy=LoadHoursStrategy(avg_power_W=100))])
+        config = SimulationConfig(sim_duration=duration(hours=24),
+                                  slot_length=duration(minutes=15),
+                                  tick_length=duration(seconds=15),
+                                  market_count=1,
+                                  cloud_coverage=0,
+                                  start_date=today(tz=TIME_ZONE),
+                                  external_connection_enabled=False)
+        self.grid = Area(name="Grid", children=[self.house], config=config)
+        self.grid.activate()
+        self.grid.tick_and_dispatch()
+        self.external_connection = RedisAreaExternalConnection(self.house)
+
+    def tearDown(self):
+        self.strategy_patch.stop()
+        self.redis_patch.stop()
+
+    def _publish_response(self):
+        return self.external_connection.redis_db.publish.call_args[0]
+
+    def test_registered_areas_are_found_in_the_registry_until_unregistered(self):
+        self.external_connection.areas_to_register = ["External"]
+        self.external_connection.register_new_areas()
+        external_area = self.grid.registry.get_by_name("External")
+        assert external_area in self.house.children
+        assert external_area.parent is self.house
+        assert self.grid.child_by_slug["external"] is external_area
+
+        self.external_connection.areas_to_unregister = ["External"]
+        self.external_connection.unregister_pending_areas()
+        assert self._publish_response() == ("house/unregister_participant/response",
+                                            json.dumps({"response": "success"}))
+        assert self.grid.registry.get_by_name("External") is None
+        assert external_area not in self.house.children
+        assert "external" not in self.grid.child_by_slug
+
+        # The name of the unregistered area can be reused
+        self.external_connection.areas_to_register = ["External"]
+        self.external_connection.register_new_areas()
+        assert self.grid.registry.get_by_name("External") in self.house.children
+
+    def test_areas_with_duplicate_names_are_not_registered(self):
+        self.external_connection.areas_to_register = ["Load"]
+        self.external_connection.register_new_areas()
+        assert self._publish_response() == ("house/register_participant/response",
+                                            json.dumps({"response": "failed"}))
+        assert len(self.house.children) == 1
+
+    def test_only_children_of_the_area_can_be_unregistered(self):
+        self.external_connection.areas_to_unregister = ["Grid"]
+        self.external_connection.unregister_pending_areas()
+        assert self._publish_response() == ("house/unregister_participant/response",
+                                            json.dumps({"response": "failed"}))
+        assert self.grid.registry.get_by_name("Grid") is self.grid
@@ -0,0 +1,84 @@
+"""
+Copyright 2018 Grid Singularity
+This file is part of D3A.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import pickle
+
+import pytest
+from pendulum import duration, now, today
+
+from d3a.constants import TIME_ZONE
+from d3a.d3a_core.area_registry import iterate_area_tree
+from d3a.d3a_core.exceptions import D3AException
+from d3a.d3a_core.ids import IdGenerator, get_id_generator, set_id_generator
+from d3a.models.market.one_sided import OneSidedMarket
+from conftest import run_simulation
+
+
+@pytest.fixture
+def id_generator():
+    previous_generator = get_id_generator()
+    yield
+    set_id_generator(previous_generator)
+
+
+def test_invalid_id_mode_is_rejected():
+    with pytest.raises(D3AException):
+        IdGenerator("sequential")
+
+
+def test_compact_ids_are_increasing_and_survive_pickling():
+    generator = IdGenerator()
+    ids = [generator.new_id() for _ in range(300)]
+    assert ids[:3] == ["1", "2", "3"]
+    assert [int(i, 16) for i in ids] == list(range(1, 301))
+
+    restored = pickle.loads(pickle.dumps(generator))
+    assert restored.new_id() == generator.new_id() == "12d"
+
+
+def test_seeded_uuids_are_reproducible():
+    ids = [IdGenerator("uuid", seed=3).new_id() for _ in range(2)]
+    assert ids[0] == ids[1]
+    assert len(ids[0]) == 36
+    assert IdGenerator("uuid").new_id() != IdGenerator("uuid").new_id()
+
+
+@pytest.mark.usefixtures("id_generator")
+def test_markets_use_the_id_generator_of_the_simulation():
+    set_id_generator(IdGenerator())
+    market = OneSidedMarket(time_slot=now())
+    offer = market.offer(10, 2, "A", "A")
+    trade = market.accept_offer(offer, "B", energy=1)
+    # The partially traded offer stays in the market as the residual, with its id
+    assert [market.id, offer.id, trade.residual.id, trade.id] == ["1", "2", "2", "3"]
+
+
+def _trade_ids(simulation):
+    return [(market.time_slot, trade.id, trade.seller, trade.buyer, trade.offer.energy)
+            for area in iterate_area_tree(simulation.area)
+            for market in area.past_markets for trade in market.trades]
+
+
+@pytest.mark.usefixtures("id_generator", "simulation_settings")
+def test_simulations_create_identical_compact_ids():
+    start_date = today(tz=TIME_ZONE).add(hours=6)
+    trades = _trade_ids(run_simulation("default_2", duration(hours=4), duration(seconds=90),
+                                       start_date))
+    assert trades
+    assert trades == _trade_ids(run_simulation("default_2", duration(hours=4),
+                                               duration(seconds=90), start_date))
+    assert all(len(trade_id) <= 6 for _, trade_id, _, _, _ in trades)
@@ -74,6 +74,7 @@ class FakeMarket:
         self.calls_offers = []
         self.calls_bids = []
         self.calls_bids_price = []
+        self.calls_reduced_energy = []
         self.time_slot = pendulum.now(tz=TIME_ZONE)
         self.time_slot_str = self.time_slot.format(TIME_FORMAT)
         self.state = MarketClearingState()
@@ -146,7 +147,7 @@ class FakeMarket:
 
     def offer(self, price: float, energy: float, seller: str, offer_id=None,
               original_offer_price=None, dispatch_event=True, seller_origin=None,
-              adapt_price_with_fees=True) -> Offer:
+              adapt_price_with_fees=True, standing=False) -> Offer:
         self.offer_call_count += 1
 
         if original_offer_price is None:
@@ -156,7 +157,7 @@ class FakeMarket:
         if adapt_price_with_fees:
             price = self._update_new_offer_price_with_fee(price, original_offer_price, energy)
         offer = Offer(offer_id, pendulum.now(), price, energy, seller, original_offer_price,
-                      seller_origin=seller_origin)
+                      seller_origin=seller_origin, standing=standing)
         self.offers[offer.id] = deepcopy(offer)
         self.forwarded_offer = deepcopy(offer)
 
@@ -167,7 +168,7 @@ class FakeMarket:
 
     def bid(self, price: float, energy: float, buyer: str, seller: str,
             bid_id: str = None, original_bid_price=None, buyer_origin=None,
-            adapt_price_with_fees=True):
+            adapt_price_with_fees=True, standing=False):
         self.bid_call_count += 1
 
         if original_bid_price is None:
@@ -181,12 +182,23 @@ class FakeMarket:
 
         bid = Bid(bid_id, pendulum.now(), price, energy, buyer, seller,
                   original_bid_price=original_bid_price,
-                  buyer_origin=buyer_origin)
+                  buyer_origin=buyer_origin, standing=standing)
         self._bids.append(bid)
         self.forwarded_bid = bid
 
         return bid
 
+    def reduce_offer(self, offer_or_id, energy):
+        self.calls_reduced_energy.append(energy)
+        offer = self.offers[offer_or_id.id]
+        offer.energy = energy
+        return offer
+
+    def reduce_bid(self, bid_or_id, energy):
+        self.calls_reduced_energy.append(energy)
+        self.bids[bid_or_id.id] = self.bids[bid_or_id.id]._replace(energy=energy)
+        return self.bids[bid_or_id.id]
+
     def split_offer(self, original_offer, energy, orig_offer_price):
         self.offers.pop(original_offer.id, None)
         # same offer id is used for the new accepted_offer
@@ -541,16 +553,104 @@ def test_iaa_event_trade_buys_partial_accepted_offer(iaa2):
     accepted_offer = Offer(
         total_offer.id, total_offer.time, total_offer.price, 1, total_offer.seller
     )
+    residual_offer = Offer(
+        total_offer.id, total_offer.time, total_offer.price, total_offer.energy - 1,
+        total_offer.seller
+    )
     iaa2.event_trade(trade=Trade('trade_id',
                                  pendulum.now(tz=TIME_ZONE),
                                  accepted_offer,
                                  'owner',
                                  'someone_else',
-                                 'residual_offer'),
+                                 residual_offer),
                      market_id=iaa2.higher_market.id)
     assert iaa2.lower_market.calls_energy[0] == 1
 
 
+def test_iaa_keeps_standing_offer_forwarded_after_trades(called):
+    lower_market = FakeMarket([Offer('id', pendulum.now(), 20, 20, 'other', 20, standing=True)],
+                              m_id=123)
+    higher_market = FakeMarket([], m_id=234)
+    iaa = OneSidedAgent(owner=FakeArea('owner'), lower_market=lower_market,
+                        higher_market=higher_market)
+    iaa.event_tick()
+    iaa.owner.current_tick += 2
+    iaa.event_tick()
+    forwarded_offer = higher_market.forwarded_offer
+    assert forwarded_offer.standing
+    higher_market.delete_offer = called
+
+    filled_offer = Offer('id', forwarded_offer.time, 1, 1, 'other', standing=True)
+    iaa.event_trade(trade=Trade('trade_id', pendulum.now(tz=TIME_ZONE), filled_offer,
+                                'other', 'someone_else'),
+                    market_id=lower_market.id)
+    assert len(called.calls) == 0
+
+    filled_offer = Offer(forwarded_offer.id, forwarded_offer.time, forwarded_offer.price / 20,
+                         1, forwarded_offer.seller, standing=True)
+    iaa.event_trade(trade=Trade('trade_id', pendulum.now(tz=TIME_ZONE), filled_offer,
+                                'owner', 'someone_else'),
+                    market_id=higher_market.id)
+    assert lower_market.calls_energy == [1]
+
+    for _ in range(2):
+        iaa.owner.current_tick += 2
+        iaa.event_tick()
+    assert higher_market.offer_call_count == 1
+
+
+def test_iaa_reduces_forwarded_offer_when_source_offer_is_filled_in_place(called):
+    lower_market = FakeMarket([Offer('id', pendulum.now(), 20, 20, 'other', 20)], m_id=123)
+    higher_market = FakeMarket([], m_id=234)
+    iaa = OneSidedAgent(owner=FakeArea('owner'), lower_market=lower_market,
+                        higher_market=higher_market)
+    iaa.event_tick()
+    iaa.owner.current_tick += 2
+    iaa.event_tick()
+    forwarded_offer = higher_market.forwarded_offer
+    higher_market.delete_offer = called
+
+    filled_offer = Offer('id', forwarded_offer.time, 5, 5, 'other')
+    residual_offer = Offer('id', forwarded_offer.time, 15, 15, 'other')
+    iaa.event_trade(trade=Trade('trade_id', pendulum.now(tz=TIME_ZONE), filled_offer,
+                                'other', 'someone_else', residual_offer),
+                    market_id=lower_market.id)
+    assert higher_market.calls_reduced_energy == [15]
+    assert higher_market.offers[forwarded_offer.id].energy == 15
+
+    iaa.event_offer_changed(market_id=lower_market.id,
+                            offer=Offer('id', forwarded_offer.time, 10, 10, 'other'))
+    assert higher_market.calls_reduced_energy == [15, 10]
+
+    # Trades of the source offer that mirror a trade of the forwarded offer change nothing
+    iaa.event_trade(trade=Trade('trade_id', pendulum.now(tz=TIME_ZONE), filled_offer,
+                                'other', 'owner',
+                                Offer('id', forwarded_offer.time, 10, 10, 'other')),
+                    market_id=lower_market.id)
+    assert higher_market.calls_reduced_energy == [15, 10]
+    assert len(called.calls) == 0
+    engine = next(filter(lambda e: e.name == 'Low -> High', iaa.engines))
+    assert engine.forwarded_offers['id'].target_offer.energy == 10
+
+
+def test_iaa_reduces_forwarded_bid_when_source_bid_is_filled_in_place(iaa_double_sided):
+    source_bid = iaa_double_sided.lower_market._bids[0]
+    forwarded_bid = iaa_double_sided.higher_market.forwarded_bid
+    iaa_double_sided.higher_market.bids[forwarded_bid.id] = forwarded_bid
+    filled_bid = source_bid._replace(energy=1)
+    residual_bid = source_bid._replace(energy=source_bid.energy - 1)
+    iaa_double_sided.event_bid_traded(
+        bid_trade=Trade('trade_id', pendulum.now(tz=TIME_ZONE), filled_bid,
+                        'someone_else', source_bid.buyer, residual_bid),
+        market_id=iaa_double_sided.lower_market.id)
+    assert iaa_double_sided.higher_market.calls_reduced_energy == [residual_bid.energy]
+    assert iaa_double_sided.higher_market.bids[forwarded_bid.id].energy == residual_bid.energy
+
+    iaa_double_sided.event_bid_changed(market_id=iaa_double_sided.lower_market.id,
+                                       bid=source_bid._replace(energy=1))
+    assert iaa_double_sided.higher_market.calls_reduced_energy == [residual_bid.energy, 1]
+
+
 def test_iaa_event_trade_buys_partial_accepted_bid(iaa_double_sided):
     iaa_double_sided._get_market_from_market_id = lambda x: iaa_double_sided.higher_market
     original_bid = iaa_double_sided.higher_market.forwarded_bid
@@ -570,7 +670,7 @@ def test_iaa_event_trade_buys_partial_accepted_bid(iaa_double_sided):
                         accepted_bid,
                         'owner',
                         'someone_else',
-                        'residual_offer'),
+                        residual_bid),
         market_id=iaa_double_sided.higher_market.id)
     assert iaa_double_sided.lower_market.calls_energy_bids[0] == 1
 
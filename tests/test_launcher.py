@@ -0,0 +1,138 @@
+"""
+Copyright 2018 Grid Singularity
+This file is part of D3A.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import os
+import resource
+import time
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+from rq import Worker
+
+from d3a.d3a_core.d3a_jobs import RecyclingWorker
+from d3a.d3a_core.launcher import Launcher
+
+
+class FakeJob:
+    def __init__(self, waiting_seconds=0):
+        self.enqueued_at = datetime.now() - timedelta(seconds=waiting_seconds)
+
+
+class FakeQueue:
+    def __init__(self, jobs=None):
+        self.jobs = jobs or []
+
+    @property
+    def count(self):
+        return len(self.jobs)
+
+
+def fake_worker(redis_url, max_jobs, max_memory_mb, busy_workers):
+    time.sleep(0.2)
+
+
+def resident_memory_mb():
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * resource.getpagesize() / 1024 / 1024
+
+
+def memory_hungry_job(memory_mb):
+    """
+    Allocates memory_mb in a forked work horse, like rq's Worker.execute_job does.
+    """
+    def execute_job(worker, job, queue):
+        pid = os.fork()
+        if pid == 0:
+            data = b"x" * int(memory_mb * 1024 * 1024)
+            os._exit(len(data) == 0)
+        os.waitpid(pid, 0)
+    return execute_job
+
+
+class TestLauncher(unittest.TestCase):
+
+    def setUp(self):
+        self.queue = FakeQueue()
+        self.launcher = Launcher(queue=self.queue, max_jobs=3, min_workers=1,
+                                 worker_target=fake_worker)
+
+    def tearDown(self):
+        for worker in self.launcher.job_array:
+            worker.join()
+
+    def test_launcher_keeps_min_workers_without_queued_jobs(self):
+        self.launcher.scale()
+        assert len(self.launcher.job_array) == 1
+        self.launcher.scale()
+        assert len(self.launcher.job_array) == 1
+
+    def test_launcher_scales_on_queue_depth(self):
+        self.launcher.scale()
+        self.launcher.busy_workers.value = 1
+        self.queue.jobs = [FakeJob(), FakeJob()]
+        assert self.launcher.workers_to_start() == 2
+        self.queue.jobs = [FakeJob() for _ in range(5)]
+        assert self.launcher.workers_to_start() == 2
+
+    def test_idle_workers_pick_up_queued_jobs(self):
+        self.launcher.scale()
+        self.queue.jobs = [FakeJob()]
+        assert self.launcher.workers_to_start() == 0
+
+    def test_launcher_scales_on_waiting_time(self):
+        self.launcher.scale()
+        self.queue.jobs = [FakeJob(waiting_seconds=10)]
+        assert self.launcher.workers_to_start() == 1
+
+    def test_stopped_workers_are_replaced(self):
+        self.launcher.scale()
+        stopped_worker = self.launcher.job_array[0]
+        stopped_worker.join()
+        self.launcher.scale()
+        assert len(self.launcher.job_array) == 1
+        assert self.launcher.job_array[0] is not stopped_worker
+
+
+class TestRecyclingWorker(unittest.TestCase):
+
+    def setUp(self):
+        self.worker = RecyclingWorker(['d3a'], connection=MagicMock(), max_memory_mb=100)
+
+    def test_worker_is_recycled_after_a_memory_hungry_job(self):
+        # Work horses start with the memory of the worker, the limit has to be above the
+        # memory of the test process and of the processes it has already forked
+        max_memory_mb = max(RecyclingWorker.memory_usage_mb(),
+                            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024) + 100
+        worker = RecyclingWorker(['d3a'], connection=MagicMock(), max_memory_mb=max_memory_mb)
+
+        with patch.object(Worker, "execute_job", memory_hungry_job(10)):
+            worker.execute_job(FakeJob(), FakeQueue())
+        assert not worker._stop_requested
+
+        with patch.object(Worker, "execute_job",
+                          memory_hungry_job(max_memory_mb - resident_memory_mb() + 50)):
+            worker.execute_job(FakeJob(), FakeQueue())
+        assert worker._stop_requested
+
+    @patch.object(RecyclingWorker, "memory_usage_mb", MagicMock(return_value=50))
+    def test_worker_below_max_memory_is_not_recycled(self):
+        assert not self.worker.exceeds_max_memory()
+
+    @patch.object(RecyclingWorker, "memory_usage_mb", MagicMock(return_value=150))
+    def test_worker_above_max_memory_is_recycled(self):
+        assert self.worker.exceeds_max_memory()
@@ -168,3 +168,41 @@ class TestLiveEvents(unittest.TestCase):
             987 * self.config.slot_length.total_minutes() / 60.0
         assert self.area_house1.export_capacity_kWh == \
             765 * self.config.slot_length.total_minutes() / 60.0
+
+    def test_created_and_deleted_areas_are_updated_in_the_registry(self):
+        self.area_grid.activate()
+        self.live_events.add_event({
+            "eventType": "create_area",
+            "parent_uuid": self.area_house2.uuid,
+            "area_representation": {
+                "type": "LoadHours", "name": "new_load", "avg_power_W": 234}
+        })
+        self.live_events.handle_all_events(self.area_grid)
+
+        new_load = self.area_grid.registry.get_by_name("new_load")
+        assert new_load in self.area_house2.children
+        assert self.area_grid.registry.get_by_uuid(new_load.uuid) is new_load
+
+        self.live_events.add_event({"eventType": "update_area", "area_uuid": new_load.uuid,
+                                    "area_representation": {"avg_power_W": 345}})
+        self.live_events.add_event({"eventType": "delete_area", "area_uuid": self.area1.uuid})
+        self.live_events.handle_all_events(self.area_grid)
+
+        assert new_load.strategy.avg_power_W == 345
+        assert self.area_grid.registry.get_by_uuid(self.area1.uuid) is None
+        assert self.area_grid.registry.get_by_name("load") is None
+
+        self.live_events.add_event({"eventType": "delete_area", "area_uuid": new_load.uuid})
+        self.live_events.handle_all_events(self.area_grid)
+        assert self.area_house2.children == [self.area3]
+        assert self.area_grid.registry.get_by_name("new_load") is None
+
+    def test_create_area_event_with_duplicate_name_is_not_applied(self):
+        self.live_events.add_event({
+            "eventType": "create_area",
+            "parent_uuid": self.area_house2.uuid,
+            "area_representation": {"type": "LoadHours", "name": "load", "avg_power_W": 234}
+        })
+        self.live_events.handle_all_events(self.area_grid)
+        assert self.area_house2.children == [self.area3]
+        assert self.area_grid.registry.get_by_name("load") is self.area1
@@ -0,0 +1,66 @@
+"""
+Copyright 2018 Grid Singularity
+This file is part of D3A.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+from unittest.mock import patch
+
+import pytest
+from pendulum import duration, today
+
+from d3a.constants import TIME_ZONE
+from d3a.models.strategy.load_hours import LoadHoursPopulation, LoadHoursStrategy
+from conftest import past_trades, run_simulation
+
+
+@pytest.mark.usefixtures("simulation_settings")
+def test_population_results_in_identical_trades():
+    with patch.object(LoadHoursPopulation, "most_affordable_offers", autospec=True,
+                      side_effect=LoadHoursPopulation.most_affordable_offers) as shared:
+        population_trades = past_trades(
+            run_simulation("default_2", duration(hours=14), duration(seconds=90)))
+    assert shared.call_count > 0
+
+    with patch.object(LoadHoursPopulation, "join", lambda strategy: None):
+        individual_trades = past_trades(
+            run_simulation("default_2", duration(hours=14), duration(seconds=90)))
+    assert any(buyer.endswith(("Load", "Lighting", "TV"))
+               for _, _, _, buyer, _, _ in individual_trades)
+    assert population_trades == individual_trades
+
+
+def test_loads_of_an_area_join_one_population():
+    from d3a.models.area import Area
+    loads = [Area(name=f"Load {i}", strategy=LoadHoursStrategy(avg_power_W=100))
+             for i in range(2)]
+    house = Area(name="House", children=loads)
+    for load in loads:
+        load.strategy.area = house
+        LoadHoursPopulation.join(load.strategy)
+    assert loads[0].strategy._population is not None
+    assert loads[0].strategy._population is loads[1].strategy._population
+
+
+def test_population_shares_affordable_offers_until_offers_change():
+    from d3a.models.market.one_sided import OneSidedMarket
+    market = OneSidedMarket(time_slot=today(tz=TIME_ZONE))
+    market.offer(10, 1, "PV", "PV")
+    population = LoadHoursPopulation(area=None)
+
+    offers = population.most_affordable_offers(market)
+    assert population.most_affordable_offers(market) is offers
+    market.offer(5, 1, "PV", "PV")
+    assert population.most_affordable_offers(market) == market.most_affordable_offers
+    assert population.most_affordable_offers(market)[0].price == 5
@@ -17,6 +17,7 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 import string
 from math import isclose
+from unittest.mock import patch
 from copy import deepcopy
 import pytest
 from pendulum import DateTime, now
@@ -41,6 +42,7 @@ from d3a.d3a_core.util import add_or_create_key, subtract_or_create_key
 from d3a.models.market import TransferFees
 
 from d3a.d3a_core.device_registry import DeviceRegistry
+from d3a.d3a_core.ids import IdGenerator, get_id_generator, set_id_generator
 device_registry_dict = {
     "A": {"balancing rates": (33, 35)},
     "someone": {"balancing rates": (33, 35)},
@@ -50,6 +52,14 @@ device_registry_dict = {
 transfer_fees = TransferFees(grid_fee_percentage=0, transfer_fee_const=0)
 
 
+@pytest.fixture
+def uuid_ids():
+    id_generator = get_id_generator()
+    set_id_generator(IdGenerator("uuid"))
+    yield
+    set_id_generator(id_generator)
+
+
 class FakeTwoSidedPayAsBid(TwoSidedPayAsBid):
     def __init__(self, bids=[], m_id=123, time_slot=now()):
         super().__init__(transfer_fees=transfer_fees, time_slot=time_slot)
@@ -156,6 +166,7 @@ def test_device_registry(market=BalancingMarket()):
     (OneSidedMarket(time_slot=now()), "offer"),
     (BalancingMarket(time_slot=now()), "balancing_offer")
 ])
+@pytest.mark.usefixtures("uuid_ids")
 def test_market_offer(market, offer):
     DeviceRegistry.REGISTRY = device_registry_dict
     ConstSettings.BalancingSettings.ENABLE_BALANCING_MARKET = True
@@ -167,6 +178,7 @@ def test_market_offer(market, offer):
     assert len(e_offer.id) == 36
 
 
+@pytest.mark.usefixtures("uuid_ids")
 def test_market_bid(market: TwoSidedPayAsBid):
     bid = market.bid(1, 2, 'bidder', 'seller', 'bidder')
     assert market.bids[bid.id] == bid
@@ -299,6 +311,25 @@ def test_balancing_market_negative_offer_trade(market=BalancingMarket(time_slot=
     assert trade.buyer == 'B'
 
 
+def test_balancing_market_offer_books():
+    market = BalancingMarket(time_slot=now())
+    expensive = market.balancing_offer(30, 10, 'A', from_agent=True)
+    cheap = market.balancing_offer(10, 10, 'A', from_agent=True)
+    deleted = market.balancing_offer(5, 10, 'A', from_agent=True)
+    demand = market.balancing_offer(20, -10, 'A', from_agent=True)
+    market.delete_balancing_offer(deleted)
+
+    assert list(market.cheapest_balancing_offers(True)) == [cheap, expensive]
+    assert list(market.cheapest_balancing_offers(False)) == [demand]
+
+    offers = market.cheapest_balancing_offers(True)
+    market.accept_offer(next(offers), 'B', energy=4)
+    offers.close()
+    residual = list(market.cheapest_balancing_offers(True))
+    assert len(residual) == 2
+    assert residual[0].energy == 6 and residual[1] is expensive
+
+
 def test_market_bid_trade(market=TwoSidedPayAsBid(time_slot=now())):
     bid = market.bid(20, 10, 'A', 'B', 'A', original_bid_price=20)
 
@@ -364,8 +395,6 @@ def test_market_trade_bid_not_found(market=TwoSidedPayAsBid(time_slot=now())):
 
 
 @pytest.mark.parametrize("market, offer, accept_offer", [
-    (OneSidedMarket(time_slot=now()),
-     "offer", "accept_offer"),
     (BalancingMarket(time_slot=now()),
      "balancing_offer", "accept_offer")
 ])
@@ -391,6 +420,74 @@ def test_market_trade_partial(market, offer, accept_offer):
     assert new_offer.id != e_offer.id
 
 
+def test_market_trade_partial_fills_offer_in_place(called, market=OneSidedMarket(time_slot=now())):
+    market.add_listener(called)
+    e_offer = market.offer(20, 20, 'A', 'A')
+
+    trade = market.accept_offer(offer_or_id=e_offer, buyer='B', energy=5)
+    assert trade.offer is not e_offer
+    assert trade.offer.id == e_offer.id
+    assert trade.offer.energy == 5
+    assert trade.offer.price == 5
+    assert trade.residual is e_offer
+    assert trade.filled_in_place
+    assert list(market.offers.values()) == [e_offer]
+    assert e_offer.energy == 15
+    assert e_offer.price == 15
+    # The history keeps the offer as it was posted
+    assert len(market.offer_history) == 1
+    assert market.offer_history[0] is not e_offer
+    assert market.offer_history[0].energy == 20
+    assert market.offer_history[0].price == 20
+    # Neither a residual offer nor an OFFER_SPLIT event is created
+    assert [c[0] for c in called.calls] == \
+        [(repr(MarketEvent.OFFER), ), (repr(MarketEvent.TRADE), )]
+
+    trade = market.accept_offer(offer_or_id=e_offer, buyer='B', energy=15)
+    assert trade.offer.id == e_offer.id
+    assert trade.residual is None
+    assert len(market.offers) == 0
+    assert market.offer_history[0].energy == 20
+
+
+class TradePriceError(Exception):
+    pass
+
+
+def test_market_failed_partial_trade_keeps_offer(market=TwoSidedPayAsBid(time_slot=now())):
+    e_offer = market.offer(20, 20, 'A', 'A')
+
+    with patch.object(market, "determine_offer_price", side_effect=TradePriceError):
+        with pytest.raises(TradePriceError):
+            market.accept_offer(offer_or_id=e_offer, buyer='B', energy=5)
+    assert list(market.offers.values()) == [e_offer]
+    assert e_offer.energy == 20
+    assert e_offer.price == 20
+    assert len(market.trades) == 0
+
+
+def test_market_reduce_offer(called, market=OneSidedMarket(time_slot=now())):
+    market.add_listener(called)
+    e_offer = market.offer(20, 20, 'A', 'A', original_offer_price=10)
+
+    with pytest.raises(InvalidOffer):
+        market.reduce_offer(e_offer, 25)
+    reduced_offer = market.reduce_offer(e_offer, 5)
+    assert reduced_offer is e_offer
+    assert e_offer.energy == 5
+    assert e_offer.price == 5
+    assert e_offer.original_offer_price == 2.5
+    assert called.calls[1][0] == (repr(MarketEvent.OFFER_CHANGED), )
+    assert called.calls[1][1] == {'offer': repr(e_offer), 'market_id': repr(market.id)}
+    assert market.offer_history[0].energy == 20
+
+    assert market.reduce_offer(e_offer.id, 0) is None
+    assert len(market.offers) == 0
+    assert called.calls[2][0] == (repr(MarketEvent.OFFER_DELETED), )
+    with pytest.raises(OfferNotFoundException):
+        market.reduce_offer(e_offer, 1)
+
+
 def test_market_trade_bid_partial(market=TwoSidedPayAsBid(time_slot=now())):
     bid = market.bid(20, 20, 'A', 'B', 'A', original_bid_price=20)
 
@@ -405,6 +502,7 @@ def test_market_trade_bid_partial(market=TwoSidedPayAsBid(time_slot=now())):
     assert trade.seller == 'B'
     assert trade.buyer == 'A'
     assert trade.residual
+    assert trade.residual.id == bid.id
     assert len(market.bids) == 1
     assert trade.residual.id in market.bids
     assert market.bids[trade.residual.id].energy == 15
@@ -413,19 +511,108 @@ def test_market_trade_bid_partial(market=TwoSidedPayAsBid(time_slot=now())):
     assert market.bids[trade.residual.id].buyer == 'A'
 
 
-def test_market_accept_bid_emits_bid_split_on_partial_bid(
+def test_market_accept_bid_fills_partial_bid_in_place(
         called, market=TwoSidedPayAsBid(time_slot=now())):
     market.add_listener(called)
     bid = market.bid(20, 20, 'A', 'B', 'A')
     trade = market.accept_bid(bid, energy=1, trade_offer_info=[1, 1, 1, 1, 1])
-    assert all([ev != repr(MarketEvent.BID_DELETED) for c in called.calls for ev in c[0]])
-    assert len(called.calls) == 2
-    assert called.calls[0][0] == (repr(MarketEvent.BID_SPLIT),)
-    assert called.calls[1][0] == (repr(MarketEvent.BID_TRADED),)
-    assert called.calls[1][1] == {
+    assert len(called.calls) == 1
+    assert called.calls[0][0] == (repr(MarketEvent.BID_TRADED),)
+    assert called.calls[0][1] == {
         'market_id': repr(market.id),
         'bid_trade': repr(trade),
     }
+    assert trade.filled_in_place
+    assert list(market.bids.values()) == [trade.residual]
+    assert trade.residual.energy == 19
+    assert market.bid_history == [bid]
+
+
+def test_market_failed_partial_bid_trade_keeps_bid(market=TwoSidedPayAsBid(time_slot=now())):
+    bid = market.bid(20, 20, 'A', 'B', 'A')
+
+    with patch.object(market, "determine_bid_price", side_effect=TradePriceError):
+        with pytest.raises(TradePriceError):
+            market.accept_bid(bid, energy=5, trade_offer_info=[1, 1, 1, 1, 1])
+    assert list(market.bids.values()) == [bid]
+    assert len(market.trades) == 0
+
+
+def test_market_reduce_bid(called, market=TwoSidedPayAsBid(time_slot=now())):
+    market.add_listener(called)
+    bid = market.bid(20, 20, 'A', 'B', 'A', original_bid_price=10)
+
+    with pytest.raises(InvalidBid):
+        market.reduce_bid(bid, 25)
+    reduced_bid = market.reduce_bid(bid, 5)
+    assert reduced_bid.id == bid.id
+    assert market.bids[bid.id] == reduced_bid
+    assert reduced_bid.energy == 5
+    assert reduced_bid.price == 5
+    assert reduced_bid.original_bid_price == 2.5
+    assert called.calls[0][0] == (repr(MarketEvent.BID_CHANGED), )
+    assert called.calls[0][1] == {'bid': repr(reduced_bid), 'market_id': repr(market.id)}
+
+    assert market.reduce_bid(bid.id, 0) is None
+    assert len(market.bids) == 0
+    assert called.calls[1][0] == (repr(MarketEvent.BID_DELETED), )
+    with pytest.raises(BidNotFound):
+        market.reduce_bid(bid, 1)
+
+
+@pytest.mark.parametrize("market, order, order_args, reduce_order", [
+    (OneSidedMarket(time_slot=now()), "offer", (20, 20, 'A', 'A'), "reduce_offer"),
+    (TwoSidedPayAsBid(time_slot=now()), "bid", (20, 20, 'A', 'B', 'A'), "reduce_bid")
+])
+def test_market_reduce_readonly(market, order, order_args, reduce_order):
+    e_order = getattr(market, order)(*order_args)
+    market.readonly = True
+    with pytest.raises(MarketReadOnlyException):
+        getattr(market, reduce_order)(e_order, 5)
+    assert e_order.energy == 20
+
+
+def test_market_trade_partial_standing_offer(called, market=OneSidedMarket(time_slot=now())):
+    market.add_listener(called)
+    standing_offer = market.offer(20, 20, 'A', 'A', standing=True)
+
+    for _ in range(2):
+        trade = market.accept_offer(standing_offer, 'B', energy=5)
+        assert trade.offer.id == standing_offer.id
+        assert trade.offer.energy == 5
+        assert trade.offer.price == 5
+        assert trade.residual is None
+    assert list(market.offers.values()) == [standing_offer]
+    assert market.offers[standing_offer.id].energy == 20
+    assert [c[0] for c in called.calls] == [(repr(MarketEvent.OFFER), )] + \
+        [(repr(MarketEvent.TRADE), )] * 2
+
+
+def test_market_trade_partial_standing_bid(called, market=TwoSidedPayAsBid(time_slot=now())):
+    market.add_listener(called)
+    standing_bid = market.bid(20, 20, 'A', 'B', 'A', standing=True)
+
+    for _ in range(2):
+        trade = market.accept_bid(standing_bid, energy=5, seller='B',
+                                  trade_offer_info=[1, 1, 1, 1, 1])
+        assert trade.offer.id == standing_bid.id
+        assert trade.offer.energy == 5
+        assert trade.residual is None
+    assert list(market.bids.values()) == [standing_bid]
+    assert [c[0] for c in called.calls] == [(repr(MarketEvent.BID_TRADED), )] * 2
+
+
+def test_double_sided_pay_as_bid_market_fills_standing_offer(market):
+    standing_offer = market.offer(100, 100, 'A', 'A', standing=True)
+    for buyer in ('B', 'C'):
+        market.bid(2, 1, buyer, buyer, buyer)
+    market.bid(100, 100, 'D', 'D', 'D', standing=True)
+
+    market.match_offers_bids()
+    assert sorted(t.buyer for t in market.trades) == ['B', 'C']
+    assert all(t.offer.id == standing_offer.id for t in market.trades)
+    assert list(market.offers.values()) == [standing_offer]
+    assert len(market.bids) == 1
 
 
 @pytest.mark.parametrize('market_method', ('_update_accumulated_trade_price_energy',
@@ -492,6 +679,23 @@ def test_market_acct_multiple(market=OneSidedMarket(time_slot=now())):
     assert market.bought_energy('C') == offer2.energy == 10
 
 
+def test_market_trades_of_participant(market=OneSidedMarket(time_slot=now())):
+    offer1 = market.offer(10, 20, 'A', 'A')
+    offer2 = market.offer(10, 10, 'C', 'C')
+    offer3 = market.offer(5, 5, 'A', 'A')
+    trade1 = market.accept_offer(offer1, 'B')
+    trade2 = market.accept_offer(offer2, 'A')
+    trade3 = market.accept_offer(offer3, 'C')
+
+    assert market.trades_of('A') == [trade1, trade2, trade3]
+    assert market.trades_of('B') == [trade1]
+    assert market.trades_of('C') == [trade2, trade3]
+    assert market.trades_of('D') == []
+    assert market.total_spent('A') == offer2.price == 10
+    assert market.total_earned('A') == offer1.price + offer3.price == 15
+    assert market.total_earned('B') == 0
+
+
 @pytest.mark.parametrize("market, offer", [
     (OneSidedMarket(time_slot=now()), "offer"),
     (BalancingMarket(time_slot=now()), "balancing_offer")
@@ -579,8 +783,6 @@ def test_market_listeners_offer(market, offer, add_listener, event, called):
 
 
 @pytest.mark.parametrize("market, offer, accept_offer, add_listener, event", [
-    (OneSidedMarket(time_slot=now()), "offer", "accept_offer", "add_listener",
-     MarketEvent.OFFER_SPLIT),
     (BalancingMarket(time_slot=now()), "balancing_offer", "accept_offer", "add_listener",
      MarketEvent.BALANCING_OFFER_SPLIT)
 ])
@@ -746,6 +948,43 @@ def test_double_sided_pay_as_bid_market_match_offer_bids(pab_market):
     assert bid.price == source_bid.price
 
 
+def test_double_sided_pay_as_bid_market_skips_matching_of_unchanged_book(market):
+    market.offer(20, 1, 'seller', 'seller')
+    market.bid(10, 1, 'buyer', 'buyer', 'buyer')
+    with patch.object(market, "_perform_pay_as_bid_matching",
+                      wraps=market._perform_pay_as_bid_matching) as matching:
+        market.match_offers_bids()
+        market.match_offers_bids()
+        assert matching.call_count == 1
+
+        market.bid(25, 1, 'buyer', 'buyer', 'buyer')
+        market.match_offers_bids()
+        assert len(market.trades) == 1
+        market.match_offers_bids()
+        assert matching.call_count == 3
+
+
+def test_double_sided_pay_as_clear_market_reuses_clearing_state_of_unchanged_book(pac_market):
+    ConstSettings.IAASettings.PAY_AS_CLEAR_AGGREGATION_ALGORITHM = 1
+    pac_market.mcp_update_point = 1
+    pac_market.offer(20, 1, 'seller', 'seller')
+    pac_market.bid(10, 1, 'buyer', 'buyer', 'buyer')
+    with patch.object(pac_market, "_perform_pay_as_clear_matching",
+                      wraps=pac_market._perform_pay_as_clear_matching) as matching:
+        pac_market.match_offers_bids()
+        first_clearing_time = pac_market.now
+        pac_market.update_clock(1)
+        pac_market.match_offers_bids()
+        assert matching.call_count == 1
+        assert pac_market.state.cumulative_bids[pac_market.now] == \
+            pac_market.state.cumulative_bids[first_clearing_time]
+
+        pac_market.bid(25, 1, 'buyer', 'buyer', 'buyer')
+        pac_market.match_offers_bids()
+        assert matching.call_count == 2
+        assert len(pac_market.trades) == 1
+
+
 class MarketStateMachine(RuleBasedStateMachine):
     offers = Bundle('Offers')
     actors = Bundle('Actors')
@@ -0,0 +1,90 @@
+"""
+Copyright 2018 Grid Singularity
+This file is part of D3A.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import unittest
+from collections import defaultdict
+
+import pytest
+from pendulum import duration
+
+import d3a.constants
+from d3a.d3a_core.area_registry import iterate_area_tree
+from d3a.d3a_core.util import make_iaa_name
+from d3a_interface.constants_limits import ConstSettings
+from conftest import run_simulation
+
+
+def _run_simulation(setup_module_name):
+    return run_simulation(setup_module_name, duration(hours=14), duration(seconds=60))
+
+
+def _accounting(simulation):
+    """
+    Energy and price traded by the devices and energy traded by the agents in every time slot,
+    and the grid fees of every market
+    """
+    areas = list(iterate_area_tree(simulation.area))
+    iaa_names = {make_iaa_name(area) for area in areas}
+    device_energy = defaultdict(float)
+    device_price = defaultdict(float)
+    agent_energy = defaultdict(float)
+    fees = {}
+    for area in areas:
+        for market in area.past_markets:
+            fees[(area.name, market.time_slot)] = round(market.market_fee, 8)
+            for trade in market.trades:
+                for name, sign in ((trade.seller, 1), (trade.buyer, -1)):
+                    key = (name, market.time_slot)
+                    if name in iaa_names:
+                        agent_energy[key] += sign * trade.offer.energy
+                    else:
+                        device_energy[key] += sign * trade.offer.energy
+                        device_price[key] += sign * trade.offer.price
+    return ({key: (round(energy, 8), round(device_price[key], 8))
+             for key, energy in device_energy.items()},
+            {key: round(energy, 8) for key, energy in agent_energy.items()},
+            fees)
+
+
+def _posted_orders(simulation):
+    return sum(len(market.offer_history) + len(market.bid_history)
+               for area in iterate_area_tree(simulation.area) for market in area.past_markets)
+
+
+@pytest.mark.usefixtures("simulation_settings")
+class TestPathCompressedMatching(unittest.TestCase):
+
+    def setUp(self):
+        ConstSettings.IAASettings.MARKET_TYPE = 2
+
+    def tearDown(self):
+        d3a.constants.PATH_COMPRESSED_MATCHING = False
+
+    def test_path_compressed_matching_results_in_identical_accounting(self):
+        reference = _run_simulation("grid_fees.constant_grid_fees")
+        path_compressed = _run_simulation("two_sided_market.path_compressed_grid_fees")
+        reference_devices, _, reference_fees = _accounting(reference)
+        devices, agents, fees = _accounting(path_compressed)
+
+        assert len(reference_devices) > 0
+        assert devices == reference_devices
+        assert fees == reference_fees
+        # The agents buy and sell the same energy in every time slot
+        assert len(agents) > 0
+        assert all(energy == 0 for energy in agents.values())
+        # Only the traded energy of the orders is forwarded
+        assert _posted_orders(path_compressed) < _posted_orders(reference)
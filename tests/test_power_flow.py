@@ -0,0 +1,167 @@
+"""
+Copyright 2018 Grid Singularity
+This file is part of D3A.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import pytest
+from pendulum import duration, today
+
+import d3a.constants
+import d3a.models.power_flow.pandapower as pandapower_flow
+from d3a.constants import TIME_ZONE
+from d3a.models.area import Area
+from d3a.models.market.one_sided import OneSidedMarket
+from d3a.models.power_flow import PowerFlowBase
+from d3a.models.power_flow.time_series import PowerFlowWorker
+from d3a.models.strategy.infinite_bus import InfiniteBusStrategy
+from d3a.models.strategy.load_hours import LoadHoursStrategy
+from d3a.models.strategy.pv import PVStrategy
+from d3a_interface.constants_limits import GlobalConfig
+from conftest import run_simulation
+
+
+class FakePowerFlow(PowerFlowBase):
+    def __init__(self, root_area):
+        self.injections = []
+        self.elements = []
+        super().__init__(root_area, 400)
+
+    def _add_element(self, area):
+        self.elements.append(area.name)
+        return len(self.elements) - 1
+
+    def create_bus(self, area, voltage):
+        return self._add_element(area)
+
+    def add_external_grid(self, area):
+        return self._add_element(area)
+
+    def add_load_device(self, area, avg_power_w):
+        return self._add_element(area)
+
+    def add_generation_device(self, area, peak_power_kw):
+        return self._add_element(area)
+
+    def add_storage_device(self, area):
+        return self._add_element(area)
+
+    def add_line(self, source_area, target_area):
+        return self._add_element(target_area)
+
+    def run_power_flow(self):
+        pass
+
+    def update_injections(self, injections_kW):
+        self.injections.append(injections_kW)
+
+    def run_time_series_power_flow(self):
+        return {"bus_vm_pu": {"House": 1 + sum(self.injections[-1].values()) / 1000},
+                "line_loading_percent": {}}
+
+    def export_power_flow_results(self, directory):
+        pass
+
+
+@pytest.fixture
+def grid():
+    house = Area("House", [Area("Load", strategy=LoadHoursStrategy(avg_power_W=200)),
+                           Area("PV", strategy=PVStrategy(max_panel_power_W=160))])
+    return Area("Grid", [house, Area("DSO", strategy=InfiniteBusStrategy(
+        energy_buy_rate=10, energy_sell_rate=30))])
+
+
+def test_network_is_built_once_with_the_device_areas(grid):
+    power_flow = FakePowerFlow(grid)
+    assert [area.name for area in power_flow.device_areas] == ["Load", "PV"]
+    assert power_flow.elements.count("House") == 2
+
+
+def test_slot_injections_are_derived_from_the_traded_energy(grid):
+    power_flow = FakePowerFlow(grid)
+    house = grid.children[0]
+    assert power_flow.slot_injections_kW(duration(minutes=15)) == {}
+
+    time_slot = today(tz=TIME_ZONE)
+    market = OneSidedMarket(time_slot=time_slot)
+    market.accept_offer(market.offer(10, 0.5, "PV", "PV"), "Load")
+    house._markets.markets[time_slot] = market
+
+    assert power_flow.slot_injections_kW(duration(minutes=15)) == \
+        {"Load": pytest.approx(-2), "PV": pytest.approx(2)}
+
+
+def test_worker_runs_the_slots_in_order(grid):
+    power_flow = FakePowerFlow(grid)
+    worker = PowerFlowWorker(power_flow)
+    time_slots = [today(tz=TIME_ZONE).add(minutes=15 * i) for i in range(10)]
+    for i, time_slot in enumerate(time_slots):
+        worker.submit_slot(time_slot, {"PV": i, "Load": 0})
+    worker.shutdown()
+
+    assert list(power_flow.time_series_results.keys()) == time_slots
+    assert power_flow.injections == [{"PV": i, "Load": 0} for i in range(10)]
+    assert power_flow.time_series_results[time_slots[-1]]["bus_vm_pu"]["House"] == 1.009
+
+
+@pytest.fixture
+def pandapower(monkeypatch):
+    pp = pytest.importorskip("pandapower")
+    # The power flow module only imports pandapower if the power flow was enabled before
+    monkeypatch.setattr(pandapower_flow, "pp", pp, raising=False)
+    return pp
+
+
+def test_pandapower_time_series_updates_the_network_of_the_previous_slot(
+        grid, pandapower, monkeypatch):
+    power_flow = pandapower_flow.PandaPowerFlow(grid)
+    run_inits = []
+    run_power_flow = pandapower.runpp
+
+    def runpp(network, init="auto", **kwargs):
+        run_inits.append(init)
+        return run_power_flow(network, init=init, **kwargs)
+    monkeypatch.setattr(pandapower, "runpp", runpp)
+
+    time_slots = [today(tz=TIME_ZONE), today(tz=TIME_ZONE).add(minutes=15)]
+    power_flow.run_time_series_step(time_slots[0], {"Load": -2, "PV": 1})
+    network = power_flow.network
+    assert network.load.at[0, "p_mw"] == pytest.approx(0.002)
+    assert network.gen.at[0, "p_mw"] == pytest.approx(0.001)
+
+    power_flow.run_time_series_step(time_slots[1], {"Load": -1, "PV": 4})
+    assert power_flow.network is network
+    assert len(network.load) == len(network.gen) == 1
+    assert network.load.at[0, "p_mw"] == pytest.approx(0.001)
+    assert network.gen.at[0, "p_mw"] == pytest.approx(0.004)
+    # The second slot starts from the results of the first one
+    assert run_inits == ["auto", "results"]
+
+    results = power_flow.time_series_results
+    assert list(results.keys()) == time_slots
+    assert results[time_slots[0]]["line_loading_percent"]["Grid->House"] < \
+        results[time_slots[1]]["line_loading_percent"]["Grid->House"]
+
+
+@pytest.mark.usefixtures("simulation_settings", "pandapower")
+def test_time_series_power_flow_runs_for_every_slot(monkeypatch):
+    monkeypatch.setattr(d3a.constants, "POWER_FLOW_TIME_SERIES", True)
+    monkeypatch.setattr(GlobalConfig, "POWER_FLOW", True)
+    simulation = run_simulation("power_flow.test_power_flow", duration(hours=1),
+                                duration(seconds=60), today(tz=TIME_ZONE).add(hours=12))
+
+    results = simulation.power_flow.time_series_results
+    assert len(results) == 4
+    assert all(result is not None and len(result["bus_vm_pu"]) > 0
+               for result in results.values())
@@ -0,0 +1,87 @@
+"""
+Copyright 2018 Grid Singularity
+This file is part of D3A.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import json
+import pickle
+from zlib import compress
+
+import pytest
+
+from d3a.d3a_core.area_serializer import area_from_dict, area_from_payload
+from d3a.d3a_core.exceptions import D3AException
+from d3a.d3a_core.scenario_payload import pack_scenario, encode_scenario, FileProfileStore, \
+    is_scenario_payload
+
+LOAD_PROFILE = json.dumps({f"{hour:02d}:{minute:02d}": 100 + hour
+                           for hour in range(24) for minute in (0, 15, 30, 45)})
+
+
+def scenario(house_count):
+    return {
+        "name": "Grid",
+        "children": [
+            {"name": f"House {i}", "children": [
+                {"name": f"H{i} Load", "type": "LoadProfile",
+                 "daily_load_profile": LOAD_PROFILE, "final_buying_rate": 35},
+                {"name": f"H{i} PV", "type": "PV", "panel_count": 2}
+            ]} for i in range(house_count)
+        ]
+    }
+
+
+def test_identical_profiles_are_stored_once():
+    payload = pack_scenario(scenario(50))
+    assert is_scenario_payload(payload)
+    assert len(payload["profiles"]) == 1
+    load = payload["area"]["children"][3]["children"][0]
+    assert load["daily_load_profile"] == {"__profile__": list(payload["profiles"])[0]}
+    assert load["final_buying_rate"] == 35
+
+
+def test_payload_size_scales_with_unique_profiles():
+    # A week of 5 minute values, larger than the window of zlib
+    week_profile = json.dumps({f"2020-01-0{day + 1}T{minute // 60:02d}:{minute % 60:02d}":
+                               round(100 + day + minute / 7, 2)
+                               for day in range(7) for minute in range(0, 1440, 5)})
+    # Decoded json scenarios contain a separate copy of the profile for every device
+    area = json.loads(json.dumps(scenario(20)).replace(json.dumps(LOAD_PROFILE),
+                                                       json.dumps(week_profile)))
+    plain_size = len(compress(pickle.dumps(area)))
+    payload_size = len(encode_scenario(area))
+    assert payload_size < plain_size / 10
+    assert payload_size < 2 * len(compress(week_profile.encode()))
+
+
+def test_area_from_payload_resolves_profiles():
+    area = area_from_payload(pack_scenario(scenario(3)))
+    reference = area_from_dict(scenario(3))
+    for house, reference_house in zip(area.children, reference.children):
+        load, pv = house.children
+        reference_load, _ = reference_house.children
+        assert load.strategy.daily_load_profile == reference_load.strategy.daily_load_profile
+        assert pv.strategy.panel_count == 2
+
+
+def test_profiles_can_be_fetched_from_a_profile_store(tmpdir):
+    profile_store = FileProfileStore(str(tmpdir))
+    payload = pack_scenario(scenario(3), profile_store)
+    assert payload["profiles"] == {}
+    area = area_from_payload(payload, profile_store=profile_store)
+    assert area.children[0].children[0].strategy.daily_load_profile == LOAD_PROFILE
+
+    with pytest.raises(D3AException):
+        area_from_payload(payload)
@@ -0,0 +1,65 @@
+"""
+Copyright 2018 Grid Singularity
+This file is part of D3A.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import unittest
+from unittest.mock import patch
+
+import pytest
+from parameterized import parameterized
+from pendulum import duration
+
+from d3a.d3a_core.area_registry import iterate_area_tree
+from d3a.models.area import Area
+from conftest import create_simulation, past_trades, run_simulation
+
+
+def _run_simulation(setup_module_name, fast_forward):
+    return run_simulation(setup_module_name, duration(hours=24), duration(seconds=60),
+                          fast_forward=fast_forward)
+
+
+def _trades_and_accounting(simulation):
+    accounting = [(area.name, market.time_slot, reporter, round(energy, 8))
+                  for area in iterate_area_tree(simulation.area)
+                  for market in area.past_markets
+                  for reporter, energy in market.actual_energy_agg.items()]
+    return past_trades(simulation), accounting
+
+
+@pytest.mark.usefixtures("simulation_settings")
+class TestSimulationFastForward(unittest.TestCase):
+
+    @parameterized.expand([("default_3_pv_only", ), ("default_2a", ), ("default_3", )])
+    def test_fast_forward_results_in_identical_trades(self, setup_module_name):
+        reference = _trades_and_accounting(_run_simulation(setup_module_name, False))
+        fast_forwarded = _trades_and_accounting(_run_simulation(setup_module_name, True))
+        assert len(reference[0]) > 0
+        assert fast_forwarded == reference
+
+    def test_fast_forward_skips_quiet_ticks(self):
+        with patch.object(Area, "fast_forward_tick", autospec=True,
+                          side_effect=Area.fast_forward_tick) as fast_forward_tick:
+            simulation = _run_simulation("default_3_pv_only", True)
+        assert fast_forward_tick.call_count > 0
+        assert simulation.area.current_tick == simulation.area.config.total_ticks
+
+    def test_fast_forward_is_disabled_by_slowdown(self):
+        simulation = create_simulation("default_3_pv_only", duration(hours=1),
+                                       duration(seconds=60), slowdown=1, fast_forward=True)
+        assert not simulation._is_fast_forward_possible()
+        simulation.slowdown = 0
+        assert simulation._is_fast_forward_possible()
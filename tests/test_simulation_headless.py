@@ -0,0 +1,83 @@
+"""
+Copyright 2018 Grid Singularity
+This file is part of D3A.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import os
+import signal
+import unittest
+from unittest.mock import patch
+
+import pytest
+from pendulum import duration
+
+import d3a.constants
+from d3a.d3a_core.simulation import Simulation
+from d3a.models.area import Area
+from conftest import create_simulation, past_trades
+
+
+def _simulation(headless):
+    return create_simulation("default_2a", duration(hours=24), duration(seconds=60),
+                             headless=headless)
+
+
+@pytest.mark.usefixtures("simulation_settings")
+class TestSimulationHeadless(unittest.TestCase):
+
+    def test_headless_simulation_results_in_identical_trades(self):
+        reference = _simulation(False)
+        reference.run()
+        headless = _simulation(True)
+        headless.run()
+        assert len(past_trades(reference)) > 0
+        assert past_trades(headless) == past_trades(reference)
+        assert headless.area.current_tick == headless.area.config.total_ticks
+
+    @patch.object(d3a.constants, "HEADLESS_PROGRESS_INTERVAL", 3600)
+    def test_headless_progress_logs_are_rate_limited(self):
+        simulation = _simulation(True)
+        with patch.object(Simulation, "_update_progress_info", autospec=True,
+                          side_effect=Simulation._update_progress_info) as update_progress, \
+                patch("d3a.d3a_core.simulation.log") as log_mock:
+            simulation.run()
+        progress_logs = [c for c in log_mock.warning.call_args_list
+                         if c[0][0].startswith("Slot %d of %d")]
+        assert len(progress_logs) == 1
+        # The progress info is still updated for every slot and when the simulation finished
+        slot_count = simulation.area.config.sim_duration // simulation.area.config.slot_length
+        assert update_progress.call_count == slot_count + 1
+        assert simulation.progress_info.percentage_completed == 100
+
+    def test_headless_simulation_is_paused_by_signal(self):
+        simulation = _simulation(True)
+        tick_and_dispatch = Area.tick_and_dispatch
+
+        def tick(area):
+            if area is simulation.area and area.current_tick == 5:
+                os.kill(os.getpid(), signal.SIGUSR1)
+            tick_and_dispatch(area)
+
+        def resume(sim, console, tick_start):
+            assert sim.paused
+            sim.paused = False
+
+        with patch.object(Area, "tick_and_dispatch", autospec=True, side_effect=tick), \
+                patch.object(Simulation, "_handle_paused", autospec=True,
+                             side_effect=resume) as handle_paused:
+            simulation.run()
+        assert handle_paused.call_count == 1
+        assert simulation.area.current_tick == simulation.area.config.total_ticks
+        assert signal.getsignal(signal.SIGUSR1) is signal.SIG_DFL
@@ -0,0 +1,66 @@
+"""
+Copyright 2018 Grid Singularity
+This file is part of D3A.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import json
+import subprocess
+import sys
+import textwrap
+
+# Optional subsystems that must only be imported if their feature is used
+OPTIONAL_MODULES = ["plotly", "pandapower", "web3", "solc", "rq", "ptpython"]
+
+CLI_HELP = """
+    from click.testing import CliRunner
+    from d3a.d3a_core.cli import main
+    result = CliRunner().invoke(main, ["run", "--help"])
+    assert result.exit_code == 0, result.output
+"""
+
+SHORT_SIMULATION = """
+    from pendulum import duration, today
+    from d3a.constants import TIME_ZONE
+    from d3a.d3a_core.simulation import Simulation
+    from d3a.models.config import SimulationConfig
+    config = SimulationConfig(sim_duration=duration(hours=1),
+                              slot_length=duration(minutes=15),
+                              tick_length=duration(seconds=60),
+                              market_count=1,
+                              cloud_coverage=0,
+                              start_date=today(tz=TIME_ZONE),
+                              external_connection_enabled=False)
+    Simulation("default_2a", config, seed=0, no_export=True).run()
+"""
+
+
+def imported_optional_modules(code):
+    """
+    Runs code in a fresh interpreter and returns the optional modules that it imported.
+    """
+    code = textwrap.dedent(code) + textwrap.dedent(f"""
+        import json, sys
+        print(json.dumps([m for m in {OPTIONAL_MODULES!r} if m in sys.modules]))
+    """)
+    output = subprocess.check_output([sys.executable, "-c", code])
+    return json.loads(output.decode().strip().splitlines()[-1])
+
+
+def test_cli_help_does_not_import_optional_modules():
+    assert imported_optional_modules(CLI_HELP) == []
+
+
+def test_simulation_without_export_does_not_import_optional_modules():
+    assert imported_optional_modules(SHORT_SIMULATION) == []
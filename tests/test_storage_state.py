@@ -0,0 +1,66 @@
+"""
+Copyright 2018 Grid Singularity
+This file is part of D3A.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+from unittest.mock import patch
+
+import pytest
+from pendulum import duration, today
+
+from d3a.constants import TIME_ZONE
+from d3a.d3a_core.area_registry import iterate_area_tree
+from d3a.models.state import StorageState
+from conftest import past_trades, run_simulation
+
+
+def _trades_and_charge_history(setup_module_name):
+    simulation = run_simulation(setup_module_name, duration(hours=16), duration(seconds=90))
+    charge_history = [(area.name, area.strategy.state.charge_history_kWh)
+                      for area in iterate_area_tree(simulation.area)
+                      if isinstance(getattr(area.strategy, "state", None), StorageState)]
+    return past_trades(simulation), charge_history
+
+
+@pytest.mark.usefixtures("simulation_settings")
+@pytest.mark.parametrize("setup_module_name", ["default_2", "two_sided_market.default_2a"])
+def test_cached_energy_headroom_results_in_identical_decisions(setup_module_name):
+    cached_trades, cached_charge = _trades_and_charge_history(setup_module_name)
+    with patch.object(StorageState, "cache_energy_headroom", False):
+        trades, charge = _trades_and_charge_history(setup_module_name)
+    assert trades and charge
+    assert cached_trades == trades
+    assert cached_charge == charge
+
+
+def test_energy_headroom_is_recalculated_after_state_changes():
+    time_slot = today(tz=TIME_ZONE)
+    state = StorageState(initial_soc=50, capacity=10, max_abs_battery_power_kW=20)
+    state.set_battery_energy_per_slot(duration(minutes=15))
+
+    assert state.clamp_energy_to_sell_kWh([time_slot]) == {time_slot: 4.0}
+    state.offered_sell_kWh[time_slot] += 1
+    assert state.clamp_energy_to_sell_kWh([time_slot]) == {time_slot: 3.0}
+    state.lose(1, 0.1)
+    assert state.clamp_energy_to_sell_kWh([time_slot]) == {time_slot: 2.5}
+
+    state.clamp_energy_to_buy_kWh([time_slot])
+    assert state.energy_to_buy_dict[time_slot] == 5.0
+    state.energy_to_buy_dict[time_slot] = 0
+    state.clamp_energy_to_buy_kWh([time_slot])
+    assert state.energy_to_buy_dict[time_slot] == 5.0
+    state.pledged_buy_kWh[time_slot] += 2
+    state.clamp_energy_to_buy_kWh([time_slot])
+    assert state.energy_to_buy_dict[time_slot] == 3.0
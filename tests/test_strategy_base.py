@@ -95,9 +95,9 @@ class FakeMarket:
                          seller_origin=offer.seller_origin, buyer_origin=buyer_origin)
 
     def bid(self, price, energy, buyer, seller, original_bid_price=None,
-            buyer_origin=None):
+            buyer_origin=None, standing=False):
         return Bid(123, pendulum.now(), price, energy, buyer, seller, original_bid_price,
-                   buyer_origin=buyer_origin)
+                   buyer_origin=buyer_origin, standing=standing)
 
 
 @pytest.fixture
@@ -175,6 +175,18 @@ def test_offers_partial_offer(offer1, offers3):
     assert accepted_offer in offers3.sold_in_market('market')
 
 
+def test_offers_offer_filled_in_place(offer1, offers3):
+    filled_offer = Offer('id', pendulum.now(), 1, 0.6, offer1.seller, 'market')
+    residual_offer = Offer('id', pendulum.now(), 1, 2.4, offer1.seller, 'market')
+    trade = Trade('trade_id', pendulum.now(tz=TIME_ZONE), filled_offer, offer1.seller, 'buyer',
+                  residual_offer)
+    offers3.on_trade('market', trade)
+    assert len(offers3.sold_in_market('market')) == 0
+    assert residual_offer in offers3.open_in_market('market')
+    assert offer1 not in offers3.posted
+    assert offers3.open_offer_energy('market') == 3.4
+
+
 @pytest.fixture
 def offer_to_accept():
     return Offer('new', pendulum.now(), 1.0, 0.5, 'someone')
@@ -287,6 +299,7 @@ def test_bid_traded_moves_bid_from_posted_to_traded(base):
     trade = MagicMock()
     trade.buyer = base.owner.name
     trade.offer = test_bid
+    trade.filled_in_place = False
     market = FakeMarket(raises=False, id=21)
     base.area._market = market
     base._bids[market.id] = [test_bid]
@@ -295,6 +308,21 @@ def test_bid_traded_moves_bid_from_posted_to_traded(base):
     assert base.get_traded_bids_from_market(market) == [test_bid]
 
 
+def test_bid_traded_in_place_keeps_residual_bid_posted(base):
+    ConstSettings.IAASettings.MARKET_TYPE = 2
+    test_bid = Bid("123", pendulum.now(), 12, 23, base.owner.name, 'B')
+    filled_bid = test_bid._replace(energy=3)
+    residual_bid = test_bid._replace(energy=20)
+    market = FakeMarket(raises=False, id=21)
+    base.area._market = market
+    base._bids[market.id] = [test_bid]
+    base.event_bid_traded(market_id=21, bid_trade=Trade(
+        'trade_id', pendulum.now(tz=TIME_ZONE), filled_bid, 'B', base.owner.name,
+        residual_bid))
+    assert base.get_posted_bids(market) == [residual_bid]
+    assert base.get_traded_bids_from_market(market) == [filled_bid]
+
+
 def test_can_offer_be_posted(base):
     base = BaseStrategy()
     base.owner = FakeOwner()
@@ -75,9 +75,9 @@ class FakeMarket:
         self.created_balancing_offers = []
 
     def offer(self, price, energy, seller, original_offer_price=None,
-              seller_origin=None):
+              seller_origin=None, standing=False):
         offer = Offer('id', pendulum.now(), price, energy, seller, original_offer_price,
-                      seller_origin=seller_origin)
+                      seller_origin=seller_origin, standing=standing)
         self.created_offers.append(offer)
         offer.id = 'id'
         return offer
@@ -119,6 +119,7 @@ def testing_offer_is_created_at_first_market_not_on_activate(commercial_test1, a
     commercial_test1.event_market_cycle()
     assert len(area_test1.test_market.created_offers) == 1
     assert area_test1.test_market.created_offers[0].energy == sys.maxsize
+    assert area_test1.test_market.created_offers[0].standing
 
 
 def test_balancing_offers_are_not_sent_to_all_markets_if_device_not_in_registry(
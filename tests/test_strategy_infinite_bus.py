@@ -79,8 +79,8 @@ class FakeMarket:
         return TIME
 
     def offer(self, price, energy, seller, original_offer_price=None,
-              seller_origin=None):
-        offer = Offer('id', pendulum.now(), price, energy, seller)
+              seller_origin=None, standing=False):
+        offer = Offer('id', pendulum.now(), price, energy, seller, standing=standing)
         self.created_offers.append(offer)
         offer.id = 'id'
         return offer
@@ -100,9 +100,9 @@ class FakeMarket:
         return trade
 
     def bid(self, price, energy, buyer, seller, original_bid_price=None,
-            buyer_origin=None):
+            buyer_origin=None, standing=False):
         bid = Bid("bid_id", pendulum.now(), price, energy, buyer,
-                  seller, buyer_origin=buyer_origin)
+                  seller, buyer_origin=buyer_origin, standing=standing)
         return bid
 
 
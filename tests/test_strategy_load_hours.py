@@ -110,10 +110,10 @@ class FakeMarket:
 
     def bid(self, price: float, energy: float, buyer: str,
             seller: str, original_bid_price=None,
-            buyer_origin=None) -> Bid:
+            buyer_origin=None, standing=False) -> Bid:
         bid = Bid(id='bid_id', time=now(), price=price, energy=energy, buyer=buyer,
                   seller=seller, original_bid_price=original_bid_price,
-                  buyer_origin=buyer_origin)
+                  buyer_origin=buyer_origin, standing=standing)
         self.bids[bid.id] = bid
         return bid
 
@@ -366,7 +366,7 @@ def test_event_bid_traded_removes_bid_from_pending_if_energy_req_0(load_hours_st
     bid = list(load_hours_strategy_test5._bids.values())[0][0]
     # Increase energy requirement to cover the energy from the bid + threshold
     load_hours_strategy_test5.energy_requirement_Wh[TIME] = bid.energy * 1000 + 0.000009
-    trade = Trade('idt', None, bid, 'B', load_hours_strategy_test5.owner.name, residual=True)
+    trade = Trade('idt', None, bid, 'B', load_hours_strategy_test5.owner.name)
     load_hours_strategy_test5.event_bid_traded(market_id=trade_market.id, bid_trade=trade)
 
     assert len(load_hours_strategy_test5.remove_bid_from_pending.calls) == 1
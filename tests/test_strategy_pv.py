@@ -106,6 +106,7 @@ class FakeTrade:
     def __init__(self, offer):
         self.offer = offer
         self.seller = "FakeSeller"
+        self.filled_in_place = False
 
     @property
     def buyer(self):
@@ -482,3 +483,52 @@ def test_assert_if_trade_rate_is_lower_than_offer_rate(pv_test11):
 
     with pytest.raises(AssertionError):
         pv_test11.event_trade(market_id=market_id, trade=trade)
+
+
+def test_identical_pvs_share_the_energy_forecast():
+    pvs = [PVStrategy(panel_count=2, max_panel_power_W=160) for _ in range(3)]
+    for pv in pvs:
+        pv.area = pv.owner = FakeArea()
+        pv.event_activate()
+    assert pvs[0].energy_production_forecast_kWh._forecast is \
+        pvs[1].energy_production_forecast_kWh._forecast
+    midnight = pvs[0].area.now.start_of("day")
+    for time_slot, energy in pvs[0].energy_production_forecast_kWh.items():
+        assert energy == 2 * pvs[0].gaussian_energy_forecast_kWh(
+            time_slot.diff(midnight).in_minutes())
+        assert pvs[0].state.available_energy_kWh[time_slot] == energy
+
+    keep_past_markets = ConstSettings.GeneralSettings.KEEP_PAST_MARKETS
+    ConstSettings.GeneralSettings.KEEP_PAST_MARKETS = False
+    pvs[0].state.available_energy_kWh[TIME] = 0
+    try:
+        pvs[0]._delete_past_state()
+    finally:
+        ConstSettings.GeneralSettings.KEEP_PAST_MARKETS = keep_past_markets
+    assert min(pvs[0].energy_production_forecast_kWh) == TIME
+    assert pvs[1].energy_production_forecast_kWh == pvs[2].energy_production_forecast_kWh
+    assert len(pvs[1].energy_production_forecast_kWh) > \
+        len(pvs[0].energy_production_forecast_kWh)
+    assert pvs[1].state.available_energy_kWh[TIME] > 0
+
+
+def test_modified_energy_forecast_is_not_shared():
+    pvs = [PVStrategy(panel_count=2, max_panel_power_W=160) for _ in range(2)]
+    for pv in pvs:
+        pv.area = pv.owner = FakeArea()
+        pv.event_activate()
+    forecast = dict(pvs[1].energy_production_forecast_kWh)
+
+    pvs[0].energy_production_forecast_kWh[TIME] = 100
+    del pvs[0].energy_production_forecast_kWh[TIME.add(minutes=15)]
+    assert pvs[0].energy_production_forecast_kWh[TIME] == 100
+    assert TIME.add(minutes=15) not in pvs[0].energy_production_forecast_kWh
+    assert len(pvs[0].energy_production_forecast_kWh) == len(forecast) - 1
+    assert pvs[1].energy_production_forecast_kWh == forecast
+
+    pvs[0].energy_production_forecast_kWh.delete_slots_before(TIME)
+    assert min(pvs[0].energy_production_forecast_kWh) == TIME
+    third_pv = PVStrategy(panel_count=2, max_panel_power_W=160)
+    third_pv.area = third_pv.owner = FakeArea()
+    third_pv.event_activate()
+    assert third_pv.energy_production_forecast_kWh == forecast
@@ -112,6 +112,7 @@ class FakeTrade:
     def __init__(self, offer):
         self.offer = offer
         self.seller = "FakeSeller"
+        self.filled_in_place = False
 
     @property
     def buyer(self):
@@ -358,6 +359,30 @@ def test_correct_time_expansion_read_arbitrary_profile():
     assert (sorted(list(mmr.keys()))[-1] == today(tz=TIME_ZONE).add(hours=49))
 
 
+def test_read_arbitrary_profile_returns_independent_copies_of_identical_profiles():
+    GlobalConfig.sim_duration = duration(hours=3)
+    mmr = read_arbitrary_profile(InputProfileTypes.IDENTITY, 30)
+    mmr[today(tz=TIME_ZONE)] = 0
+    other_mmr = read_arbitrary_profile(InputProfileTypes.IDENTITY, 30)
+    assert other_mmr is not mmr
+    assert set(other_mmr.keys()) == set(mmr.keys())
+    assert all(rate == 30 for rate in other_mmr.values())
+
+
+def test_identical_predefined_pvs_share_the_energy_forecast(area_test3):
+    pvs = [PVPredefinedStrategy(cloud_coverage=1, panel_count=3) for _ in range(2)]
+    for pv in pvs:
+        pv.area = pv.owner = area_test3
+        pv.event_activate()
+    assert pvs[0].energy_production_forecast_kWh._forecast is \
+        pvs[1].energy_production_forecast_kWh._forecast
+    profile = pvs[0]._read_predefined_profile_for_pv()
+    assert pvs[0].energy_production_forecast_kWh == \
+        {time_slot: energy * 3 for time_slot, energy in profile.items()}
+    assert pvs[0].state.available_energy_kWh == pvs[0].energy_production_forecast_kWh
+    assert pvs[0].state.available_energy_kWh is not pvs[1].state.available_energy_kWh
+
+
 def test_predefined_pv_constructor_rejects_incorrect_parameters():
     with pytest.raises(D3ADeviceException):
         PVPredefinedStrategy(panel_count=-1)
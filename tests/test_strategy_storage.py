@@ -168,7 +168,7 @@ class FakeMarket:
         return offer
 
     def bid(self, price, energy, buyer, seller, market=None, original_bid_price=None,
-            buyer_origin=None):
+            buyer_origin=None, standing=False):
         pass
 
 
@@ -0,0 +1,96 @@
+"""
+Copyright 2018 Grid Singularity
+This file is part of D3A.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import csv
+import os
+import pytest
+from pendulum import duration
+
+from d3a.d3a_core.sweep import expand_parameter_grid, sweep_run_id, read_completed_runs, \
+    SweepRunner, SUMMARY_FIELDS, _create_simulation_config
+
+
+GRID = {
+    "setup": ["default_2a", "default_3"],
+    "seed": [0, 1, 2],
+    "simulation_config": {"slot_length": ["15m"]},
+    "advanced_settings": {"IAASettings": {"MARKET_TYPE": [1, 2]}}
+}
+
+
+def test_expand_parameter_grid_creates_all_combinations():
+    points = expand_parameter_grid(GRID)
+    assert len(points) == 2 * 3 * 1 * 2
+    assert {"setup": "default_3", "seed": 1,
+            "simulation_config": {"slot_length": "15m"},
+            "advanced_settings": {"IAASettings": {"MARKET_TYPE": 2}}} in points
+
+
+def test_expand_parameter_grid_rejects_unknown_keys():
+    with pytest.raises(ValueError):
+        expand_parameter_grid({"unknown": [1, 2]})
+
+
+def test_sweep_run_id_is_deterministic_and_unique():
+    points = expand_parameter_grid(GRID)
+    run_ids = [sweep_run_id(p) for p in points]
+    assert len(set(run_ids)) == len(points)
+    assert run_ids == [sweep_run_id(p) for p in expand_parameter_grid(GRID)]
+
+
+def test_sweep_run_id_depends_on_base_settings_setup_and_seed():
+    point = {"simulation_config": {"slot_length": "15m"}}
+    run_id = sweep_run_id(point, {"sim_duration": duration(days=1)}, "default_2a", 0)
+    assert run_id == sweep_run_id(point, {"sim_duration": duration(days=1)}, "default_2a", 0)
+    assert run_id != sweep_run_id(point, {"sim_duration": duration(days=2)}, "default_2a", 0)
+    assert run_id != sweep_run_id(point, {"sim_duration": duration(days=1)}, "default_3", 0)
+    assert run_id != sweep_run_id(point, {"sim_duration": duration(days=1)}, "default_2a", 1)
+    # Setup and seed of the sweep do not matter if the parameter combination sets them
+    swept_point = {"setup": "default_3", "seed": 2}
+    assert sweep_run_id(swept_point, {}, "default_2a", 0) == \
+        sweep_run_id(swept_point, {}, "default_3", 1)
+
+
+def test_sweep_resumes_only_unfinished_runs(tmpdir):
+    runner = SweepRunner(GRID, {}, "default_2a", export_path=str(tmpdir))
+    points = expand_parameter_grid(GRID)
+    with open(runner.summary_file, "w") as csv_file:
+        writer = csv.DictWriter(csv_file, fieldnames=SUMMARY_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerow({"run_id": runner.run_id(points[0]), "status": "finished"})
+        writer.writerow({"run_id": runner.run_id(points[1]), "status": "failed"})
+
+    completed = read_completed_runs(runner.summary_file)
+    assert list(completed.keys()) == [runner.run_id(points[0])]
+    pending = runner.pending_runs(completed)
+    assert len(pending) == len(points) - 1
+    assert runner.run_id(points[1]) in [run_id for run_id, _ in pending]
+
+    other_runner = SweepRunner(GRID, {"market_count": 2}, "default_2a",
+                               export_path=str(tmpdir))
+    assert len(other_runner.pending_runs(completed)) == len(points)
+
+
+def test_sweep_durations_use_the_cli_format():
+    config = _create_simulation_config({"market_count": 1, "cloud_coverage": 0},
+                                       {"sim_duration": "2d", "slot_length": "15m",
+                                        "tick_length": "15s"})
+    assert config.sim_duration == duration(days=2)
+
+
+def test_read_completed_runs_without_summary_file(tmpdir):
+    assert read_completed_runs(os.path.join(str(tmpdir), "missing.csv")) == {}
@@ -0,0 +1,111 @@
+"""
+Copyright 2018 Grid Singularity
+This file is part of D3A.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import pytest
+
+from d3a.d3a_core.tick_scheduler import TickScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, delay):
+        self.sleeps.append(delay)
+        self.now += delay
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def _run_ticks(scheduler, clock, tick_durations):
+    for tick_duration in tick_durations:
+        clock.now += tick_duration
+        scheduler.wait_for_next_tick(clock.sleep)
+
+
+def test_ticks_are_paced_to_absolute_deadlines(clock):
+    scheduler = TickScheduler(1, clock=clock)
+    _run_ticks(scheduler, clock, [0.25, 0.5, 0.125, 0.75])
+    assert clock.sleeps == [0.75, 0.5, 0.875, 0.25]
+    assert clock.now == 104.0
+    assert scheduler.lateness.tick_count == 4
+    assert scheduler.lateness.late_tick_count == 0
+
+
+def test_oversleeping_does_not_accumulate(clock):
+    scheduler = TickScheduler(1, clock=clock)
+
+    def oversleep(delay):
+        clock.sleep(delay + 0.125)
+
+    for _ in range(8):
+        clock.now += 0.5
+        scheduler.wait_for_next_tick(oversleep)
+    assert clock.now == 108.125
+    assert scheduler.lateness.late_tick_count == 8
+    assert scheduler.lateness.max_s == 0.125
+
+
+def test_overrun_is_caught_up_without_sleeping(clock):
+    scheduler = TickScheduler(1, clock=clock)
+    _run_ticks(scheduler, clock, [0.5, 2.5, 0.25, 0.25, 0.25, 0.5])
+    # Tick 2 ends at 103.5 although tick 3 is due at 102, ticks 3 and 4 run back to back
+    # until the simulation is back on schedule
+    assert clock.sleeps == [0.5, 0.75, 0.5]
+    assert clock.now == 106.0
+    assert scheduler.lateness.late_tick_count == 2
+    assert scheduler.lateness.max_s == 1.5
+    assert scheduler.lateness.mean_s == pytest.approx(2.25 / 6)
+
+
+def test_pause_shifts_the_schedule(clock):
+    scheduler = TickScheduler(1, clock=clock)
+    _run_ticks(scheduler, clock, [0.5, 0.5])
+    scheduler.pause()
+    clock.now += 30
+    scheduler.pause()
+    clock.now += 12.5
+    scheduler.resume()
+    scheduler.resume()
+    _run_ticks(scheduler, clock, [0.5, 0.5])
+    assert clock.sleeps == [0.5, 0.5, 0.5, 0.5]
+    assert clock.now == 146.5
+    assert scheduler.lateness.late_tick_count == 0
+
+
+def test_tick_length_change_keeps_the_upcoming_deadline(clock):
+    scheduler = TickScheduler(1, clock=clock)
+    _run_ticks(scheduler, clock, [0.5])
+    scheduler.tick_length_s = 2
+    _run_ticks(scheduler, clock, [0.5, 0.5])
+    assert clock.now == 104.0
+
+    scheduler.tick_length_s = 0
+    _run_ticks(scheduler, clock, [0.5, 0.5])
+    assert clock.now == 105.0
+    assert len(clock.sleeps) == 3
+
+    scheduler.tick_length_s = 1
+    _run_ticks(scheduler, clock, [0.25])
+    assert clock.now == 106.0
@@ -0,0 +1,51 @@
+"""
+Copyright 2018 Grid Singularity
+This file is part of D3A.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+from unittest.mock import patch
+
+import pytest
+from pendulum import duration, today
+
+from d3a.constants import TIME_ZONE
+from d3a.d3a_core.area_registry import iterate_area_tree
+from d3a.models.market.two_sided_pay_as_bid import TwoSidedPayAsBid
+from d3a.models.market.two_sided_pay_as_clear import TwoSidedPayAsClear
+from conftest import past_trades, run_simulation
+
+
+def _trades_and_clearing_states(setup_module_name):
+    simulation = run_simulation(setup_module_name, duration(hours=4), duration(seconds=15),
+                                today(tz=TIME_ZONE).add(hours=8))
+    clearing_states = [(market.state.cumulative_offers, market.state.cumulative_bids,
+                        market.state.clearing)
+                       for area in iterate_area_tree(simulation.area)
+                       for market in area.past_markets
+                       if isinstance(market, TwoSidedPayAsClear)]
+    return past_trades(simulation), clearing_states
+
+
+@pytest.mark.usefixtures("simulation_settings")
+@pytest.mark.parametrize("setup_module_name", ["two_sided_market.default_2a",
+                                               "two_sided_pay_as_clear.default_2a"])
+def test_skipping_unchanged_books_results_in_identical_trades(setup_module_name):
+    trades, clearing_states = _trades_and_clearing_states(setup_module_name)
+    with patch.object(TwoSidedPayAsBid, "skip_unchanged_book", False):
+        all_book_trades, all_book_clearing_states = \
+            _trades_and_clearing_states(setup_module_name)
+    assert trades
+    assert trades == all_book_trades
+    assert clearing_states == all_book_clearing_states
@@ -15,8 +15,11 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
+from logging import getLogger, DEBUG, INFO
+from unittest.mock import MagicMock, patch
 from d3a.d3a_core.util import available_simulation_scenarios, \
-    validate_const_settings_for_simulation
+    validate_const_settings_for_simulation, TaggedLogWrapper, LazyLogStr, \
+    enable_trace_buffer, disable_trace_buffer, dump_trace_buffer
 from d3a_interface.constants_limits import ConstSettings
 from d3a import setup as d3a_setup
 import os
@@ -64,3 +67,48 @@ def test_validate_one_sided_market_when_pricing_scheme_on_comparison(market_type
     assert ConstSettings.IAASettings.MARKET_TYPE == 1
     assert ConstSettings.IAASettings.AlternativePricing.PRICING_SCHEME == alt_pricing
     assert ConstSettings.IAASettings.AlternativePricing.COMPARE_PRICING_SCHEMES
+
+
+@pytest.fixture
+def trace_buffer():
+    enable_trace_buffer(2)
+    yield
+    disable_trace_buffer()
+
+
+@pytest.mark.usefixtures("trace_buffer")
+def test_trace_buffer_keeps_the_latest_trace_messages_until_dumped():
+    log = getLogger("d3a.test_trace")
+    tagged_log = TaggedLogWrapper(log, "Area:Strategy")
+    offer = {"energy": 1}
+    with patch.object(log, "_log") as log_mock:
+        log.trace("First %s", "message")
+        log.trace("Second %s", "message")
+        tagged_log.trace("Forwarding %s", LazyLogStr(lambda o: f"offer {o['energy']}", offer))
+        assert log_mock.call_count == 0
+    # The message shows the offer as it was when it was traced
+    offer["energy"] = 2
+
+    dump_log = MagicMock()
+    with patch("d3a.d3a_core.util.log", dump_log):
+        dump_trace_buffer()
+    messages = [call[0][-1] for call in dump_log.error.call_args_list[1:]]
+    assert messages == ["Second message", "[Area:Strategy] Forwarding offer 1"]
+    dump_log.error.reset_mock()
+    with patch("d3a.d3a_core.util.log", dump_log):
+        dump_trace_buffer()
+    assert dump_log.error.call_count == 1
+
+
+def test_lazy_log_str_is_only_formatted_for_logged_messages():
+    log = getLogger("d3a.test_lazy_log_str")
+    log.setLevel(INFO)
+    formatter = MagicMock(return_value="offer")
+    messages = []
+    with patch.object(log, "handle", side_effect=lambda r: messages.append(r.getMessage())):
+        log.debug("Offer %s", LazyLogStr(formatter, 1))
+        assert formatter.call_count == 0
+        log.setLevel(DEBUG)
+        log.debug("Offer %s", LazyLogStr(formatter, 1))
+    formatter.assert_called_once_with(1)
+    assert messages == ["Offer offer"]
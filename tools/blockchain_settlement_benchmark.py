@@ -0,0 +1,39 @@
+# Measures the throughput of the blockchain settlement modes on the in-process chain, separately
+# from the time spent in matching.
+# Usage: python tools/blockchain_settlement_benchmark.py [setup_module_name]
+import logging
+import sys
+import time
+
+from pendulum import duration, today
+
+from d3a.constants import TIME_ZONE
+from d3a.d3a_core.simulation import Simulation
+from d3a.models.config import SimulationConfig
+
+
+def simulation_config():
+    return SimulationConfig(sim_duration=duration(hours=4),
+                            slot_length=duration(minutes=15),
+                            tick_length=duration(seconds=15),
+                            market_count=1,
+                            cloud_coverage=0,
+                            start_date=today(tz=TIME_ZONE),
+                            external_connection_enabled=False)
+
+
+if __name__ == "__main__":
+    logging.disable(logging.WARNING)
+    setup_module_name = sys.argv[1] if len(sys.argv) > 1 else "default_2a"
+
+    for settlement_mode in ("transaction", "tick", "slot"):
+        simulation = Simulation(setup_module_name, simulation_config(), seed=0,
+                                no_export=True, enable_bc=True, local_bc=True,
+                                bc_settlement_mode=settlement_mode)
+        start = time.time()
+        simulation.run()
+        total_s = time.time() - start
+        bc = simulation.bc
+        print(f"{settlement_mode:>11}: {total_s:.2f}s total, "
+              f"{bc.transaction_count} chain transactions, "
+              f"{bc.settlement_time_s:.2f}s batched settlement")
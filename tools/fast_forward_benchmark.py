@@ -0,0 +1,39 @@
+# Compares the runtime of simulations with and without fast-forwarding of quiet ticks.
+# Usage: python tools/fast_forward_benchmark.py [setup_module_name ...]
+import logging
+import sys
+import time
+
+from pendulum import duration, today
+
+from d3a.constants import TIME_ZONE
+from d3a.d3a_core.simulation import Simulation
+from d3a.models.config import SimulationConfig
+
+DEFAULT_SETUPS = ["default_3_pv_only",
+                  "strategy_tests.user_profile_pv_csv",
+                  "strategy_tests.user_profile_load_csv"]
+
+
+def run(setup_module_name, fast_forward):
+    config = SimulationConfig(sim_duration=duration(hours=24),
+                              slot_length=duration(minutes=15),
+                              tick_length=duration(seconds=15),
+                              market_count=1,
+                              cloud_coverage=0,
+                              start_date=today(tz=TIME_ZONE),
+                              external_connection_enabled=False)
+    simulation = Simulation(setup_module_name, config, seed=0, no_export=True,
+                            fast_forward=fast_forward)
+    start = time.time()
+    simulation.run()
+    return time.time() - start
+
+
+if __name__ == "__main__":
+    logging.disable(logging.WARNING)
+    for setup in sys.argv[1:] or DEFAULT_SETUPS:
+        regular_s = run(setup, False)
+        fast_forward_s = run(setup, True)
+        print(f"{setup}: {regular_s:.2f}s regular, {fast_forward_s:.2f}s fast-forwarded "
+              f"({regular_s / fast_forward_s:.2f}x)")
@@ -0,0 +1,39 @@
+# Measures the overhead of the tick loop of regular and headless simulations on a grid
+# without devices.
+# Usage: python tools/headless_benchmark.py [hours]
+import logging
+import sys
+import time
+
+from pendulum import duration, today
+
+from d3a.constants import TIME_ZONE
+from d3a.d3a_core.simulation import Simulation
+from d3a.models.config import SimulationConfig
+
+TRIVIAL_GRID = {"name": "Grid", "children": [{"name": "House", "children": []}]}
+
+
+def run(hours, headless):
+    config = SimulationConfig(sim_duration=duration(hours=hours),
+                              slot_length=duration(minutes=15),
+                              tick_length=duration(seconds=1),
+                              market_count=1,
+                              cloud_coverage=0,
+                              start_date=today(tz=TIME_ZONE),
+                              external_connection_enabled=False)
+    config.area = TRIVIAL_GRID
+    simulation = Simulation("json_arg", config, seed=0, no_export=True, headless=headless)
+    start = time.time()
+    simulation.run()
+    return time.time() - start, config.total_ticks
+
+
+if __name__ == "__main__":
+    logging.disable(logging.CRITICAL)
+    hours = int(sys.argv[1]) if len(sys.argv) > 1 else 24
+    regular_s, tick_count = run(hours, False)
+    headless_s, _ = run(hours, True)
+    print(f"{tick_count} ticks: {regular_s:.2f}s regular "
+          f"({regular_s / tick_count * 1e6:.1f}us per tick), {headless_s:.2f}s headless "
+          f"({headless_s / tick_count * 1e6:.1f}us per tick)")
@@ -0,0 +1,49 @@
+# Measures the per tick overhead of trace logging: with trace messages disabled, logged to a
+# handler that formats and discards them, and kept in the trace buffer.
+# Usage: python tools/logging_benchmark.py [setup_module_name]
+import logging
+import os
+import sys
+import time
+
+from pendulum import duration, today
+
+from d3a.constants import TIME_ZONE
+from d3a.d3a_core.simulation import Simulation
+from d3a.d3a_core.util import TRACE, enable_trace_buffer, disable_trace_buffer
+from d3a.models.config import SimulationConfig
+from d3a_interface.constants_limits import ConstSettings
+
+
+def run_simulation(setup_module_name):
+    config = SimulationConfig(sim_duration=duration(hours=4),
+                              slot_length=duration(minutes=15),
+                              tick_length=duration(seconds=15),
+                              market_count=1,
+                              cloud_coverage=0,
+                              start_date=today(tz=TIME_ZONE),
+                              external_connection_enabled=False)
+    simulation = Simulation(setup_module_name, config, seed=0, no_export=True)
+    start = time.time()
+    simulation.run()
+    ConstSettings.IAASettings.MARKET_TYPE = 1
+    tick_count = config.ticks_per_slot * (config.sim_duration // config.slot_length)
+    return (time.time() - start) / tick_count * 1000
+
+
+if __name__ == "__main__":
+    setup_module_name = sys.argv[1] if len(sys.argv) > 1 else "default_2a"
+    root_logger = logging.getLogger()
+    root_logger.addHandler(logging.StreamHandler(open(os.devnull, "w")))
+
+    root_logger.setLevel(logging.WARNING)
+    disabled_ms = run_simulation(setup_module_name)
+    root_logger.setLevel(TRACE)
+    enabled_ms = run_simulation(setup_module_name)
+    root_logger.setLevel(logging.WARNING)
+    enable_trace_buffer(100000)
+    buffered_ms = run_simulation(setup_module_name)
+    disable_trace_buffer()
+
+    print(f"{setup_module_name}: {disabled_ms:.2f}ms per tick with trace disabled, "
+          f"{enabled_ms:.2f}ms logged, {buffered_ms:.2f}ms in the trace buffer")
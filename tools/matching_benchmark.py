@@ -0,0 +1,64 @@
+# Compares the runtime of two sided matching with and without skipping unchanged books, on the
+# ticks of a quiet market and on two sided simulations.
+# Usage: python tools/matching_benchmark.py [setup_module_name ...]
+import logging
+import sys
+import time
+
+from pendulum import duration, today
+
+from d3a.constants import TIME_ZONE
+from d3a.d3a_core.simulation import Simulation
+from d3a.models.config import SimulationConfig
+from d3a.models.market.two_sided_pay_as_bid import TwoSidedPayAsBid
+from d3a_interface.constants_limits import ConstSettings
+
+DEFAULT_SETUPS = ["two_sided_market.default_2a", "two_sided_market.one_pv_one_load"]
+TICKS = 1000
+
+
+def run_quiet_market(order_count):
+    """
+    Matching on the ticks of a market whose offers and bids do not match and do not change.
+    """
+    market = TwoSidedPayAsBid(time_slot=today(tz=TIME_ZONE))
+    for i in range(order_count):
+        market.offer(30 + i % 10, 1, f"seller {i}", f"seller {i}")
+        market.bid(20 - i % 10, 1, f"buyer {i}", f"buyer {i}", f"buyer {i}")
+    start = time.time()
+    for _ in range(TICKS):
+        market.match_offers_bids()
+    return time.time() - start
+
+
+def run_simulation(setup_module_name):
+    config = SimulationConfig(sim_duration=duration(hours=24),
+                              slot_length=duration(minutes=15),
+                              tick_length=duration(seconds=15),
+                              market_count=1,
+                              cloud_coverage=0,
+                              start_date=today(tz=TIME_ZONE),
+                              external_connection_enabled=False)
+    simulation = Simulation(setup_module_name, config, seed=0, no_export=True)
+    start = time.time()
+    simulation.run()
+    ConstSettings.IAASettings.MARKET_TYPE = 1
+    return time.time() - start
+
+
+def compare(name, benchmark, *args):
+    TwoSidedPayAsBid.skip_unchanged_book = False
+    all_books_s = benchmark(*args)
+    TwoSidedPayAsBid.skip_unchanged_book = True
+    changed_books_s = benchmark(*args)
+    print(f"{name}: {all_books_s:.2f}s matching all books, {changed_books_s:.2f}s matching "
+          f"changed books ({all_books_s / changed_books_s:.2f}x)")
+
+
+if __name__ == "__main__":
+    logging.disable(logging.WARNING)
+    for order_count in (10, 100, 300):
+        compare(f"{TICKS} ticks with {order_count} offers and bids", run_quiet_market,
+                order_count)
+    for setup in sys.argv[1:] or DEFAULT_SETUPS:
+        compare(setup, run_simulation, setup)
@@ -0,0 +1,63 @@
+# Measures the setup time (scenario construction and activation) of a large json scenario.
+# Usage: python tools/scenario_setup_benchmark.py [device_count]
+import logging
+import sys
+import time
+
+from pendulum import duration, today
+
+from d3a.constants import TIME_ZONE
+from d3a.d3a_core.area_serializer import area_from_dict
+from d3a.d3a_core.simulation import Simulation
+from d3a.models.config import SimulationConfig
+
+DEVICES_PER_HOUSE = [
+    {"type": "LoadHours", "avg_power_W": 200, "hrs_per_day": 6, "hrs_of_day": list(range(12, 18)),
+     "final_buying_rate": 35},
+    {"type": "PV", "panel_count": 2, "initial_selling_rate": 30, "final_selling_rate": 5},
+    {"type": "Storage", "initial_soc": 50, "battery_capacity_kWh": 5},
+    {"type": "LoadHours", "avg_power_W": 100, "hrs_per_day": 4, "hrs_of_day": list(range(18, 22)),
+     "final_buying_rate": 30},
+]
+
+
+def scenario(device_count):
+    houses = []
+    for house_index in range(device_count // len(DEVICES_PER_HOUSE)):
+        houses.append({
+            "name": f"House {house_index}",
+            "children": [dict(device, name=f"H{house_index} {device['type']} {device_index}")
+                         for device_index, device in enumerate(DEVICES_PER_HOUSE)]
+        })
+    return {"name": "Grid", "children": [
+        {"name": "Market Maker", "type": "InfiniteBus", "energy_sell_rate": 30},
+        {"name": "Community", "children": houses}
+    ]}
+
+
+def simulation_config():
+    return SimulationConfig(sim_duration=duration(hours=24),
+                            slot_length=duration(minutes=15),
+                            tick_length=duration(seconds=15),
+                            market_count=1,
+                            cloud_coverage=0,
+                            start_date=today(tz=TIME_ZONE),
+                            external_connection_enabled=False)
+
+
+if __name__ == "__main__":
+    logging.disable(logging.WARNING)
+    device_count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+
+    start = time.time()
+    area_from_dict(scenario(device_count), simulation_config())
+    construction_s = time.time() - start
+
+    config = simulation_config()
+    config.area = scenario(device_count)
+    start = time.time()
+    Simulation("json_arg", config, seed=0, no_export=True)
+    setup_s = time.time() - start
+
+    print(f"{device_count} devices: {construction_s:.2f}s area_from_dict, "
+          f"{setup_s:.2f}s simulation setup including activation")
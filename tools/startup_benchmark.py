@@ -0,0 +1,34 @@
+# Measures the start-up time of the cli and of a short simulation without export, and
+# compares it to the start-up time budget.
+# Usage: python tools/startup_benchmark.py [repetitions]
+import os
+import subprocess
+import sys
+import textwrap
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "tests"))
+from test_startup_imports import CLI_HELP, SHORT_SIMULATION  # noqa: E402
+
+BUDGET_SECONDS = {"d3a run --help": 2.0, "1h simulation without export": 6.0}
+
+
+def measure(code, repetitions):
+    durations = []
+    for _ in range(repetitions):
+        start = time.time()
+        subprocess.check_call([sys.executable, "-c", code])
+        durations.append(time.time() - start)
+    return min(durations)
+
+
+if __name__ == "__main__":
+    repetitions = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    over_budget = False
+    for name, code in [("d3a run --help", CLI_HELP),
+                       ("1h simulation without export", SHORT_SIMULATION)]:
+        duration_s = measure(textwrap.dedent(code), repetitions)
+        budget_s = BUDGET_SECONDS[name]
+        over_budget |= duration_s > budget_s
+        print(f"{name}: {duration_s:.2f}s (budget {budget_s:.2f}s)")
+    sys.exit(1 if over_budget else 0)
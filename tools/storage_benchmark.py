@@ -0,0 +1,74 @@
+# Compares the runtime of the storage state calculations with and without the cached energy
+# headroom, on the calculations of a storage tick and on storage-heavy simulations.
+# Usage: python tools/storage_benchmark.py [setup_module_name ...]
+import logging
+import sys
+import time
+
+from pendulum import duration, today
+
+from d3a.constants import TIME_ZONE
+from d3a.d3a_core.simulation import Simulation
+from d3a.models.config import SimulationConfig
+from d3a.models.state import StorageState
+from d3a_interface.constants_limits import ConstSettings
+
+DEFAULT_SETUPS = ["default_2", "default_5", "two_sided_market.default_2a"]
+TICKS = 20000
+
+
+def run_ticks(market_count):
+    """
+    Calculations of the storage state on the ticks of a two sided market without trades.
+    """
+    start_date = today(tz=TIME_ZONE)
+    time_slots = [start_date.add(minutes=15 * i) for i in range(market_count)]
+    state = StorageState(initial_soc=50,
+                         loss_per_hour=ConstSettings.StorageSettings.LOSS_PER_HOUR,
+                         loss_function=ConstSettings.StorageSettings.LOSS_FUNCTION)
+    for time_slot in time_slots:
+        for slot_dict in (state.pledged_sell_kWh, state.offered_sell_kWh,
+                          state.pledged_buy_kWh, state.offered_buy_kWh):
+            slot_dict[time_slot] = 0.
+    state.set_battery_energy_per_slot(duration(minutes=15))
+    start = time.time()
+    for _ in range(TICKS):
+        state.clamp_energy_to_buy_kWh(time_slots)
+        for time_slot in time_slots:
+            state.clamp_energy_to_buy_kWh(time_slots)
+            state.check_state(time_slot)
+            state.lose(state.loss_function, state.loss_per_hour)
+        state.clamp_energy_to_sell_kWh(time_slots)
+    return time.time() - start
+
+
+def run_simulation(setup_module_name):
+    config = SimulationConfig(sim_duration=duration(hours=24),
+                              slot_length=duration(minutes=15),
+                              tick_length=duration(seconds=15),
+                              market_count=1,
+                              cloud_coverage=0,
+                              start_date=today(tz=TIME_ZONE),
+                              external_connection_enabled=False)
+    simulation = Simulation(setup_module_name, config, seed=0, no_export=True)
+    start = time.time()
+    simulation.run()
+    ConstSettings.IAASettings.MARKET_TYPE = 1
+    return time.time() - start
+
+
+def compare(name, benchmark, *args):
+    StorageState.cache_energy_headroom = False
+    uncached_s = benchmark(*args)
+    StorageState.cache_energy_headroom = True
+    cached_s = benchmark(*args)
+    print(f"{name}: {uncached_s:.2f}s uncached, {cached_s:.2f}s cached "
+          f"({uncached_s / cached_s:.2f}x)")
+
+
+if __name__ == "__main__":
+    logging.disable(logging.WARNING)
+    for market_count in (1, 4, 12):
+        compare(f"{TICKS} ticks with {market_count} markets", run_ticks, market_count)
+    for setup in sys.argv[1:] or DEFAULT_SETUPS:
+        compare(setup, run_simulation, setup)